@@ -0,0 +1,183 @@
+import base64
+import hashlib
+import io
+import logging
+import queue
+import threading
+import time
+import allure
+from timing import recorder
+import visual
+
+logger = logging.getLogger()
+
+# failure - снимок только при падении теста; explicit - ещё и явные capture() из тестов;
+# steps - дополнительно после каждого шага page object
+POLICIES = ("failure", "explicit", "steps")
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class ArtifactPipeline:
+    # Браузер делает снимок в потоке теста (это одна команда WebDriver), а декодирование,
+    # сравнение с предыдущими кадрами, уменьшение и сжатие PNG идут в фоновом потоке.
+    # В allure результат прикрепляется в конце теста: вложения привязаны к потоку теста.
+    def __init__(self, policy="explicit", scale=1.0, compress_level=6, dom=False, max_queue=32):
+        self.policy = policy
+        self.scale = scale
+        self.compress_level = compress_level
+        self.dom = dom
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = None
+        self.item = None
+        self.results = {}
+        self.seen = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def configure(self, policy="explicit", scale=1.0, compress_level=6, dom=False, max_queue=32):
+        if policy not in POLICIES:
+            raise ValueError(f"Неизвестная политика скриншотов: {policy}")
+        self.policy = policy
+        self.scale = scale
+        self.compress_level = compress_level
+        self.dom = dom
+        self.queue = queue.Queue(maxsize=max_queue)
+        if Image is None and (scale != 1.0 or compress_level != 6):
+            logger.warning("Pillow не установлен: скриншоты сохраняются без уменьшения и пересжатия")
+        return self
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="artifacts", daemon=True)
+        self.thread.start()
+        if self.policy == "steps":
+            recorder.listeners.append(self.step_finished)
+        return self
+
+    def stop(self):
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        if self.step_finished in recorder.listeners:
+            recorder.listeners.remove(self.step_finished)
+
+    def begin(self, item):
+        self.item = item
+        self.stats[item.nodeid] = {"captured": 0, "duplicates": 0, "background": 0.0, "blocked": 0.0}
+
+    def add_stat(self, nodeid, name, value):
+        with self.lock:
+            self.stats[nodeid][name] += value
+
+    def capture(self, driver, name, force=False, compare=False):
+        # compare - явный снимок из теста: сравнивается с эталоном даже при политике failure
+        compare = compare and visual.engine.enabled
+        attach = force or self.policy != "failure"
+        if self.item is None or self.thread is None or not (attach or compare):
+            return
+        screenshot = driver.get_screenshot_as_base64()
+        source = driver.page_source if self.dom and attach else None
+        regions = visual.ignore_regions(driver) if compare else None
+        nodeid = self.item.nodeid
+        # При заполненной очереди тест ждёт: так память под кадры ограничена
+        start = time.perf_counter()
+        self.queue.put((nodeid, name, screenshot, source, attach, regions))
+        self.add_stat(nodeid, "blocked", time.perf_counter() - start)
+
+    def step_finished(self, name):
+        # Снимаем только после шагов верхнего уровня, вложенные шаги дали бы почти одинаковые кадры
+        if self.item is None or recorder.frames():
+            return
+        driver = self.item.funcargs.get("driver")
+        if driver is not None:
+            try:
+                self.capture(driver, name)
+            except Exception as e:
+                logger.debug("Скриншот после шага %s не снят: %s", name, e)
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                return
+            start = time.perf_counter()
+            nodeid = job[0]
+            try:
+                self.process(*job)
+            except Exception as e:
+                logger.warning("Не удалось обработать скриншот %s: %s", job[1], e)
+            finally:
+                self.add_stat(nodeid, "background", time.perf_counter() - start)
+                self.queue.task_done()
+
+    def process(self, nodeid, name, screenshot, source, attach=True, regions=None):
+        png = base64.b64decode(screenshot)
+        if regions is not None:
+            visual.engine.submit(nodeid, name, png, regions)
+        if not attach:
+            return
+        digest = hashlib.sha1(png).hexdigest()
+        seen = self.seen.setdefault(nodeid, set())
+        results = self.results.setdefault(nodeid, [])
+        if digest in seen:
+            self.add_stat(nodeid, "duplicates", 1)
+        else:
+            seen.add(digest)
+            results.append((name, self.compress(png), allure.attachment_type.PNG))
+            self.add_stat(nodeid, "captured", 1)
+        if source is not None:
+            results.append((name + "-dom", source, allure.attachment_type.HTML))
+
+    def compress(self, png):
+        if Image is None or (self.scale == 1.0 and self.compress_level == 6):
+            return png
+        image = Image.open(io.BytesIO(png))
+        if self.scale != 1.0:
+            image = image.resize((max(int(image.width * self.scale), 1), max(int(image.height * self.scale), 1)))
+        output = io.BytesIO()
+        image.save(output, format="PNG", optimize=self.compress_level == 9, compress_level=self.compress_level)
+        return output.getvalue()
+
+    def wait(self):
+        if self.thread is not None:
+            self.queue.join()
+
+    def finish(self, item):
+        # Дожидаемся кадров этого теста и прикрепляем их к отчёту
+        nodeid = item.nodeid
+        start = time.perf_counter()
+        self.wait()
+        for name, data, attachment_type in self.results.pop(nodeid, []):
+            allure.attach(data, name=name, attachment_type=attachment_type)
+        self.seen.pop(nodeid, None)
+        self.add_stat(nodeid, "blocked", time.perf_counter() - start)
+        self.item = None
+        # Снимки из teardown тест уже не уронят: расхождения только в лог
+        for mismatch in visual.engine.collect(nodeid):
+            logger.warning("Снимок после теста отличается от эталона: %s", mismatch)
+
+    def report(self):
+        lines = [f"{'Тест':<60} {'кадров':>6} {'дублей':>6} {'фон, с':>7} {'ожид., с':>8} {'выиграно, с':>11}"]
+        reclaimed_total = 0.0
+        for nodeid, stats in self.stats.items():
+            if not stats["captured"] and not stats["duplicates"]:
+                continue
+            # Выигрыш - работа, которая раньше шла в потоке теста, за вычетом ожидания очереди
+            reclaimed = stats["background"] - stats["blocked"]
+            reclaimed_total += reclaimed
+            lines.append(f"{nodeid:<60} {stats['captured']:>6} {stats['duplicates']:>6} {stats['background']:>7.2f} "
+                         f"{stats['blocked']:>8.2f} {reclaimed:>11.2f}")
+        lines.append(f"Всего выиграно: {reclaimed_total:.2f} с (политика {self.policy})")
+        return "\n".join(lines)
+
+
+pipeline = ArtifactPipeline()
+
+
+def capture(driver, name):
+    pipeline.capture(driver, name, compare=True)
@@ -0,0 +1,76 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+from selenium.webdriver.common.by import By
+from browser import create_driver
+from pages import MainPage
+
+# Микробенчмарк поиска товара на странице категории из 100 карточек:
+# старый цикл find_element + .text против одного execute_script.
+# Запуск: python bench_dom.py [число товаров] [повторы]
+
+CARD = """
+<div class="product-layout product-grid col-lg-3">
+  <div class="product-thumb">
+    <div class="caption">
+      <h4><a href="#product-{i}">Product {i}</a></h4>
+      <p class="price">${i}.00 <span class="price-tax">Ex Tax: ${i}.00</span></p>
+    </div>
+    <div class="button-group">
+      <button type="button" onclick="cart.add('{i}');">Add to Cart</button>
+      <button type="button" data-original-title="Add to Wish List" onclick="wishlist.add('{i}');">Wish</button>
+    </div>
+  </div>
+</div>
+"""
+
+
+def write_page(count):
+    cards = "".join(CARD.format(i=i) for i in range(1, count + 1))
+    fd, path = tempfile.mkstemp(suffix=".html")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(f"<html><body><div id='content'><div class='row'>{cards}</div></div></body></html>")
+    return path
+
+
+def find_by_loop(driver, product_name):
+    # Прежняя реализация add_product_to_cart_by_name без клика
+    for product in driver.find_elements(By.CSS_SELECTOR, ".product-layout"):
+        title = product.find_element(By.CSS_SELECTOR, "h4 a").text
+        if product_name.lower() in title.lower():
+            return product.find_element(By.CSS_SELECTOR, "button[onclick*='cart.add']")
+    return None
+
+
+def measure(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        assert func() is not None
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(count=100, repeats=10):
+    path = write_page(count)
+    driver = create_driver(headless=True)
+    try:
+        driver.get("file://" + path)
+        main_page = MainPage(driver)
+        # Ищем последний товар - худший случай для цикла
+        target = f"Product {count}"
+        loop_ms = measure(lambda: find_by_loop(driver, target), repeats)
+        batch_ms = measure(lambda: main_page.find_product(target), repeats)
+        print(f"Товаров на странице: {count}, повторов: {repeats}")
+        print(f"Цикл find_element:   {loop_ms:8.1f} мс (~{2 * count + 2} запросов к WebDriver)")
+        print(f"Один execute_script: {batch_ms:8.1f} мс (2 запроса к WebDriver)")
+        print(f"Ускорение: x{loop_ms / batch_ms:.1f}")
+    finally:
+        driver.quit()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
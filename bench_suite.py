@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import pytest
+from browser import browser_rss_mb
+from timing import recorder
+
+# Бенчмарк самого фреймворка: типовые сценарии прогоняются N раз на локальном стенде,
+# медианы сравниваются с сохранённой базой. Каждый повтор - отдельный процесс pytest с этим модулем
+# в роли плагина (-p bench_suite), чтобы браузер, стенд и кэши не переходили из повтора в повтор.
+# Запуск: python bench_suite.py -n 5 [--save-baseline]
+# --waits сравнивает стабилизацию страниц (waits.PageSettle) с прежними фиксированными паузами:
+# те же сценарии прогоняются с WEBTEST_WAITS=sleep и без него, база при этом не используется.
+
+BENCH_DIR = os.path.join(".webtest", "bench")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+JOURNEYS = {
+    "main_flow": ["kt4.py::test_main_flow"],
+    "cart": ["kt4.py::test_add_camera_to_cart", "kt4.py::test_add_tablet_to_cart", "kt4.py::test_add_htc_phone_to_cart"],
+    "admin": ["kt5-webtest.py::test_create_category_and_product"],
+}
+
+# Модули с тестами: по ним замеряется сбор (--collect-only) - импорт conftest, page objects и тестов
+TEST_FILES = ["kt4.py", "kt5-webtest.py"]
+COLLECT = "collect-only"
+
+# wall - время тела теста (без фикстур), commands - команды WebDriver, bytes - тела запросов и ответов стенда,
+# rss - память дерева процессов Firefox после теста. Допустимый рост относительно базы:
+THRESHOLDS = {"wall": 0.15, "commands": 0.05, "bytes": 0.10, "rss": 0.20}
+UNITS = {"wall": "с", "commands": "", "bytes": "КБ", "rss": "МБ"}
+
+# --- Плагин pytest: замеры внутри одного повтора ---
+
+results = {}
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    standin = getattr(item.config, "standin", None)
+    traffic = dict(standin.store.traffic) if standin else None
+    commands = recorder.commands
+    start = time.perf_counter()
+    yield
+    wall = time.perf_counter() - start
+    driver = item.funcargs.get("driver")
+    results[item.nodeid] = {
+        "wall": wall,
+        "commands": recorder.commands - commands,
+        "bytes": (sum(standin.store.traffic[key] - traffic[key] for key in ("received", "sent")) / 1024
+                  if standin else None),
+        "rss": browser_rss_mb(driver) if driver is not None else None,
+        "passed": True,
+    }
+
+
+def pytest_runtest_logreport(report):
+    if report.failed and report.nodeid in results:
+        results[report.nodeid]["passed"] = False
+
+
+def pytest_sessionfinish(session):
+    path = os.environ.get("WEBTEST_BENCH_OUT")
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+
+# --- Запуск повторов и сравнение с базой ---
+
+
+def run_iteration(nodeids, waits="settle"):
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    env = dict(os.environ, WEBTEST_STANDIN="1", WEBTEST_HEADLESS="1", WEBTEST_BENCH_OUT=path, WEBTEST_WAITS=waits)
+    # Кэширующий прокси подменил бы трафик стенда
+    env.pop("WEBTEST_HTTP_CACHE", None)
+    try:
+        subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "bench_suite", "-p", "no:cacheprovider", *nodeids],
+                       env=env, check=False)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+    finally:
+        os.remove(path)
+
+
+def measure_collection(iterations):
+    # Сбор тестов не должен запускать браузер: время здесь - цена любого запуска pytest и старта воркера
+    samples, failed = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider",
+                                 *TEST_FILES], capture_output=True, check=False)
+        samples.append(time.perf_counter() - start)
+        failed += result.returncode != 0
+    return {"runs": iterations, "failed": failed, "wall": statistics.median(samples),
+            "commands": None, "bytes": None, "rss": None}
+
+
+def aggregate(iterations, nodeids):
+    summary = {}
+    for nodeid in nodeids:
+        runs = [run[nodeid] for run in iterations if nodeid in run]
+        summary[nodeid] = {"runs": len(runs), "failed": sum(not run["passed"] for run in runs)}
+        for metric in THRESHOLDS:
+            values = [run[metric] for run in runs if run[metric] is not None]
+            summary[nodeid][metric] = statistics.median(values) if values else None
+    return summary
+
+
+def compare(summary, baseline, thresholds):
+    # Строки отчёта и список регрессий "тест: метрика"
+    rows, regressions = [], []
+    for nodeid, stats in summary.items():
+        base = baseline.get(nodeid, {})
+        for metric, threshold in thresholds.items():
+            current, previous = stats[metric], base.get(metric)
+            if current is None and previous is None:
+                continue
+            change = (current - previous) / previous if current is not None and previous else None
+            regressed = change is not None and change > threshold
+            if regressed:
+                regressions.append(f"{nodeid}: {metric}")
+            rows.append((nodeid, metric, current, previous, change, regressed))
+    return rows, regressions
+
+
+def format_report(rows, summary):
+    def value(number, metric):
+        if number is None:
+            return "-"
+        return f"{number:.0f}" if metric == "commands" else f"{number:.2f}"
+
+    lines = [f"{'Тест':<58} {'метрика':<9} {'сейчас':>10} {'база':>10} {'изм.':>8}"]
+    for nodeid, metric, current, previous, change, regressed in rows:
+        delta = f"{change * 100:+.1f}%" if change is not None else "-"
+        mark = "  РЕГРЕССИЯ" if regressed else ""
+        lines.append(f"{nodeid:<58} {metric + ' ' + UNITS[metric]:<9} {value(current, metric):>10} "
+                     f"{value(previous, metric):>10} {delta:>8}{mark}")
+    for nodeid, stats in summary.items():
+        if stats["failed"] or not stats["runs"]:
+            lines.append(f"{nodeid}: упал в {stats['failed']} из {stats['runs']} повторов")
+    return "\n".join(lines)
+
+
+def compare_waits(iterations, nodeids):
+    # Медианы времени тел тестов с фиксированными паузами и с PageSettle
+    summaries = {}
+    for waits in ("sleep", "settle"):
+        runs = []
+        for number in range(iterations):
+            print(f"Ожидания {waits}: повтор {number + 1} из {iterations}")
+            runs.append(run_iteration(nodeids, waits))
+        summaries[waits] = aggregate(runs, nodeids)
+    lines = [f"{'Тест':<58} {'паузы, с':>9} {'PageSettle, с':>13} {'выигрыш':>8}"]
+    totals = {"sleep": 0.0, "settle": 0.0}
+    for nodeid in nodeids:
+        sleep, settle = summaries["sleep"][nodeid]["wall"], summaries["settle"][nodeid]["wall"]
+        if sleep is None or settle is None:
+            lines.append(f"{nodeid:<58} нет замеров: тест упал во всех повторах")
+            continue
+        totals["sleep"] += sleep
+        totals["settle"] += settle
+        lines.append(f"{nodeid:<58} {sleep:>9.2f} {settle:>13.2f} {(sleep - settle) / sleep:>8.0%}")
+    if totals["sleep"]:
+        saved = (totals["sleep"] - totals["settle"]) / totals["sleep"]
+        lines.append(f"{'Итого':<58} {totals['sleep']:>9.2f} {totals['settle']:>13.2f} {saved:>8.0%}")
+    return summaries, "\n".join(lines)
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сценариев на локальном стенде")
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    parser.add_argument("--journeys", default=",".join(JOURNEYS),
+                        help="через запятую: " + ", ".join(JOURNEYS) + "; пустая строка - без сценариев")
+    parser.add_argument("--collect", action="store_true", help="замерить и время сбора тестов")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="записать медианы этого запуска как базу")
+    parser.add_argument("--threshold", type=float, help="допустимый рост для всех метрик, доля (0.1 = 10%%)")
+    parser.add_argument("--waits", action="store_true", help="сравнить PageSettle с прежними фиксированными паузами")
+    args = parser.parse_args()
+
+    nodeids = [nodeid for journey in args.journeys.split(",") if journey for nodeid in JOURNEYS[journey]]
+    if args.waits:
+        summaries, report = compare_waits(args.iterations, nodeids)
+        print(report)
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        with open(os.path.join(BENCH_DIR, f"waits-{time.strftime('%Y%m%d-%H%M%S')}.json"), "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2, ensure_ascii=False)
+        return 0
+    iterations = []
+    for number in range(args.iterations if nodeids else 0):
+        print(f"Повтор {number + 1} из {args.iterations}")
+        iterations.append(run_iteration(nodeids))
+    summary = aggregate(iterations, nodeids)
+    if args.collect:
+        summary[COLLECT] = measure_collection(args.iterations)
+
+    thresholds = {metric: args.threshold for metric in THRESHOLDS} if args.threshold is not None else THRESHOLDS
+    rows, regressions = compare(summary, load_baseline(args.baseline), thresholds)
+    print(format_report(rows, summary))
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    with open(os.path.join(BENCH_DIR, f"run-{time.strftime('%Y%m%d-%H%M%S')}.json"), "w", encoding="utf-8") as f:
+        json.dump({"iterations": iterations, "summary": summary}, f, indent=2, ensure_ascii=False)
+    failed = [nodeid for nodeid, stats in summary.items() if stats["failed"] or not stats["runs"]]
+    if args.save_baseline:
+        if failed:
+            print("База не сохранена: есть упавшие тесты")
+            return 1
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(f"База сохранена в {args.baseline}")
+        return 0
+    if regressions:
+        print("Регрессии: " + ", ".join(regressions))
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
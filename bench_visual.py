@@ -0,0 +1,95 @@
+import argparse
+import io
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+import visual
+
+# Бенчмарк визуальных сравнений на синтетических полностраничных снимках:
+# один процесс против пула процессов, плюс проверка, что сглаживание не считается расхождением,
+# а настоящее изменение - считается.
+# Запуск: python bench_visual.py [-n 200] [--width 1920] [--height 8000] [--workers 1,2,4]
+
+np, Image = visual.np, visual.Image
+
+
+def render_page(width, height, seed=1):
+    # Светлый фон, серые блоки-карточки и строки "текста" с размытыми краями, как у шрифтов
+    rng = np.random.default_rng(seed)
+    page = np.full((height, width, 3), 248, dtype=np.uint8)
+    for top in range(40, height - 300, 320):
+        for left in range(40, width - 400, 460):
+            page[top:top + 280, left:left + 420] = 232
+            for line in range(top + 200, top + 270, 22):
+                length = int(rng.integers(120, 380))
+                page[line:line + 12, left + 20:left + 20 + length] = 60
+    image = Image.fromarray(page)
+    # Размытие краёв имитирует сглаживание шрифтов
+    return np.asarray(image.resize((width // 2, height // 2)).resize((width, height), Image.Resampling.BILINEAR))
+
+
+def encode(array, compress_level=1):
+    output = io.BytesIO()
+    Image.fromarray(array).save(output, format="PNG", compress_level=compress_level)
+    return output.getvalue()
+
+
+def variants(width, height):
+    page = render_page(width, height)
+    # Те же пиксели, но другие байты PNG: сравнение не срезается по равенству файлов
+    same = encode(page, compress_level=6)
+    # Сдвиг на пиксель вправо: отличаются только края строк, как при другом сглаживании
+    shifted = page.copy()
+    shifted[:, 1:] = page[:, :-1]
+    # Настоящее изменение: другая цена в карточке и лишний блок
+    changed = page.copy()
+    changed[260:272, 60:300] = 248
+    changed[260:272, 60:200] = 60
+    changed[height // 2:height // 2 + 200, 100:900] = 180
+    return encode(page), {"same": (same, True), "antialiased": (encode(shifted), True), "changed": (encode(changed), False)}
+
+
+def run(pairs, workers):
+    start = time.perf_counter()
+    if workers == 0:
+        results = [visual.compare(baseline, current) for baseline, current in pairs]
+    else:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(visual.compare, *zip(*pairs)))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк визуальных сравнений")
+    parser.add_argument("-n", "--comparisons", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=8000)
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({0, 1, 2, 4, os.cpu_count() or 1})),
+                        help="размеры пула через запятую; 0 - в этом процессе")
+    args = parser.parse_args()
+    if np is None:
+        print("Нужны NumPy и Pillow")
+        return 1
+
+    baseline, cases = variants(args.width, args.height)
+    for name, (current, expected) in cases.items():
+        result = visual.compare(baseline, current)
+        status = "ок" if result["match"] == expected else "ОШИБКА"
+        print(f"{name:<12} совпал: {result['match']!s:<5} изменено {result['ratio']:.4%}, сглаживание {result['aliased']} пикс., "
+              f"pHash {result['hash_distance']}, {result['elapsed'] * 1000:.0f} мс  {status}")
+
+    names = list(cases)
+    pairs = [(baseline, cases[names[i % len(names)]][0]) for i in range(args.comparisons)]
+    print(f"\n{args.comparisons} сравнений снимков {args.width}x{args.height}")
+    print(f"{'Процессов':>9} {'время, с':>9} {'сравнений/с':>12} {'мс на снимок':>13}")
+    for workers in [int(n) for n in args.workers.split(",") if n]:
+        elapsed, results = run(pairs, workers)
+        per_item = statistics.median(result["elapsed"] for result in results) * 1000
+        print(f"{workers or 'этот':>9} {elapsed:>9.2f} {len(pairs) / elapsed:>12.1f} {per_item:>13.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
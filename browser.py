@@ -0,0 +1,90 @@
+import os
+import shutil
+from selenium import webdriver
+from selenium.webdriver.firefox.service import Service
+from selenium.webdriver.firefox.options import Options
+
+
+def resolve_path(env_name, executable, fallback):
+    # Явный путь из окружения, затем поиск в PATH (Linux/CI), затем старый путь для Windows
+    return os.environ.get(env_name) or shutil.which(executable) or fallback
+
+
+GECKODRIVER_PATH = resolve_path("GECKODRIVER_PATH", "geckodriver", r"C:\Users\Илья\Downloads\geckodriver-v0.36.0-win32\geckodriver.exe")
+FIREFOX_BINARY = resolve_path("FIREFOX_BINARY", "firefox", r"C:\Program Files\Mozilla Firefox\firefox.exe")
+
+# Профиль запуска: "default" - обычный Firefox с окном, "fast" - облегчённый headless
+PROFILE = os.environ.get("WEBTEST_PROFILE", "default")
+
+# Домены, которые не нужны проверкам: аналитика и шрифты
+BLOCKED_HOSTS = [host for host in os.environ.get(
+    "WEBTEST_BLOCKED_HOSTS",
+    "www.google-analytics.com,google-analytics.com,www.googletagmanager.com,"
+    "stats.g.doubleclick.net,connect.facebook.net,fonts.googleapis.com,fonts.gstatic.com",
+).split(",") if host]
+
+FAST_PREFS = {
+    "permissions.default.image": 2,
+    "image.animation_mode": "none",
+    "browser.display.use_document_fonts": 0,
+    "gfx.downloadable_fonts.enabled": False,
+    "ui.prefersReducedMotion": 1,
+    "toolkit.cosmeticAnimations.enabled": False,
+    "media.autoplay.default": 5,
+    "browser.shell.checkDefaultBrowser": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "app.update.auto": False,
+}
+
+
+def blocking_pac(hosts):
+    # PAC-скрипт отправляет запросы к заблокированным доменам на закрытый порт,
+    # так что они обрываются сразу, а не ждут ответа из сети
+    checks = " || ".join(f'dnsDomainIs(host, "{host}")' for host in hosts)
+    return ("data:text/plain,function FindProxyForURL(url, host) {"
+            f" if ({checks}) return 'PROXY 127.0.0.1:9'; return 'DIRECT'; }}")
+
+
+def fast_options(options):
+    options.add_argument("-headless")
+    options.page_load_strategy = "eager"
+    for name, value in FAST_PREFS.items():
+        options.set_preference(name, value)
+    if BLOCKED_HOSTS:
+        options.set_preference("network.proxy.type", 2)
+        options.set_preference("network.proxy.autoconfig_url", blocking_pac(BLOCKED_HOSTS))
+        options.set_preference("network.proxy.failover_direct", False)
+    return options
+
+
+def create_driver(headless=False, profile_dir=None, profile=None):
+    profile = profile or PROFILE
+    service = Service(GECKODRIVER_PATH)
+    options = Options()
+    options.binary_location = FIREFOX_BINARY
+    if profile == "fast":
+        fast_options(options)
+        headless = True
+    elif headless:
+        options.add_argument("-headless")
+    # Отдельный профиль = отдельные cookie, кэш и localStorage у каждого воркера
+    if profile_dir:
+        options.add_argument("-profile")
+        options.add_argument(str(profile_dir))
+    driver = webdriver.Firefox(service=service, options=options)
+    if headless:
+        driver.set_window_size(1920, 1080)
+    else:
+        driver.maximize_window()
+    return driver
+
+
+def browser_rss_mb(driver):
+    # Память всего дерева процессов Firefox (контентные процессы отдельные)
+    try:
+        import psutil
+    except ImportError:
+        return None
+    root = psutil.Process(driver.capabilities["moz:processID"])
+    processes = [root] + root.children(recursive=True)
+    return sum(process.memory_info().rss for process in processes) / 2 ** 20
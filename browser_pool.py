@@ -0,0 +1,123 @@
+import logging
+import queue
+import threading
+import time
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError
+
+logger = logging.getLogger()
+
+# Ошибки браузера, который упал: у погибшего geckodriver команды падают на уровне соединения
+BROWSER_ERRORS = (WebDriverException, HTTPError, OSError)
+
+_CLEAR_STORAGE_JS = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class BrowserPool:
+    def __init__(self, factory, size=1, max_uses=20):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.idle = queue.Queue()
+        self.uses = {}
+        self.lock = threading.Lock()
+        self.refills = []
+        self.started = False
+        self.stats = {"hits": 0, "misses": 0, "launches": 0, "recycled": 0, "failed": 0,
+                      "launch_time": 0.0}
+
+    def launch(self):
+        start = time.monotonic()
+        driver = self.factory()
+        elapsed = time.monotonic() - start
+        with self.lock:
+            self.uses[driver] = 0
+            self.stats["launches"] += 1
+            self.stats["launch_time"] += elapsed
+        logger.info("Запущен браузер для пула за %.1f с", elapsed)
+        return driver
+
+    def start(self):
+        # Пул запускается первым тестом, которому нужен браузер: он ждёт только свой экземпляр,
+        # остальные догреваются в фоне. Прогоны без браузерных тестов Firefox не запускают вовсе
+        self.started = True
+        for _ in range(self.size - 1):
+            self.refill()
+
+    def refill(self):
+        thread = threading.Thread(target=self.launch_idle, daemon=True)
+        thread.start()
+        self.refills.append(thread)
+
+    def launch_idle(self):
+        # Фоновый запуск: если браузер не поднялся, acquire() запустит свой синхронно
+        try:
+            self.idle.put(self.launch())
+        except Exception as e:
+            with self.lock:
+                self.stats["failed"] += 1
+            logger.warning("Фоновый запуск браузера для пула не удался: %s", e)
+
+    def acquire(self):
+        if not self.started:
+            self.start()
+        try:
+            driver = self.idle.get_nowait()
+            self.stats["hits"] += 1
+        except queue.Empty:
+            driver = self.launch()
+            self.stats["misses"] += 1
+        self.uses[driver] += 1
+        return driver
+
+    def release(self, driver):
+        if self.uses[driver] >= self.max_uses or not self.reset(driver):
+            self.recycle(driver)
+        else:
+            self.idle.put(driver)
+
+    def reset(self, driver):
+        # Возвращает браузер в чистое состояние; False - браузер упал или завис
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.execute_script(_CLEAR_STORAGE_JS)
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except BROWSER_ERRORS as e:
+            logger.warning("Браузер не прошёл сброс и будет перезапущен: %s", e)
+            return False
+
+    def recycle(self, driver):
+        self.stats["recycled"] += 1
+        self.uses.pop(driver, None)
+        try:
+            driver.quit()
+        except BROWSER_ERRORS:
+            pass
+        # Замена запускается в фоне, следующий тест скорее всего получит готовый браузер
+        self.refill()
+
+    def close(self):
+        for refill in self.refills:
+            refill.join()
+        while not self.idle.empty():
+            self.idle.get_nowait().quit()
+
+    def report(self):
+        stats = self.stats
+        requests = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / requests if requests else 0.0
+        avg_launch = stats["launch_time"] / stats["launches"] if stats["launches"] else 0.0
+        # Без пула каждый тест запускал бы свой браузер
+        saved = max(requests - stats["launches"], 0) * avg_launch
+        return (f"Пул браузеров: выдано {requests}, попаданий {stats['hits']} ({hit_rate:.0%}), "
+                f"запусков {stats['launches']} (не удалось в фоне {stats['failed']}), перезапусков {stats['recycled']}, "
+                f"средний запуск {avg_launch:.1f} с, сэкономлено на запусках {saved:.1f} с")
@@ -0,0 +1,133 @@
+import logging
+import os
+import subprocess
+import time
+from urllib.parse import urljoin
+import requests
+from session_cache import capture_browser, restore_browser
+
+logger = logging.getLogger()
+
+# Контрольные точки: состояние сервера и браузера снимается один раз после подготовки (логин, регистрация),
+# следующие тесты восстанавливают снимок вместо повторной подготовки через UI.
+# Сервер - локальный стенд (копия состояния в памяти) или локальный OpenCart (дамп MySQL).
+# С удалённым магазином снимать нечего: подготовка выполняется перед каждым тестом, как раньше.
+CHECKPOINT_DIR = os.path.join(".webtest", "checkpoints")
+ENABLED = os.environ.get("WEBTEST_CHECKPOINTS", "1") == "1"
+
+MYSQL_DATABASE = os.environ.get("WEBTEST_MYSQL_DATABASE")
+MYSQL_HOST = os.environ.get("WEBTEST_MYSQL_HOST", "127.0.0.1")
+MYSQL_USER = os.environ.get("WEBTEST_MYSQL_USER", "root")
+MYSQL_PASSWORD = os.environ.get("WEBTEST_MYSQL_PASSWORD", "")
+# Таблицы, которые восстановление не трогает: сессии админки и API-клиентов остаются действительными
+MYSQL_KEEP_TABLES = [table for table in os.environ.get("WEBTEST_MYSQL_KEEP_TABLES", "oc_session").split(",") if table]
+
+
+class StandinServer:
+    # Снимок хранится в самом стенде: глубокая копия состояния, восстановление - миллисекунды
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.http = requests.Session()
+
+    def call(self, action, name):
+        response = self.http.post(urljoin(self.base_url, f"__webtest/{action}"), params={"name": name}, timeout=30)
+        response.raise_for_status()
+
+    def save(self, name):
+        self.call("checkpoint", name)
+
+    def restore(self, name):
+        self.call("restore", name)
+
+
+class MysqlServer:
+    # Локальный OpenCart: дамп базы в файл, восстановление - загрузка дампа
+    def __init__(self, database, worker_id="master", host=MYSQL_HOST, user=MYSQL_USER, password=MYSQL_PASSWORD,
+                 keep_tables=MYSQL_KEEP_TABLES):
+        self.database = database
+        self.worker_id = worker_id
+        self.host = host
+        self.user = user
+        self.keep_tables = keep_tables
+        # Пароль через окружение, чтобы он не попал в список процессов
+        self.env = dict(os.environ, MYSQL_PWD=password)
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(CHECKPOINT_DIR, f"{self.database}-{self.worker_id}-{name}.sql")
+
+    def save(self, name):
+        ignored = [f"--ignore-table={self.database}.{table}" for table in self.keep_tables]
+        with open(self.path(name), "wb") as f:
+            subprocess.run(["mysqldump", "-h", self.host, "-u", self.user, "--single-transaction", *ignored, self.database],
+                           stdout=f, env=self.env, check=True)
+
+    def restore(self, name):
+        with open(self.path(name), "rb") as f:
+            subprocess.run(["mysql", "-h", self.host, "-u", self.user, self.database], stdin=f, env=self.env, check=True)
+
+
+def server_backend(standin_url=None, worker_id="master"):
+    # standin_url - стенд этого процесса; WEBTEST_CHECKPOINTS_URL - стенд, запущенный отдельно (opencart_standin.py).
+    # Общий стенд или базу восстанавливает только одиночный прогон: под xdist восстановление одним воркером
+    # стёрло бы данные, которые тесты других воркеров создали в это время
+    if not ENABLED:
+        return None
+    if standin_url:
+        return StandinServer(standin_url)
+    url = os.environ.get("WEBTEST_CHECKPOINTS_URL")
+    if not url and not MYSQL_DATABASE:
+        return None
+    if worker_id != "master":
+        logger.warning("Контрольные точки сервера выключены: стенд или база общие для воркеров xdist")
+        return None
+    return StandinServer(url) if url else MysqlServer(MYSQL_DATABASE, worker_id)
+
+
+class Checkpoints:
+    def __init__(self, server=None):
+        self.server = server
+        # Имя -> состояние браузера на момент снимка
+        self.browsers = {}
+        self.stats = {"saved": 0, "restored": 0, "save_time": 0.0, "restore_time": 0.0, "setup_time": 0.0}
+
+    @property
+    def enabled(self):
+        return self.server is not None
+
+    def save(self, name, driver):
+        start = time.perf_counter()
+        self.server.save(name)
+        self.browsers[name] = capture_browser(driver)
+        self.stats["saved"] += 1
+        self.stats["save_time"] += time.perf_counter() - start
+
+    def restore(self, name, driver):
+        start = time.perf_counter()
+        self.server.restore(name)
+        restore_browser(driver, self.browsers[name])
+        elapsed = time.perf_counter() - start
+        self.stats["restored"] += 1
+        self.stats["restore_time"] += elapsed
+        logger.debug("Контрольная точка %s восстановлена за %.3f с", name, elapsed)
+
+    def ensure(self, name, driver, setup):
+        # Первый тест выполняет подготовку и снимает состояние, следующие восстанавливают снимок
+        if not self.enabled:
+            setup()
+            return
+        if name in self.browsers:
+            self.restore(name, driver)
+            return
+        start = time.perf_counter()
+        setup()
+        self.stats["setup_time"] += time.perf_counter() - start
+        self.save(name, driver)
+        logger.info("Контрольная точка %s снята", name)
+
+    def report(self):
+        stats = self.stats
+        average = stats["restore_time"] / stats["restored"] * 1000 if stats["restored"] else 0.0
+        return (f"Контрольные точки: снято {stats['saved']} (подготовка {stats['setup_time']:.2f} с, "
+                f"снимок {stats['save_time']:.2f} с), восстановлено {stats['restored']} "
+                f"за {stats['restore_time']:.2f} с, в среднем {average:.0f} мс")
@@ -0,0 +1,356 @@
+import json
+import logging
+import os
+import time
+import allure
+import pytest
+import settings
+from artifacts import pipeline
+from browser import create_driver
+from browser_pool import BrowserPool
+from checkpoints import Checkpoints, server_backend
+from data_factory import DataFactory, new_run_id, reap
+from http_cache import CachingProxy, ResponseCache
+import impact
+import logs
+from opencart_standin import OpenCartStandin
+import page_perf
+import retry
+import timeouts
+from session_cache import SessionCache
+import tabs
+import visual
+from timing import format_table, instrument_driver, merge_runs, recorder, save_run, summarize
+from waits import settle_report
+
+logger = logging.getLogger()
+
+# Длительности тестов прошлых прогонов - по ним тесты раздаются воркерам
+DURATIONS_FILE = os.path.join(".webtest", "durations.json")
+
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+new_durations = {}
+
+
+def is_worker(config):
+    return hasattr(config, "workerinput")
+
+
+def load_durations():
+    try:
+        with open(DURATIONS_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_controller(config):
+    return not is_worker(config) and bool(getattr(config.option, "numprocesses", None))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("webtest")
+    group.addoption("--impact-trace", action="store_true",
+                    help="записать, какие page objects и страницы задействует каждый тест")
+    group.addoption("--impact-diff", metavar="REF",
+                    help="запустить только тесты, затронутые изменениями относительно git REF")
+    group.addoption("--impact-pages", action="store_true",
+                    help="запустить только тесты, чьи страницы изменились с последней записи карты")
+
+
+def pytest_configure(config):
+    # Лог воркера пишется в свой файл; на консоль - только без xdist и у контроллера
+    logs.pipeline.setup(WORKER_ID, console=not is_worker(config))
+    config.durations = load_durations()
+    config.addinivalue_line("markers", "perf_budget(page, **limits): бюджет скорости страницы, "
+                                       "например perf_budget(\"category\", dcl=800, requests=60)")
+    # Общий идентификатор прогона: воркеры xdist наследуют окружение контроллера
+    if not is_worker(config):
+        os.environ.setdefault("WEBTEST_RUN_ID", new_run_id())
+    if config.getoption("impact_trace"):
+        impact.tracer.enable()
+    # Локальный стенд: у каждого процесса (воркера) свой, со своим состоянием в памяти
+    config.standin = None
+    if os.environ.get("WEBTEST_STANDIN") == "1" and not is_controller(config):
+        config.standin = OpenCartStandin().start()
+        settings.BASE_URL = config.standin.base_url
+    # Кэш витрины: WEBTEST_HTTP_CACHE=1 - воспроизводить записанное, record - перезаписать
+    config.http_cache = None
+    mode = os.environ.get("WEBTEST_HTTP_CACHE")
+    if mode and not is_controller(config):
+        cache = ResponseCache(max_bytes=int(os.environ.get("WEBTEST_HTTP_CACHE_MB", "200")) * 2 ** 20)
+        config.http_cache = CachingProxy(settings.BASE_URL, cache, record=mode == "record").start()
+        settings.BASE_URL = config.http_cache.base_url
+
+
+def pytest_unconfigure(config):
+    if getattr(config, "http_cache", None):
+        logger.info(config.http_cache.report())
+        config.http_cache.stop()
+    if getattr(config, "standin", None):
+        config.standin.stop()
+    if not is_worker(config):
+        logs.pipeline.stop()
+        logs.merge_runs()
+
+
+def pytest_collection_modifyitems(config, items):
+    diff_ref = config.getoption("impact_diff")
+    if diff_ref or config.getoption("impact_pages"):
+        selected, deselected = impact.select(items, diff_ref, config.getoption("impact_pages"))
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+    # Самые долгие тесты идут первыми (LPT): xdist раздаёт их по порядку,
+    # и короткие тесты добивают хвост на освободившихся воркерах.
+    # Тесты без истории считаем самыми долгими, чтобы не оставить их на конец.
+    durations = config.durations
+    unknown = max(durations.values(), default=0) + 1
+    items.sort(key=lambda item: -durations.get(item.nodeid, unknown))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    # Снимок при падении делается, пока браузер ещё не сброшен фикстурой driver
+    driver = item.funcargs.get("driver") if hasattr(item, "funcargs") else None
+    if report.failed and report.when in ("setup", "call") and driver is not None:
+        try:
+            pipeline.capture(driver, f"Failure-{report.when}", force=True)
+        except Exception as e:
+            logger.warning("Скриншот при падении не снят: %s", e)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    result = yield
+    # Сравнения снимков с эталонами дожидаемся здесь: расхождение роняет сам тест, а не его teardown
+    pipeline.wait()
+    visual.engine.check(item.nodeid)
+    return result
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    logs.context["test"] = item.nodeid
+    start = time.perf_counter()
+    yield
+    logger.info("Тест %s завершён", item.nodeid, extra={"duration": time.perf_counter() - start})
+    logs.context["test"] = None
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "call":
+        new_durations[report.nodeid] = report.duration
+
+
+def pytest_sessionstart(session):
+    # WEBTEST_REAP=1 - перед прогоном удалить данные упавших прогонов (у локального стенда их не бывает)
+    if os.environ.get("WEBTEST_REAP") == "1" and os.environ.get("WEBTEST_STANDIN") != "1" and not is_worker(session.config):
+        reap()
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if is_worker(config):
+        # Файл лога дописывается до того, как xdist сообщит контроллеру о завершении воркера
+        logs.pipeline.stop()
+        return
+    merge_runs()
+    impact.merge_runs()
+    retry.merge_runs()
+    timeouts.merge_runs()
+    page_perf.merge_runs()
+    if not new_durations:
+        return
+    durations = dict(config.durations)
+    durations.update(new_durations)
+    os.makedirs(os.path.dirname(DURATIONS_FILE), exist_ok=True)
+    with open(DURATIONS_FILE, "w", encoding="utf-8") as f:
+        json.dump(durations, f, indent=2, ensure_ascii=False)
+
+
+@pytest.fixture(scope="session")
+def browser_pool(tmp_path_factory):
+    # В параллельном режиме у каждого воркера свой пул headless Firefox, у каждого браузера свой профиль
+    parallel = WORKER_ID != "master"
+    headless = parallel or os.environ.get("WEBTEST_HEADLESS") == "1"
+    size = int(os.environ.get("WEBTEST_POOL_SIZE", "1"))
+    max_uses = int(os.environ.get("WEBTEST_POOL_MAX_USES", "20"))
+
+    def factory():
+        profile_dir = tmp_path_factory.mktemp(f"firefox-{WORKER_ID}") if parallel else None
+        driver = create_driver(headless=headless, profile_dir=profile_dir)
+        if impact.tracer.enabled:
+            driver = impact.tracer.instrument(driver)
+        return instrument_driver(driver)
+
+    # Браузеры запускаются при первой выдаче, а не при создании пула
+    pool = BrowserPool(factory, size=size, max_uses=max_uses)
+    yield pool
+    pool.close()
+    report = pool.report()
+    logger.info(report)
+    allure.attach(report, name="BrowserPoolReport", attachment_type=allure.attachment_type.TEXT)
+
+
+@pytest.fixture
+def driver(browser_pool):
+    # Браузер берётся тёплым из пула и после теста сбрасывается, а не закрывается:
+    # корзина, cookie и localStorage одного теста не попадают в следующий
+    driver = browser_pool.acquire()
+    yield driver
+    browser_pool.release(driver)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def artifact_pipeline():
+    # WEBTEST_SCREENSHOTS: failure | explicit | steps; уменьшение и сжатие работают при установленном Pillow
+    pipeline.configure(
+        policy=os.environ.get("WEBTEST_SCREENSHOTS", "explicit"),
+        scale=float(os.environ.get("WEBTEST_SCREENSHOT_SCALE", "1.0")),
+        compress_level=int(os.environ.get("WEBTEST_SCREENSHOT_COMPRESSION", "6")),
+        dom=os.environ.get("WEBTEST_DOM_SNAPSHOTS") == "1",
+        max_queue=int(os.environ.get("WEBTEST_ARTIFACT_QUEUE", "32")),
+    ).start()
+    yield pipeline
+    pipeline.stop()
+    report = pipeline.report()
+    logger.info("Скриншоты:\n%s", report)
+    allure.attach(report, name="ArtifactReport", attachment_type=allure.attachment_type.TEXT)
+
+
+@pytest.fixture(autouse=True)
+def step_artifacts(request):
+    pipeline.begin(request.node)
+    yield
+    pipeline.finish(request.node)
+
+
+@pytest.fixture(autouse=True)
+def impact_trace(request):
+    if not impact.tracer.enabled:
+        yield
+        return
+    impact.tracer.begin(request.node)
+    yield
+    impact.tracer.end(request.node)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def impact_map():
+    yield
+    if impact.tracer.enabled:
+        impact.save_run(WORKER_ID)
+
+
+@pytest.fixture(scope="session")
+def data_factory():
+    # Уникальные имена и адреса для данных тестов; остатки удаляются в конце сессии воркера
+    factory = DataFactory(worker_id=WORKER_ID)
+    yield factory
+    factory.cleanup()
+
+
+@pytest.fixture(scope="session")
+def session_cache():
+    ttl = int(os.environ.get("WEBTEST_SESSION_TTL", "1800"))
+    cache = SessionCache(ttl=ttl)
+    yield cache
+    report = cache.report()
+    logger.info(report)
+    allure.attach(report, name="SessionCacheReport", attachment_type=allure.attachment_type.TEXT)
+
+
+@pytest.fixture(scope="session")
+def checkpoints(request):
+    # Снимки состояния стенда (или локальной базы) и браузера после подготовки тестов
+    standin = request.config.standin
+    points = Checkpoints(server_backend(standin.base_url if standin else None, WORKER_ID))
+    yield points
+    if not points.stats["saved"]:
+        return
+    report = points.report()
+    logger.info(report)
+    allure.attach(report, name="CheckpointReport", attachment_type=allure.attachment_type.TEXT)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def settle_summary():
+    yield
+    report = settle_report()
+    logger.info("Отчёт по ожиданиям:\n%s", report)
+    allure.attach(report, name="SettleReport", attachment_type=allure.attachment_type.TEXT)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def step_timings():
+    yield
+    if not recorder.samples:
+        return
+    table = format_table(summarize(recorder.samples))
+    logger.info("Длительность шагов:\n%s", table)
+    allure.attach(table, name="StepTimings", attachment_type=allure.attachment_type.TEXT)
+    save_run(WORKER_ID)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def flake_report():
+    yield
+    if not retry.flakes.steps:
+        return
+    report = retry.flakes.report()
+    logger.info("Повторы шагов:\n%s", report)
+    allure.attach(report, name="FlakeReport", attachment_type=allure.attachment_type.TEXT)
+    retry.flakes.save_run(WORKER_ID)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def timeout_profile():
+    # Задержки ожиданий этого прогона пополняют профиль, из которого выводятся тайм-ауты
+    yield
+    timeouts.profile.save_run(WORKER_ID)
+
+
+@pytest.fixture(autouse=True)
+def perf_budgets(request):
+    # Бюджеты из маркеров perf_budget действуют до конца теста; маркер теста важнее маркера модуля
+    marks = reversed(list(request.node.iter_markers("perf_budget")))
+    page_perf.perf.budgets = {mark.args[0]: mark.kwargs for mark in marks}
+    yield
+    page_perf.perf.budgets = {}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def page_perf_report():
+    yield
+    if not page_perf.perf.samples:
+        return
+    table = page_perf.format_table(page_perf.summarize(page_perf.perf.samples))
+    logger.info("Скорость страниц:\n%s", table)
+    allure.attach(table, name="PagePerf", attachment_type=allure.attachment_type.TEXT)
+    page_perf.perf.save_run(WORKER_ID)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tab_report():
+    yield
+    if not tabs.stats.runs:
+        return
+    report = tabs.stats.report()
+    logger.info("Проверки во вкладках:\n%s", report)
+    allure.attach(report, name="TabThroughput", attachment_type=allure.attachment_type.TEXT)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def visual_report():
+    visual.engine.start()
+    yield
+    visual.engine.stop()
+    if not any(visual.engine.stats[key] for key in ("compared", "missing", "updated")):
+        return
+    report = visual.engine.report()
+    logger.info(report)
+    allure.attach(report, name="VisualReport", attachment_type=allure.attachment_type.TEXT)
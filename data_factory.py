@@ -0,0 +1,120 @@
+import argparse
+import glob
+import itertools
+import json
+import logging
+import os
+import re
+import secrets
+import time
+import settings
+from seeding import PURGE_PASSES, AdminSeeder
+
+logger = logging.getLogger()
+
+# Тестовые данные с уникальными именами: префикс прогона и воркера не даёт тестам
+# пересекаться между собой и с прошлыми прогонами, а по нему же данные удаляются.
+# Имя: "wt-<время прогона hex><случайное>-<воркер>-<номер> <имя из теста>"
+
+REGISTRY_DIR = os.path.join(".webtest", "data")
+PREFIX = "wt-"
+# Данные упавших прогонов старше этого возраста удаляет reap()
+REAP_AGE = 2 * 3600
+
+NAME_RE = re.compile(r"^wt-([0-9a-f]{8})[0-9a-f]*-")
+
+ADMIN_ENTITIES = ("product", "category")
+
+
+def new_run_id():
+    return f"{int(time.time()):x}{secrets.token_hex(2)}"
+
+
+def run_age(name):
+    match = NAME_RE.match(name)
+    return time.time() - int(match.group(1), 16) if match else None
+
+
+class DataFactory:
+    def __init__(self, run_id=None, worker_id="master"):
+        self.run_id = run_id or os.environ.get("WEBTEST_RUN_ID") or new_run_id()
+        self.namespace = f"{PREFIX}{self.run_id}-{worker_id}"
+        self.counter = itertools.count(1)
+        self.registry = {"category": [], "product": [], "customer": []}
+        self.path = os.path.join(REGISTRY_DIR, f"{self.namespace}.json")
+
+    def name(self, base, kind="product"):
+        name = f"{self.namespace}-{next(self.counter)} {base}"
+        self.register(kind, name)
+        return name
+
+    def email(self, local="user"):
+        email = f"{local}+{self.namespace}-{next(self.counter)}@example.com"
+        self.register("customer", email)
+        return email
+
+    def register(self, kind, value):
+        # Реестр пишется сразу: после падения процесса по нему найдутся оставшиеся данные
+        self.registry[kind].append(value)
+        os.makedirs(REGISTRY_DIR, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registry, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def cleanup(self):
+        # Всё, что осталось от тестов этого воркера, удаляется пачками по префиксу.
+        # Покупателей OpenCart удалять через API не даёт: уникальные адреса просто остаются.
+        if self.registry["category"] or self.registry["product"]:
+            seeder = admin_seeder()
+            # Префикс с дефисом: иначе "wt-<прогон>-gw1" задел бы данные воркеров gw10..gw19
+            removed = {entity: seeder.purge(entity, self.namespace + "-") for entity in ADMIN_ENTITIES}
+            logger.info("Данные прогона %s удалены: %s", self.namespace, removed)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def admin_seeder():
+    seeder = AdminSeeder()
+    seeder.login(settings.ADMIN_USERNAME, settings.ADMIN_PASSWORD)
+    return seeder
+
+
+def reap(max_age=REAP_AGE, seeder=None):
+    # Удаляет данные упавших прогонов: сначала по оставшимся реестрам, затем по общему префиксу.
+    # Автодополнение OpenCart отдаёт не больше пяти записей, поэтому поиск по префиксу
+    # останавливается, когда среди найденных не осталось устаревших (свежие - чужие живые прогоны).
+    seeder = seeder or admin_seeder()
+    removed = 0
+    for path in glob.glob(os.path.join(REGISTRY_DIR, f"{PREFIX}*.json")):
+        namespace = os.path.basename(path)[:-5]
+        age = run_age(namespace + "-")
+        if age is None or age < max_age:
+            continue
+        removed += sum(seeder.purge(entity, namespace + "-") for entity in ADMIN_ENTITIES)
+        os.remove(path)
+    for entity in ADMIN_ENTITIES:
+        previous = None
+        for _ in range(PURGE_PASSES):
+            stale = [item[f"{entity}_id"] for item in seeder.search(entity, PREFIX)
+                     if (run_age(item["name"]) or 0) >= max_age]
+            # Те же записи второй раз подряд - удаление не действует, повторять бессмысленно
+            if not stale or stale == previous:
+                break
+            seeder.delete(entity, stale)
+            removed += len(stale)
+            previous = stale
+    logger.info("Удалено записей упавших прогонов: %s", removed)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Удаление тестовых данных упавших прогонов")
+    parser.add_argument("--max-age", type=float, default=REAP_AGE / 3600, help="часов с начала прогона")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    reap(args.max_age * 3600)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import hashlib
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+logger = logging.getLogger()
+
+CACHE_DIR = os.path.join(".webtest", "http_cache")
+
+# Запросы, меняющие состояние или зависящие от сессии, всегда идут на сервер
+PASS_THROUGH_ROUTES = ("checkout/", "account/", "/write", "review", "common/currency", "wishlist", "product/search")
+
+# Cookie, от которых зависит содержимое витрины
+KEY_COOKIES = ("currency", "language")
+
+# Шапка страниц витрины зависит от сессии (сумма корзины, "My Account" или ссылки входа),
+# поэтому страницы кэшируются отдельно для каждой сессии, а любой запрос сессии мимо кэша
+# (корзина, вход, вишлист) делает её записанные страницы устаревшими. Сессию без cookie
+# кэш не различает: такие страницы общие для всех новых браузеров.
+# Статика от сессии не зависит и общая для всех.
+SESSION_COOKIE = "OCSESSID"
+STATIC_SUFFIXES = (".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".woff", ".woff2", ".ttf")
+
+TEXT_TYPES = ("text/", "application/javascript", "application/json", "application/x-javascript")
+
+HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "content-encoding",
+               "proxy-connection", "upgrade", "te", "trailer"}
+
+
+class ResponseCache:
+    # Записи лежат отдельными файлами, поэтому общий каталог безопасен для нескольких воркеров.
+    # Вытеснение LRU: время последнего использования - mtime файла с метаданными.
+    def __init__(self, directory=CACHE_DIR, max_bytes=200 * 2 ** 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(os.path.getsize(os.path.join(directory, name))
+                        for name in os.listdir(directory) if name.endswith(".bin"))
+
+    def paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".bin"
+
+    def get(self, key):
+        meta_path, body_path = self.paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        os.utime(meta_path)
+        return meta, body
+
+    def put(self, key, meta, body):
+        meta_path, body_path = self.paths(key)
+        for path, data, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta).encode("utf-8"), "wb")):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self.lock:
+            self.size += len(body)
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                meta_path = os.path.join(self.directory, name)
+                body_path = meta_path[:-5] + ".bin"
+                try:
+                    entries.append((os.path.getmtime(meta_path), meta_path, body_path, os.path.getsize(body_path)))
+                except OSError:
+                    continue
+        self.size = sum(entry[3] for entry in entries)
+        # Освобождаем место с запасом, чтобы не вытеснять на каждой записи
+        target = self.max_bytes * 0.9
+        for _, meta_path, body_path, size in sorted(entries):
+            if self.size <= target:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.size -= size
+
+
+class CachingProxyHandler(BaseHTTPRequestHandler):
+    server_version = "WebtestCache/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug("http_cache: " + format, *args)
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_HEAD(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def session(self):
+        if urlsplit(self.path).path.lower().endswith(STATIC_SUFFIXES):
+            return None
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+
+    def cache_key(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        parts = [self.command, self.path] + [f"{name}={cookie[name].value}" for name in KEY_COOKIES if name in cookie]
+        parts.append(f"{SESSION_COOKIE}={self.session() or ''}")
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def cacheable(self):
+        if self.command not in ("GET", "HEAD") or self.path.startswith("/admin"):
+            return False
+        return not any(route in self.path for route in PASS_THROUGH_ROUTES)
+
+    def handle_request(self):
+        proxy = self.server.proxy
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)) if self.command == "POST" else None
+        if not self.cacheable():
+            if self.command not in ("GET", "HEAD") and self.path.startswith("/admin"):
+                proxy.catalog_changed()
+            elif self.session():
+                proxy.session_changed(self.session())
+            proxy.count("passed")
+            return self.reply(*self.fetch(body))
+
+        key = self.cache_key()
+        cached = None if proxy.record else proxy.cache.get(key)
+        if cached and proxy.stale(cached[0], self.session()):
+            cached = None
+        if cached:
+            meta, data = cached
+            proxy.count("hits", len(data))
+            return self.reply(meta["status"], meta["headers"], data)
+
+        status, headers, data = self.fetch(body)
+        proxy.count("misses")
+        if status == 200:
+            # Set-Cookie не сохраняем: повтор чужой сессии испортил бы корзину браузера
+            stored = [(name, value) for name, value in headers if name.lower() != "set-cookie"]
+            proxy.cache.put(key, {"status": status, "headers": stored, "url": self.path, "recorded": time.time()}, data)
+        self.reply(status, headers, data)
+
+    def fetch(self, body):
+        proxy = self.server.proxy
+        connection_class = http.client.HTTPSConnection if proxy.upstream.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(proxy.upstream.netloc, timeout=60)
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_HEADERS | {"host", "accept-encoding"}}
+        headers["Host"] = proxy.upstream.netloc
+        try:
+            connection.request(self.command, self.path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, [(name, value) for name, value in response.getheaders()
+                                     if name.lower() not in HOP_HEADERS], response.read()
+        finally:
+            connection.close()
+
+    def reply(self, status, headers, data):
+        proxy = self.server.proxy
+        content_type = next((value for name, value in headers if name.lower() == "content-type"), "")
+        if content_type.startswith(TEXT_TYPES):
+            data = proxy.rewrite(data)
+        self.send_response(status)
+        for name, value in headers:
+            if name.lower() == "location":
+                value = proxy.rewrite(value.encode("utf-8")).decode("utf-8")
+            elif name.lower() == "set-cookie":
+                # Прокси работает по http на localhost: атрибуты Domain и Secure мешают браузеру принять cookie
+                value = "; ".join(part for part in value.split("; ")
+                                  if not part.lower().startswith("domain=") and part.lower() != "secure")
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+
+class CachingProxy:
+    def __init__(self, upstream, cache=None, host="127.0.0.1", port=0, record=False):
+        self.upstream = urlsplit(upstream)
+        self.cache = cache or ResponseCache()
+        self.record = record
+        self.stats = {"hits": 0, "misses": 0, "passed": 0, "bytes_saved": 0}
+        self.stats_lock = threading.Lock()
+        # Время последнего изменяющего запроса к админке: страницы витрины, записанные раньше, устарели
+        self.changed_at = 0.0
+        # То же для отдельных сессий: время последнего запроса сессии мимо кэша
+        self.sessions_changed = {}
+        self.httpd = ThreadingHTTPServer((host, port), CachingProxyHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.proxy = self
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def rewrite(self, data):
+        # Абсолютные ссылки на исходный сайт заменяются ссылками на прокси
+        origin = f"{self.upstream.scheme}://{self.upstream.netloc}".encode("utf-8")
+        local = self.base_url.rstrip("/").encode("utf-8")
+        data = data.replace(origin, local).replace(origin.replace(b"/", b"\\/"), local.replace(b"/", b"\\/"))
+        return data.replace(b"//" + self.upstream.netloc.encode("utf-8"), b"//" + local.split(b"//", 1)[1])
+
+    def catalog_changed(self):
+        self.changed_at = time.time()
+
+    def session_changed(self, session):
+        self.sessions_changed[session] = time.time()
+
+    def stale(self, meta, session=None):
+        # Картинки, стили и скрипты от каталога не зависят, а HTML витрины после правок в админке
+        # или действий своей сессии перезапрашивается
+        content_type = next((value for name, value in meta["headers"] if name.lower() == "content-type"), "")
+        changed_at = max(self.changed_at, self.sessions_changed.get(session, 0.0))
+        return content_type.startswith("text/html") and meta["recorded"] < changed_at
+
+    def count(self, name, size=0):
+        with self.stats_lock:
+            self.stats[name] += 1
+            self.stats["bytes_saved"] += size
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        logger.info("Кэширующий прокси %s -> %s", self.base_url, self.upstream.geturl())
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def report(self):
+        stats = self.stats
+        return (f"HTTP-кэш: из кэша {stats['hits']} запросов ({stats['bytes_saved'] / 2 ** 20:.1f} МБ), "
+                f"записано {stats['misses']}, напрямую {stats['passed']}, размер кэша {self.cache.size / 2 ** 20:.1f} МБ")
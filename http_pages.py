@@ -0,0 +1,152 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import requests
+import settings
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+logger = logging.getLogger()
+
+# HTTP-реализация запросов MainPage и CartPage: страница скачивается и разбирается lxml без браузера.
+# Подходит для проверок серверной разметки (товар есть в поиске, категория пуста, товар в корзине);
+# всё, что зависит от JavaScript и вёрстки, проверяется браузером.
+
+
+class HttpBackend:
+    def __init__(self, cookies=None):
+        if lxml is None:
+            raise RuntimeError("Для HTTP-проверок нужны пакеты lxml и cssselect")
+        self.session = requests.Session()
+        for cookie in cookies or []:
+            self.session.cookies.set(cookie["name"], cookie["value"], path=cookie.get("path", "/"))
+        self.url = None
+        self.document = None
+
+    @classmethod
+    def from_driver(cls, driver):
+        # Cookie браузера переносятся в HTTP-сессию: корзина и вход покупателя те же, что в браузере
+        return cls(driver.get_cookies())
+
+    def clone(self):
+        return HttpBackend([{"name": cookie.name, "value": cookie.value, "path": cookie.path}
+                            for cookie in self.session.cookies])
+
+    def get(self, url):
+        response = self.session.get(urljoin(settings.BASE_URL, url), timeout=30)
+        response.raise_for_status()
+        self.url = response.url
+        self.document = lxml.html.fromstring(response.content, base_url=response.url)
+        return self.document
+
+    def html(self):
+        return lxml.html.tostring(self.document, encoding="unicode") if self.document is not None else None
+
+    def select(self, selector):
+        return self.document.cssselect(selector)
+
+    def link(self, text):
+        # Аналог By.LINK_TEXT: видимый текст ссылки целиком, без крайних пробелов
+        links = self.document.xpath("//a[normalize-space(.)=$text]", text=text)
+        return urljoin(self.url, links[0].get("href")) if links else None
+
+
+def text_of(element):
+    return element.text_content().strip() if element is not None else ""
+
+
+class HttpMainPage:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open(self):
+        self.backend.get(settings.BASE_URL)
+        logger.info("HTTP: открыта главная страница")
+
+    def go_to_category(self, category_name, subcategory_name=None):
+        if self.backend.document is None:
+            self.open()
+        url = self.backend.link(subcategory_name or category_name)
+        if url is None:
+            raise LookupError(f"Категория не найдена: {subcategory_name or category_name}")
+        self.backend.get(url)
+        logger.info("HTTP: переход в категорию %s %s", category_name, subcategory_name or '')
+
+    def search_product(self, product_name):
+        self.backend.get(f"index.php?route=product/search&search={requests.utils.quote(product_name)}")
+        logger.info("HTTP: поиск товара %s", product_name)
+
+    def content_text(self, selector="#content p"):
+        elements = self.backend.select(selector)
+        return text_of(elements[0]) if elements else ""
+
+    def has_link(self, text):
+        return self.backend.link(text) is not None
+
+    def product_cards(self):
+        # Те же поля, что PRODUCT_CARDS_JS, кроме кнопок: вместо WebElement - адрес товара
+        cards = []
+        for card in self.backend.select(".product-layout"):
+            title = card.cssselect("h4 a")
+            price = card.cssselect(".price")
+            price_text = ""
+            if price:
+                price_new = price[0].cssselect(".price-new")
+                price_text = text_of(price_new[0]) if price_new else (price[0].text or "").strip()
+            cards.append({
+                "name": text_of(title[0]) if title else "",
+                "price": price_text,
+                "link": urljoin(self.backend.url, title[0].get("href")) if title else None,
+            })
+        return cards
+
+    def find_product(self, product_name):
+        for product in self.product_cards():
+            if product_name.lower() in product["name"].lower():
+                return product
+        return None
+
+    def search_many(self, product_names, workers=8):
+        # Поиски независимы, поэтому идут параллельно, каждый в своей копии сессии
+        def search(name):
+            page = HttpMainPage(self.backend.clone())
+            page.search_product(name)
+            return name, page.has_link(name)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(executor.map(search, product_names))
+
+
+class HttpCartPage:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open(self):
+        self.backend.get("index.php?route=checkout/cart")
+        logger.info("HTTP: открыта корзина")
+
+    def cart_items(self):
+        # Те же поля, что CART_ROWS_JS
+        rows = []
+        for row in self.backend.select("table.table-bordered tbody tr"):
+            link = row.cssselect("td.text-left a")
+            if not link:
+                continue
+            quantity = row.cssselect("input[name^='quantity']")
+            cells = row.cssselect("td.text-right")
+            rows.append({
+                "name": text_of(link[0]),
+                "quantity": quantity[0].get("value", "") if quantity else "",
+                "total": text_of(cells[-1]) if cells else "",
+            })
+        return rows
+
+    def is_product_in_cart(self, product_name):
+        if any(product_name.lower() in item["name"].lower() for item in self.cart_items()):
+            logger.info("HTTP: товар %s найден в корзине", product_name)
+            return True
+        logger.warning("HTTP: товар %s не найден в корзине", product_name)
+        return False
@@ -0,0 +1,287 @@
+import ast
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+import settings
+from timing import recorder
+
+logger = logging.getLogger()
+
+# Карта влияния: какие шаги page objects, фикстуры и страницы задействует каждый тест
+IMPACT_DIR = os.path.join(".webtest", "impact")
+IMPACT_FILE = os.path.join(".webtest", "impact.json")
+
+# Команды, после которых может смениться страница; адрес читается по завершении шага
+NAVIGATING_COMMANDS = ("clickElement", "goBack", "goForward", "refresh")
+
+# Параметры адреса, которые меняются от сессии к сессии
+VOLATILE_PARAMS = ("user_token",)
+
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+MODULE = "*"
+
+
+def page_path(url):
+    # Адрес без BASE_URL и токенов, чтобы карта подходила и для стенда, и для прокси
+    if not url.startswith(settings.BASE_URL):
+        return None
+    parts = urlsplit(url[len(settings.BASE_URL):])
+    query = [(name, value) for name, value in parse_qsl(parts.query) if name not in VOLATILE_PARAMS]
+    return parts.path + ("?" + urlencode(query) if query else "")
+
+
+class ImpactTracer:
+    def __init__(self):
+        self.enabled = False
+        self.tests = {}
+        self.current = None
+        self.driver = None
+        self.dirty = False
+        self.counts = {}
+
+    def enable(self):
+        self.enabled = True
+        recorder.listeners.append(self.step_finished)
+
+    def instrument(self, driver):
+        execute = driver.execute
+        driver.untraced_execute = execute
+
+        def traced_execute(driver_command, params=None):
+            response = execute(driver_command, params)
+            if self.current is not None:
+                self.driver = driver
+                if driver_command == "get":
+                    self.visit(params["url"])
+                elif driver_command in NAVIGATING_COMMANDS:
+                    self.dirty = True
+            return response
+
+        driver.execute = traced_execute
+        return driver
+
+    def visit(self, url):
+        path = page_path(url)
+        if path is not None:
+            self.current["urls"].add(path)
+
+    def step_finished(self, name):
+        # Адрес после клика читается только в конце шага: посреди шага может быть открыт confirm(),
+        # а любая команда WebDriver его закроет
+        if not self.dirty or self.current is None:
+            return
+        self.dirty = False
+        try:
+            self.visit(self.driver.untraced_execute("getCurrentUrl")["value"])
+        except Exception as e:
+            logger.debug("Не удалось прочитать адрес страницы: %s", e)
+
+    def begin(self, item):
+        with recorder.lock:
+            self.counts = {name: len(frames) for name, frames in recorder.samples.items()}
+        self.current = {
+            "file": item.location[0].replace(os.sep, "/"),
+            "function": getattr(item, "originalname", item.name),
+            "fixtures": sorted(item.fixturenames),
+            "urls": set(),
+        }
+
+    def end(self, item):
+        self.step_finished(None)
+        with recorder.lock:
+            steps = [name for name, frames in recorder.samples.items() if len(frames) > self.counts.get(name, 0)]
+        entry = self.current
+        entry["steps"] = sorted(steps)
+        entry["urls"] = sorted(entry["urls"])
+        self.tests[item.nodeid] = entry
+        self.current = None
+        self.driver = None
+
+
+tracer = ImpactTracer()
+
+
+class StructureParser(HTMLParser):
+    # Отпечаток страницы - её разметка без текста: теги, id, классы и имена полей
+    def __init__(self):
+        super().__init__()
+        self.digest = hashlib.sha1()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = ".".join(sorted((attrs.get("class") or "").split()))
+        self.digest.update(f"<{tag}#{attrs.get('id') or ''}.{classes}[{attrs.get('name') or ''}]".encode("utf-8"))
+
+
+def page_fingerprint(path):
+    try:
+        response = requests.get(settings.BASE_URL + path, timeout=30)
+    except requests.RequestException as e:
+        logger.warning("Отпечаток страницы %s не снят: %s", path, e)
+        return None
+    parser = StructureParser()
+    parser.feed(response.text)
+    return f"{response.status_code}:{parser.digest.hexdigest()}"
+
+
+def save_run(worker_id):
+    if not tracer.tests:
+        return
+    paths = {path for entry in tracer.tests.values() for path in entry["urls"] if not path.startswith("admin/")}
+    os.makedirs(IMPACT_DIR, exist_ok=True)
+    with open(os.path.join(IMPACT_DIR, f"run-{worker_id}.json"), "w", encoding="utf-8") as f:
+        json.dump({"tests": tracer.tests, "pages": {path: page_fingerprint(path) for path in sorted(paths)}},
+                  f, ensure_ascii=False)
+
+
+def load_map():
+    try:
+        with open(IMPACT_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"tests": {}, "pages": {}}
+
+
+def merge_runs():
+    runs = glob.glob(os.path.join(IMPACT_DIR, "run-*.json"))
+    if not runs:
+        return
+    impact = load_map()
+    for path in runs:
+        with open(path, encoding="utf-8") as f:
+            run = json.load(f)
+        impact["tests"].update(run["tests"])
+        impact["pages"].update(run["pages"])
+        os.remove(path)
+    with open(IMPACT_FILE, "w", encoding="utf-8") as f:
+        json.dump(impact, f, indent=2, ensure_ascii=False)
+    logger.info("Карта влияния сохранена в %s: %s тестов", IMPACT_FILE, len(impact['tests']))
+
+
+def scopes(source):
+    # (первая строка, последняя строка, имя) для функций, классов и методов модуля
+    result = []
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            result.append((start, node.end_lineno, node.name))
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    start = min([child.lineno] + [d.lineno for d in child.decorator_list])
+                    result.append((start, child.end_lineno, f"{node.name}.{child.name}"))
+    return result
+
+
+def read_source(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def changed_names(ref):
+    # {файл: имена изменённых функций, классов и методов}; MODULE - изменение вне определений
+    diff = subprocess.run(["git", "diff", "-U0", ref, "--", "*.py"],
+                          capture_output=True, text=True, encoding="utf-8", check=True).stdout
+    lines = {}
+    path = None
+    for line in diff.splitlines():
+        if line.startswith("--- a/"):
+            path = line[6:]
+        elif line.startswith("+++ b/"):
+            path = line[6:]
+        elif path and line.startswith("@@"):
+            match = HUNK_RE.match(line)
+            start, count = int(match.group(1)), int(match.group(2) or 1)
+            lines.setdefault(path, set()).update(range(start, start + max(count, 1)))
+
+    changes = {}
+    for path, numbers in lines.items():
+        source = read_source(path)
+        try:
+            file_scopes = scopes(source)
+        except SyntaxError:
+            file_scopes = []
+        names = changes.setdefault(path, set())
+        if not source:
+            names.add(MODULE)
+            continue
+        for number in numbers:
+            enclosing = [scope for scope in file_scopes if scope[0] <= number <= scope[1]]
+            if enclosing:
+                names.add(min(enclosing, key=lambda scope: scope[1] - scope[0])[2])
+            else:
+                names.add(MODULE)
+    return changes
+
+
+def defined_classes(path):
+    try:
+        return {node.name for node in ast.parse(read_source(path)).body if isinstance(node, ast.ClassDef)}
+    except SyntaxError:
+        return set()
+
+
+def affected_by_diff(tests, changes):
+    # Возвращает nodeid затронутых тестов или None, если изменилась инфраструктура и нужен полный прогон
+    test_files = {entry["file"] for entry in tests.values()}
+    known_steps = {step for entry in tests.values() for step in entry["steps"]}
+    step_classes = {step.split(".")[0] for step in known_steps}
+    affected = set()
+    for path, names in changes.items():
+        classes = defined_classes(path) & step_classes
+        if path not in test_files and not classes:
+            logger.info("Изменён %s - он не привязан к тестам, нужен полный прогон", path)
+            return None
+        for nodeid, entry in tests.items():
+            in_file = entry["file"] == path
+            entry_classes = {step.split(".")[0] for step in entry["steps"]}
+            for name in names:
+                if name == MODULE:
+                    hit = in_file or bool(entry_classes & classes)
+                elif name in classes or (name.split(".")[0] in classes and name not in known_steps):
+                    # Класс целиком или его служебный метод (не шаг) - затронуты все пользователи класса
+                    hit = name.split(".")[0] in entry_classes
+                elif name in known_steps:
+                    hit = name in entry["steps"]
+                else:
+                    hit = in_file and (name == entry["function"] or name in entry["fixtures"])
+                if hit:
+                    affected.add(nodeid)
+                    break
+    return affected
+
+
+def changed_pages(pages):
+    return {path for path, fingerprint in pages.items() if page_fingerprint(path) != fingerprint}
+
+
+def select(items, diff_ref=None, pages=False):
+    # Тесты без записи в карте запускаются всегда
+    impact = load_map()
+    tests = impact["tests"]
+    affected = set()
+    if diff_ref:
+        by_diff = affected_by_diff(tests, changed_names(diff_ref))
+        if by_diff is None:
+            return items, []
+        affected |= by_diff
+    if pages:
+        changed = changed_pages(impact["pages"])
+        if changed:
+            logger.info("Изменились страницы: %s", ', '.join(sorted(changed)))
+        affected |= {nodeid for nodeid, entry in tests.items() if changed & set(entry["urls"])}
+    selected = [item for item in items if item.nodeid not in tests or item.nodeid in affected]
+    deselected = [item for item in items if item not in selected]
+    logger.info("Выбор по изменениям: запускается %s из %s тестов", len(selected), len(items))
+    return selected, deselected
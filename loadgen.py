@@ -0,0 +1,291 @@
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from html import escape, unescape
+from urllib.parse import urljoin
+import requests
+import settings
+from opencart_standin import OpenCartStandin
+from timing import percentile
+
+logger = logging.getLogger()
+
+# Нагрузочный режим: сценарии kt4.py как виртуальные покупатели.
+# HTTP-пользователи дают масштаб, несколько браузеров с page objects - достоверность.
+# Запуск: python loadgen.py --users 50 --browsers 2 --duration 60 (без --base-url поднимается локальный стенд)
+
+LOAD_DIR = os.path.join(".webtest", "load")
+
+# Те же товары и категории, что в тестах корзины kt4.py
+CART_PRODUCTS = [("Cameras", "Canon EOS 5D"), ("Tablets", "Samsung Galaxy Tab"), ("Phones & PDAs", "HTC Touch HD")]
+SEARCH_TEXT = "MacBook"
+REVIEW_TEXT = "Отличный товар, рекомендую!"
+
+PRODUCT_LINK_RE = re.compile(r'<h4><a href="([^"]*product_id=(\d+)[^"]*)">([^<]+)</a></h4>')
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Stats:
+    def __init__(self):
+        self.samples = {}
+        self.finished = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def record(self, key, elapsed, error=None):
+        with self.lock:
+            self.samples.setdefault(key, []).append(elapsed)
+            self.finished.setdefault(key, []).append(time.monotonic())
+            if error:
+                self.errors.setdefault(key, []).append(error)
+
+    def summary(self, duration, steady=None):
+        # rps - за весь прогон вместе с разгоном; steady_rps - только за окно полной нагрузки steady=(начало, конец)
+        result = {}
+        for key, values in sorted(self.samples.items()):
+            errors = self.errors.get(key, [])
+            steady_count = sum(steady[0] <= moment <= steady[1] for moment in self.finished[key]) if steady else 0
+            result[key] = {
+                "count": len(values),
+                "errors": len(errors),
+                "rps": len(values) / duration if duration else 0,
+                "steady_rps": steady_count / (steady[1] - steady[0]) if steady and steady[1] > steady[0] else 0,
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "first_error": errors[0] if errors else None,
+            }
+        return result
+
+
+def format_report(summary, duration):
+    lines = [f"{'Сценарий / шаг':<48} {'запросов':>8} {'ошибок':>7} {'в сек':>7} {'без разг.':>9} "
+             f"{'p50, мс':>8} {'p95, мс':>8} {'p99, мс':>8}"]
+    for key, stats in summary.items():
+        lines.append(f"{key:<48} {stats['count']:>8} {stats['errors']:>7} {stats['rps']:>7.1f} {stats['steady_rps']:>9.1f} "
+                     f"{stats['p50'] * 1000:>8.0f} {stats['p95'] * 1000:>8.0f} {stats['p99'] * 1000:>8.0f}")
+    lines.append(f"Длительность {duration:.0f} с")
+    return "\n".join(lines)
+
+
+class VirtualUser:
+    # Общая часть HTTP- и браузерного пользователя: шаги сценария с замером и паузами на раздумье
+    kind = "http"
+
+    def __init__(self, stats, think):
+        self.stats = stats
+        self.think = think
+
+    def step(self, journey, name, action, *args):
+        start = time.perf_counter()
+        error = None
+        try:
+            return action(*args)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise StepFailed(error) from e
+        finally:
+            self.stats.record(f"{self.kind}:{journey}/{name}", time.perf_counter() - start, error)
+            time.sleep(random.uniform(*self.think))
+
+    def run(self, journeys, deadline):
+        while time.monotonic() < deadline:
+            journey = random.choice(journeys)
+            try:
+                getattr(self, journey)()
+            except StepFailed:
+                # Сценарий прерывается на упавшем шаге, пользователь начинает следующий
+                pass
+            except Exception as e:
+                # Проверка между шагами не прошла: записывается как ошибка сценария
+                self.stats.record(f"{self.kind}:{journey}/check", 0.0, f"{type(e).__name__}: {e}")
+
+    def close(self):
+        pass
+
+
+class HttpUser(VirtualUser):
+    def __init__(self, stats, think, base_url):
+        super().__init__(stats, think)
+        self.base_url = base_url
+        self.http = requests.Session()
+
+    def get(self, url):
+        response = self.http.get(urljoin(self.base_url, url), timeout=30)
+        response.raise_for_status()
+        return response.text
+
+    def post(self, url, data):
+        response = self.http.post(urljoin(self.base_url, url), data=data, timeout=30)
+        response.raise_for_status()
+        result = response.json()
+        if "success" not in result:
+            raise AssertionError(result.get("error", result))
+        return result
+
+    def link(self, page, text):
+        match = re.search(r'<a href="([^"]+)"[^>]*>\s*' + re.escape(escape(text, quote=False)) + r"\s*</a>", page)
+        if not match:
+            raise AssertionError(f"Ссылка '{text}' не найдена")
+        return unescape(match.group(1))
+
+    def find_product(self, page, product_name):
+        for url, product_id, name in PRODUCT_LINK_RE.findall(page):
+            if product_name.lower() in unescape(name).lower():
+                return unescape(url), product_id
+        raise AssertionError(f"Товар '{product_name}' не найден")
+
+    def browse_cart(self):
+        category, product_name = random.choice(CART_PRODUCTS)
+        home = self.step("browse_cart", "open", self.get, "")
+        page = self.step("browse_cart", "go_to_category", lambda: self.get(self.link(home, category)))
+        _, product_id = self.find_product(page, product_name)
+        self.step("browse_cart", "add_product_to_cart_by_name", self.post,
+                  "index.php?route=checkout/cart/add", {"product_id": product_id, "quantity": 1})
+        cart = self.step("browse_cart", "open_cart", self.get, "index.php?route=checkout/cart")
+        self.step("browse_cart", "is_product_in_cart", self.find_product_in_cart, cart, product_name)
+
+    def find_product_in_cart(self, cart, product_name):
+        if product_name not in unescape(cart):
+            raise AssertionError(f"Товар '{product_name}' не найден в корзине")
+
+    def search(self):
+        self.step("search", "open", self.get, "")
+        page = self.step("search", "search_product", self.get, f"index.php?route=product/search&search={SEARCH_TEXT}")
+        self.find_product(page, SEARCH_TEXT)
+
+    def review(self):
+        self.step("review", "open_home", self.get, "")
+        page = self.step("review", "search_product", self.get, f"index.php?route=product/search&search={SEARCH_TEXT}")
+        url, product_id = self.find_product(page, SEARCH_TEXT)
+        self.step("review", "open_product", self.get, url)
+        self.step("review", "add_review", self.post, f"index.php?route=product/product/write&product_id={product_id}",
+                  {"name": "Иван", "text": REVIEW_TEXT, "rating": 5})
+
+
+class BrowserUser(VirtualUser):
+    # Те же сценарии через page objects из pages в headless Firefox
+    kind = "browser"
+
+    def __init__(self, stats, think):
+        super().__init__(stats, think)
+        from browser import create_driver
+        from pages import CartPage, MainPage, ProductPage
+        self.driver = create_driver(headless=True, profile="fast")
+        self.main_page = MainPage(self.driver)
+        self.cart_page = CartPage(self.driver)
+        self.product_page = ProductPage(self.driver)
+
+    def check(self, result, message):
+        if not result:
+            raise AssertionError(message)
+
+    def browse_cart(self):
+        category, product_name = random.choice(CART_PRODUCTS)
+        self.step("browse_cart", "open", self.main_page.open)
+        self.step("browse_cart", "go_to_category", self.main_page.go_to_category, category)
+        added = self.step("browse_cart", "add_product_to_cart_by_name", self.main_page.add_product_to_cart_by_name, product_name)
+        self.check(added, f"Товар '{product_name}' не добавлен")
+        self.step("browse_cart", "open_cart", self.cart_page.open)
+        found = self.step("browse_cart", "is_product_in_cart", self.cart_page.is_product_in_cart, product_name)
+        self.check(found, f"Товар '{product_name}' не найден в корзине")
+
+    def search(self):
+        self.step("search", "open", self.main_page.open)
+        self.step("search", "search_product", self.main_page.search_product, SEARCH_TEXT)
+        self.check(self.main_page.find_product(SEARCH_TEXT), f"Товар '{SEARCH_TEXT}' не найден")
+
+    def review(self):
+        self.step("review", "open_home", self.main_page.open)
+        self.step("review", "search_product", self.main_page.search_product, SEARCH_TEXT)
+        self.step("review", "open_product", self.main_page.click_first_product)
+        self.step("review", "add_review", self.product_page.add_review, "Иван", REVIEW_TEXT, 5)
+
+    def close(self):
+        self.driver.quit()
+
+
+def start_delays(users, ramp_up, profile):
+    # linear - равномерно за ramp_up секунд, step - четырьмя ступенями, spike - все сразу
+    if profile == "spike" or users <= 1:
+        return [0.0] * users
+    if profile == "step":
+        return [ramp_up * (i * 4 // users) / 4 for i in range(users)]
+    return [ramp_up * i / users for i in range(users)]
+
+
+def run_load(base_url, users=10, browsers=0, duration=60, ramp_up=10, profile="linear",
+             think=(0.5, 2.0), journeys=("browse_cart", "search", "review")):
+    stats = Stats()
+    start = time.monotonic()
+    deadline = start + ramp_up + duration
+    # Браузеры стартуют первыми: их запуск долгий и не должен попадать в окно замера HTTP-пользователей
+    kinds = ["browser"] * browsers + ["http"] * users
+
+    def user(kind, delay):
+        time.sleep(delay)
+        try:
+            virtual_user = BrowserUser(stats, think) if kind == "browser" else HttpUser(stats, think, base_url)
+        except Exception as e:
+            logger.error("Виртуальный пользователь (%s) не запущен: %s", kind, e)
+            return
+        try:
+            virtual_user.run(list(journeys), deadline)
+        finally:
+            virtual_user.close()
+
+    threads = [threading.Thread(target=user, args=(kind, delay), daemon=True)
+               for kind, delay in zip(kinds, start_delays(len(kinds), ramp_up, profile))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    return stats.summary(elapsed, (start + ramp_up, deadline)), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузка сценариями kt4.py")
+    parser.add_argument("--base-url", help="магазин под нагрузкой; по умолчанию поднимается локальный стенд")
+    parser.add_argument("--users", type=int, default=10, help="HTTP-пользователей")
+    parser.add_argument("--browsers", type=int, default=0, help="пользователей в headless Firefox")
+    parser.add_argument("--duration", type=float, default=60, help="секунд полной нагрузки после разгона")
+    parser.add_argument("--ramp-up", type=float, default=10)
+    parser.add_argument("--profile", choices=("linear", "step", "spike"), default="linear")
+    parser.add_argument("--think", default="0.5-2", help="пауза между шагами, секунд: мин-макс")
+    parser.add_argument("--journeys", default="browse_cart,search,review")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    standin = None
+    if args.base_url:
+        settings.BASE_URL = args.base_url.rstrip("/") + "/"
+    else:
+        standin = OpenCartStandin().start()
+        settings.BASE_URL = standin.base_url
+    think = tuple(float(value) for value in args.think.split("-"))
+    try:
+        summary, elapsed = run_load(settings.BASE_URL, args.users, args.browsers, args.duration, args.ramp_up,
+                                    args.profile, think, args.journeys.split(","))
+    finally:
+        if standin:
+            standin.stop()
+
+    print(format_report(summary, elapsed))
+    os.makedirs(LOAD_DIR, exist_ok=True)
+    path = os.path.join(LOAD_DIR, f"report-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "duration": elapsed, "steps": summary}, f, indent=2, ensure_ascii=False)
+    print(f"Отчёт сохранён в {path}")
+
+
+if __name__ == "__main__":
+    main()
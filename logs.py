@@ -0,0 +1,157 @@
+import argparse
+import atexit
+import glob
+import heapq
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from timing import recorder
+
+# Структурированный лог: JSON-строка на запись с воркером, тестом и шагом page object.
+# Тестовый поток только кладёт запись в очередь, форматирование и запись в файл - в потоке QueueListener.
+# Каждый воркер пишет свой файл, контроллер в конце сливает их по времени в LOG_FILE.
+LOG_DIR = os.path.join(".webtest", "logs")
+LOG_FILE = os.path.join(".webtest", "test_log.jsonl")
+LEVEL = os.environ.get("WEBTEST_LOG_LEVEL", "INFO").upper()
+CONSOLE_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+logger = logging.getLogger()
+
+# Тест, который сейчас выполняется в этом процессе (воркере)
+context = {"worker": "master", "test": None}
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # В отличие от QueueHandler, сообщение не форматируется: это делает поток записи.
+        # Контекст снимается здесь - шаг хранится в thread-local тестового потока
+        record.worker = context["worker"]
+        record.test = context["test"]
+        if not hasattr(record, "step"):
+            record.step = recorder.current()
+        if record.exc_info:
+            # Traceback держит кадры теста живыми, поэтому превращается в текст сразу
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "worker": getattr(record, "worker", None),
+            "test": getattr(record, "test", None),
+            "step": getattr(record, "step", None),
+            "message": record.getMessage(),
+        }
+        duration = getattr(record, "duration", None)
+        if duration is not None:
+            entry["duration"] = round(duration, 4)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    # Поток берётся при каждой записи: pytest подменяет sys.stderr на время перехвата вывода
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class LogPipeline:
+    def __init__(self):
+        self.handler = None
+        self.listener = None
+
+    def setup(self, worker_id="master", console=True):
+        if self.listener:
+            return self
+        context["worker"] = worker_id
+        os.makedirs(LOG_DIR, exist_ok=True)
+        file_handler = logging.FileHandler(os.path.join(LOG_DIR, f"run-{worker_id}.jsonl"), mode="w", encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers = [file_handler]
+        if console:
+            console_handler = ConsoleHandler()
+            console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+            handlers.append(console_handler)
+        records = queue.SimpleQueue()
+        self.handler = ContextQueueHandler(records)
+        self.listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        self.listener.start()
+        logger.addHandler(self.handler)
+        logger.setLevel(LEVEL)
+        recorder.listeners.append(step_finished)
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        # Дописывает очередь и закрывает файл; после этого записи идут мимо структурированного лога
+        if not self.listener:
+            return
+        logger.removeHandler(self.handler)
+        recorder.listeners.remove(step_finished)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.handler = self.listener = None
+
+
+pipeline = LogPipeline()
+
+
+def step_finished(name):
+    # Завершение шага с длительностью пишется только на уровне DEBUG
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Шаг %s завершён", name, extra={"step": name, "duration": recorder.samples[name][-1]["total"]})
+
+
+def merge_runs():
+    runs = sorted(glob.glob(os.path.join(LOG_DIR, "run-*.jsonl")))
+    if not runs:
+        return
+    files = [open(path, encoding="utf-8") for path in runs]
+    try:
+        # Файлы воркеров уже упорядочены по времени, слияние идёт потоком
+        with open(LOG_FILE, "w", encoding="utf-8") as f:
+            f.writelines(heapq.merge(*files, key=lambda line: json.loads(line)["ts"]))
+    finally:
+        for file in files:
+            file.close()
+    for path in runs:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Просмотр структурированного лога прогона")
+    parser.add_argument("--test", default="", help="часть идентификатора теста")
+    parser.add_argument("--worker")
+    parser.add_argument("--level", default="DEBUG")
+    args = parser.parse_args()
+    level = logging.getLevelName(args.level.upper())
+    with open(LOG_FILE, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if (args.test not in (entry["test"] or "") or args.worker and entry["worker"] != args.worker
+                    or logging.getLevelName(entry["level"]) < level):
+                continue
+            duration = f" ({entry['duration']:.2f} с)" if "duration" in entry else ""
+            print(f"{entry['time']} {entry['worker']} [{entry['level']}] {entry['step'] or '-'}: {entry['message']}{duration}")
+            if "exc" in entry:
+                print(entry["exc"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,855 @@
+import argparse
+import copy
+import json
+import logging
+import secrets
+import threading
+from html import escape
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger()
+
+# Локальный заменитель demo.opencart.com: витрина в разметке OpenCart 3 (как в kt4.py)
+# и админка в разметке OpenCart 4 (как в kt5-webtest.py). Каталог, корзины и сессии живут в памяти.
+# Запуск: python opencart_standin.py --port 8765
+
+ADMIN_USERS = {"Teliour": "367/qwQf22"}
+
+CURRENCIES = {
+    "USD": ("$", "", 1.0),
+    "EUR": ("", "€", 0.78),
+    "GBP": ("£", "", 0.61),
+}
+
+CATEGORIES = [
+    (20, "Computers", 0),
+    (26, "PC", 20),
+    (27, "Mac", 20),
+    (18, "Laptops & Notebooks", 0),
+    (57, "Tablets", 0),
+    (24, "Phones & PDAs", 0),
+    (33, "Cameras", 0),
+]
+
+PRODUCTS = [
+    (43, "MacBook", 500.00, [18], True),
+    (44, "MacBook Air", 1000.00, [18], False),
+    (45, "MacBook Pro", 2000.00, [18], False),
+    (41, "iMac", 100.00, [20, 27], False),
+    (42, "Apple Cinema 30\"", 100.00, [20], True),
+    (49, "Samsung Galaxy Tab 10.1", 199.99, [57], False),
+    (40, "iPhone", 101.00, [24], True),
+    (28, "HTC Touch HD", 100.00, [24], False),
+    (29, "Palm Treo Pro", 279.99, [24], False),
+    (30, "Canon EOS 5D", 80.00, [33], True),
+    (31, "Nikon D300", 80.00, [33], False),
+]
+
+EMPTY_CATEGORY = "There are no products to list in this category."
+
+SCRIPT = """
+function post(url, data, done) {
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', url);
+    xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+    xhr.onload = function () { done(JSON.parse(xhr.responseText)); };
+    xhr.send(data);
+}
+function get(url, done) {
+    var xhr = new XMLHttpRequest();
+    xhr.open('GET', url);
+    xhr.onload = function () { done(xhr.responseText); };
+    xhr.send();
+}
+function showAlert(json) {
+    var box = document.getElementById('alert');
+    var div = document.createElement('div');
+    if (json.success) {
+        div.className = 'alert alert-success';
+        div.innerHTML = json.success;
+    } else {
+        div.className = 'alert alert-danger';
+        div.innerHTML = typeof json.error === 'string' ? json.error : Object.values(json.error).join('<br>');
+    }
+    box.insertBefore(div, box.firstChild);
+}
+function encodeForm(form) {
+    form.querySelectorAll('.note-editable').forEach(function (editor) {
+        editor.previousElementSibling.value = editor.innerHTML;
+    });
+    return new URLSearchParams(new FormData(form)).toString();
+}
+var cart = {
+    add: function (id) {
+        post('index.php?route=checkout/cart/add', 'product_id=' + id + '&quantity=1', function (json) {
+            showAlert(json);
+            document.getElementById('cart-total').textContent = json.total;
+        });
+    }
+};
+var wishlist = {
+    add: function (id) {
+        post('index.php?route=account/wishlist/add', 'product_id=' + id, showAlert);
+    }
+};
+document.addEventListener('click', function (e) {
+    var toggle = e.target.closest('.dropdown-toggle, #menu > li > a');
+    if (toggle) {
+        e.preventDefault();
+        var menu = toggle.parentNode.querySelector('.dropdown-menu, ul');
+        menu.style.display = menu.style.display === 'block' ? 'none' : 'block';
+        return;
+    }
+    var tab = e.target.closest('.nav-tabs a');
+    if (tab) {
+        e.preventDefault();
+        var pane = document.querySelector(tab.getAttribute('href'));
+        pane.parentNode.querySelectorAll('.tab-pane').forEach(function (p) { p.style.display = 'none'; });
+        pane.style.display = 'block';
+        return;
+    }
+    var thumb = e.target.closest('.thumbnails a');
+    if (thumb) {
+        e.preventDefault();
+        document.getElementById('main-image').src = thumb.getAttribute('href');
+        return;
+    }
+    var close = e.target.closest('.btn-close');
+    if (close) {
+        close.closest('.modal').style.display = 'none';
+    }
+});
+"""
+
+ADMIN_SCRIPT = """
+document.addEventListener('submit', function (e) {
+    var form = e.target;
+    if (!form.hasAttribute('data-oc-toggle')) {
+        return;
+    }
+    e.preventDefault();
+    var button = e.submitter;
+    var action = button && button.getAttribute('formaction') || form.getAttribute('action');
+    if (button && button.hasAttribute('data-confirm') && !confirm(button.getAttribute('data-confirm'))) {
+        return;
+    }
+    post(action, encodeForm(form), function (json) {
+        if (json.redirect) {
+            location = json.redirect;
+            return;
+        }
+        showAlert(json);
+        Object.keys(json).forEach(function (key) {
+            var input = form.querySelector("input[name='" + key + "']");
+            if (input) {
+                input.value = json[key];
+            }
+        });
+        if (json.success && form.hasAttribute('data-oc-reload')) {
+            loadList();
+        }
+    });
+});
+function loadList() {
+    var filter = document.getElementById('input-name');
+    get(document.getElementById('product').getAttribute('data-url') + '&filter_name=' + encodeURIComponent(filter.value),
+        function (html) { document.getElementById('product').innerHTML = html; });
+}
+document.addEventListener('input', function (e) {
+    if (e.target.id !== 'input-category') {
+        return;
+    }
+    var menu = e.target.nextElementSibling;
+    get(e.target.getAttribute('data-url') + '&filter_name=' + encodeURIComponent(e.target.value), function (text) {
+        menu.innerHTML = JSON.parse(text).map(function (item) {
+            return '<li><a href="#" data-id="' + item.category_id + '">' + item.name + '</a></li>';
+        }).join('');
+        menu.style.display = 'block';
+    });
+});
+document.addEventListener('click', function (e) {
+    var item = e.target.closest('#form-product .dropdown-menu a');
+    if (item) {
+        e.preventDefault();
+        document.getElementById('product-category').insertAdjacentHTML('beforeend',
+            '<li>' + item.textContent + '<input type="hidden" name="product_category[]" value="' + item.getAttribute('data-id') + '"></li>');
+        item.closest('.dropdown-menu').style.display = 'none';
+        document.getElementById('input-category').value = '';
+    }
+    if (e.target.id === 'button-filter') {
+        loadList();
+    }
+});
+"""
+
+
+class Store:
+    # Состояние, которое снимают и восстанавливают контрольные точки (checkpoints.py)
+    STATE = ("categories", "products", "featured", "customers", "reviews", "sessions", "next_id")
+
+    def __init__(self, admin_users=None):
+        self.lock = threading.RLock()
+        self.admin_users = dict(ADMIN_USERS if admin_users is None else admin_users)
+        self.categories = {cid: {"name": name, "parent_id": parent, "status": 1} for cid, name, parent in CATEGORIES}
+        self.products = {}
+        self.featured = []
+        for pid, name, price, categories, featured in PRODUCTS:
+            self.products[pid] = {"name": name, "model": f"Product {pid}", "price": price, "description": f"{name} description",
+                                  "categories": set(categories), "status": 1}
+            if featured:
+                self.featured.append(pid)
+        self.customers = {}
+        self.reviews = []
+        self.sessions = {}
+        self.next_id = 100
+        # Трафик стенда: число запросов и байты тел запросов и ответов (для bench_suite.py)
+        self.traffic = {"requests": 0, "received": 0, "sent": 0}
+        self.checkpoints = {}
+
+    def new_id(self):
+        with self.lock:
+            self.next_id += 1
+            return self.next_id
+
+    def session(self, session_id):
+        with self.lock:
+            return self.sessions.setdefault(session_id, {
+                "cart": {}, "wishlist": set(), "currency": "USD", "customer": None, "user_token": None,
+                "login_token": secrets.token_hex(16),
+            })
+
+    def snapshot(self):
+        with self.lock:
+            return copy.deepcopy({name: getattr(self, name) for name in self.STATE})
+
+    def restore(self, snapshot):
+        # Сессии из снимка возвращаются к снятому виду, открытые позже (API-клиенты, другие браузеры) остаются
+        state = copy.deepcopy(snapshot)
+        with self.lock:
+            sessions = dict(self.sessions)
+            sessions.update(state.pop("sessions"))
+            for name, value in state.items():
+                setattr(self, name, value)
+            self.sessions = sessions
+
+    def category_products(self, category_id):
+        children = [cid for cid, c in self.categories.items() if c["parent_id"] == category_id]
+        ids = {category_id, *children}
+        return [pid for pid, p in sorted(self.products.items()) if p["status"] and p["categories"] & ids]
+
+    def search(self, text):
+        text = text.lower()
+        return [pid for pid, p in sorted(self.products.items()) if p["status"] and text and text in p["name"].lower()]
+
+
+def price(session, amount):
+    left, right, rate = CURRENCIES[session["currency"]]
+    return f"{left}{amount * rate:,.2f}{right}"
+
+
+def cart_total(store, session):
+    total = sum(store.products[pid]["price"] * qty for pid, qty in session["cart"].items() if pid in store.products)
+    count = sum(session["cart"].values())
+    return f"{count} item(s) - {price(session, total)}"
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "OpenCartStandin/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug("standin: " + format, *args)
+
+    @property
+    def store(self):
+        return self.server.store
+
+    # --- Разбор запроса и ответы ---
+
+    def parse(self):
+        parts = urlsplit(self.path)
+        self.query = {k: v[0] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+        self.route = self.query.get("route", "common/home" if not parts.path.startswith("/admin") else "common/login")
+        self.admin = parts.path.startswith("/admin")
+        self.form = {}
+        if self.command == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            self.form = parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        self.new_session = "OCSESSID" not in cookie
+        self.session_id = secrets.token_hex(13) if self.new_session else cookie["OCSESSID"].value
+        self.session = self.store.session(self.session_id)
+        return parts.path
+
+    def field(self, name, default=""):
+        return self.form.get(name, [default])[0]
+
+    def send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        # Ответ только собирается: в сокет его пишет dispatch() после снятия блокировки стенда
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        headers = dict(headers or {}, **{"Content-Type": content_type, "Content-Length": str(len(data))})
+        if self.new_session:
+            headers["Set-Cookie"] = f"OCSESSID={self.session_id}; Path=/; HttpOnly"
+        self.response = status, headers, data
+
+    def write(self):
+        status, headers, data = self.response
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def html(self, body):
+        self.send(200, body)
+
+    def json(self, data):
+        self.send(200, json.dumps(data, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def redirect(self, location):
+        self.send(302, "", headers={"Location": location})
+
+    def not_found(self):
+        self.send(404, self.storefront("Page Not Found", "<h1>Page Not Found!</h1><p>The page you requested cannot be found.</p>"))
+
+    def control(self, action):
+        # Служебные адреса checkpoints.py: снимок и восстановление состояния стенда по имени
+        name = self.query.get("name", "default")
+        if action == "checkpoint":
+            self.store.checkpoints[name] = self.store.snapshot()
+        elif action == "restore":
+            if name not in self.store.checkpoints:
+                return self.send(404, json.dumps({"error": f"Нет контрольной точки {name}"}), "application/json; charset=utf-8")
+            self.store.restore(self.store.checkpoints[name])
+        else:
+            return self.send(404, json.dumps({"error": f"Неизвестное действие {action}"}), "application/json; charset=utf-8")
+        return self.json({"success": name})
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        self.dispatch()
+
+    def do_POST(self):
+        self.dispatch()
+
+    def dispatch(self):
+        path = self.parse()
+        if path == "/robots.txt":
+            self.send(200, "User-agent: *\nDisallow:\n", "text/plain")
+        elif path.startswith("/image/"):
+            self.send(200, self.placeholder(path), "image/svg+xml")
+        else:
+            # Блокировка держится, пока читается и меняется состояние магазина и собирается страница;
+            # запись в сокет идёт после неё, чтобы медленный клиент не задерживал остальные запросы
+            with self.store.lock:
+                self.handle_path(path)
+        with self.store.lock:
+            self.store.traffic["requests"] += 1
+            self.store.traffic["received"] += int(self.headers.get("Content-Length") or 0)
+            if self.command != "HEAD":
+                self.store.traffic["sent"] += len(self.response[2])
+        self.write()
+
+    def handle_path(self, path):
+        if path.startswith("/__webtest/"):
+            return self.control(path[len("/__webtest/"):])
+        if path not in ("/", "/index.php", "/admin", "/admin/", "/admin/index.php"):
+            return self.not_found()
+        handlers = ADMIN_ROUTES if self.admin else STOREFRONT_ROUTES
+        handler = handlers.get(self.route)
+        if self.admin and handler is not None and self.route not in ("common/login", "common/login.login"):
+            if not self.session["user_token"] or self.query.get("user_token") != self.session["user_token"]:
+                if self.command == "POST" or self.route.endswith("autocomplete"):
+                    return self.json({"error": {"warning": "Invalid token session. Please login again."},
+                                      "redirect": "index.php?route=common/login"})
+                return self.redirect("/admin/index.php?route=common/login")
+        if handler is None:
+            return self.not_found()
+        return handler(self)
+
+    def placeholder(self, path):
+        label = escape(path.rsplit("/", 1)[-1])
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" width="228" height="228"><rect width="100%" height="100%" fill="#eee"/>'
+                f'<text x="10" y="120" font-size="14">{label}</text></svg>')
+
+    # --- Витрина (OpenCart 3) ---
+
+    def product_url(self, pid):
+        return f"index.php?route=product/product&amp;product_id={pid}"
+
+    def category_url(self, cid):
+        parent = self.store.categories[cid]["parent_id"]
+        path = f"{parent}_{cid}" if parent else str(cid)
+        return f"index.php?route=product/category&amp;path={path}"
+
+    def storefront(self, title, content):
+        session = self.session
+        currencies = "".join(
+            f'<li><button class="currency-select btn btn-link btn-block" type="submit" name="{code}">{escape(left or right)} {code}</button></li>'
+            for code, (left, right, _) in CURRENCIES.items())
+        left, right, _ = CURRENCIES[session["currency"]]
+        menu = []
+        for cid, category in self.store.categories.items():
+            if category["parent_id"] or not category["status"]:
+                continue
+            children = [(child_id, child) for child_id, child in self.store.categories.items() if child["parent_id"] == cid]
+            if children:
+                items = "".join(f'<li><a href="{self.category_url(child_id)}">{escape(child["name"])} '
+                                f'({len(self.store.category_products(child_id))})</a></li>' for child_id, child in children)
+                menu.append(f'<li class="dropdown"><a href="{self.category_url(cid)}" class="dropdown-toggle">{escape(category["name"])}</a>'
+                            f'<div class="dropdown-menu" style="display:none"><ul class="list-unstyled">{items}</ul>'
+                            f'<a href="{self.category_url(cid)}" class="see-all">Show All {escape(category["name"])}</a></div></li>')
+            else:
+                menu.append(f'<li><a href="{self.category_url(cid)}">{escape(category["name"])}</a></li>')
+        account = ('<a href="index.php?route=account/account">My Account</a>' if session["customer"]
+                   else '<a href="index.php?route=account/register">Register</a> <a href="index.php?route=account/login">Login</a>')
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="UTF-8"><title>{escape(title)}</title></head>
+<body>
+<nav id="top"><div class="container">
+  <form action="index.php?route=common/currency/currency" method="post" enctype="application/x-www-form-urlencoded" id="form-currency">
+    <input type="hidden" name="redirect" value="{escape(self.path)}">
+    <div class="btn-group">
+      <button class="btn btn-link dropdown-toggle" type="button"><strong>{escape(left or right)}</strong> Currency</button>
+      <ul class="dropdown-menu" style="display:none">{currencies}</ul>
+    </div>
+  </form>
+  <div id="top-links">{account} <a href="index.php?route=checkout/cart">Shopping Cart</a></div>
+</div></nav>
+<header><div class="container">
+  <div id="logo"><a href="index.php?route=common/home">Your Store</a></div>
+  <div id="search" class="input-group">
+    <input type="text" name="search" value="" placeholder="Search" class="form-control input-lg">
+    <span class="input-group-btn"><button type="button" class="btn btn-default btn-lg" onclick="location = 'index.php?route=product/search&amp;search=' + encodeURIComponent(document.querySelector('input[name=search]').value);">Search</button></span>
+  </div>
+  <div id="cart"><span id="cart-total">{cart_total(self.store, session)}</span></div>
+</div></header>
+<div class="container"><nav id="menu"><ul class="nav navbar-nav">{"".join(menu)}</ul></nav></div>
+<div id="container" class="container"><div id="alert"></div><div class="row"><div id="content" class="col-sm-12">{content}</div></div></div>
+<script>{SCRIPT}</script>
+</body></html>"""
+
+    def product_cards(self, ids):
+        if not ids:
+            return ""
+        cards = []
+        for pid in ids:
+            product = self.store.products[pid]
+            name = escape(product["name"])
+            cards.append(f"""<div class="product-layout product-grid col-lg-3"><div class="product-thumb">
+  <div class="image"><a href="{self.product_url(pid)}"><img src="image/{pid}-1.svg" alt="{name}" title="{name}"></a></div>
+  <div class="caption"><h4><a href="{self.product_url(pid)}">{name}</a></h4><p>{escape(product["description"])}</p>
+    <p class="price">{price(self.session, product["price"])} <span class="price-tax">Ex Tax: {price(self.session, product["price"])}</span></p></div>
+  <div class="button-group">
+    <button type="button" onclick="cart.add('{pid}');"><span>Add to Cart</span></button>
+    <button type="button" title="" onclick="wishlist.add('{pid}');" data-original-title="Add to Wish List">&#9829;</button>
+  </div>
+</div></div>""")
+        return f'<div class="row">{"".join(cards)}</div>'
+
+    def home(self):
+        self.html(self.storefront("Your Store", f"<h3>Featured</h3>{self.product_cards(self.store.featured)}"))
+
+    def category(self):
+        cid = int(self.query.get("path", "0").split("_")[-1] or 0)
+        category = self.store.categories.get(cid)
+        if not category or not category["status"]:
+            return self.not_found()
+        ids = self.store.category_products(cid)
+        body = self.product_cards(ids) if ids else f"<p>{EMPTY_CATEGORY}</p>"
+        self.html(self.storefront(category["name"], f"<h2>{escape(category['name'])}</h2>{body}"))
+
+    def search(self):
+        text = self.query.get("search", "")
+        ids = self.store.search(text)
+        body = self.product_cards(ids) if ids else "<p>There is no product that matches the search criteria.</p>"
+        self.html(self.storefront(f"Search - {text}", f"<h1>Search - {escape(text)}</h1>{body}"))
+
+    def product(self):
+        pid = int(self.query.get("product_id", "0") or 0)
+        product = self.store.products.get(pid)
+        if not product or not product["status"]:
+            return self.not_found()
+        thumbs = "".join(f'<li class="image-additional"><a class="thumbnail" href="image/{pid}-{n}.svg">'
+                         f'<img src="image/{pid}-{n}.svg" width="74" height="74"></a></li>' for n in range(1, 4))
+        ratings = "".join(f'<input type="radio" name="rating" value="{n}"> ' for n in range(1, 6))
+        content = f"""<div class="row"><div class="col-sm-8">
+  <img id="main-image" src="image/{pid}-1.svg" alt="{escape(product["name"])}">
+  <ul class="thumbnails">{thumbs}</ul>
+  <ul class="nav nav-tabs"><li class="active"><a href="#tab-description">Description</a></li><li><a href="#tab-review">Reviews (0)</a></li></ul>
+  <div class="tab-content">
+    <div class="tab-pane active" id="tab-description">{escape(product["description"])}</div>
+    <div class="tab-pane" id="tab-review" style="display:none"><form class="form-horizontal" id="form-review">
+      <input type="text" name="name" value="" id="input-name" class="form-control">
+      <textarea name="text" rows="5" id="input-review" class="form-control"></textarea>
+      <div>Bad {ratings} Good</div>
+      <button type="button" id="button-review" class="btn btn-primary"
+        onclick="post('index.php?route=product/product/write&amp;product_id={pid}', encodeForm(document.getElementById('form-review')), showAlert);">Continue</button>
+    </form></div>
+  </div></div>
+  <div class="col-sm-4"><h1>{escape(product["name"])}</h1><ul class="list-unstyled"><li><h2>{price(self.session, product["price"])}</h2></li></ul>
+    <button type="button" id="button-cart" class="btn btn-primary btn-lg btn-block" onclick="cart.add('{pid}');">Add to Cart</button></div>
+</div>"""
+        self.html(self.storefront(product["name"], content))
+
+    def write_review(self):
+        name, text = self.field("name"), self.field("text")
+        if not 3 <= len(name) <= 25:
+            return self.json({"error": "Warning: Review Name must be between 3 and 25 characters!"})
+        if not 25 <= len(text) <= 1000:
+            return self.json({"error": "Warning: Review Text must be between 25 and 1000 characters!"})
+        if not self.field("rating"):
+            return self.json({"error": "Warning: Please select a review rating!"})
+        self.store.reviews.append({"product_id": int(self.query.get("product_id", 0)), "author": name,
+                                   "text": text, "rating": int(self.field("rating"))})
+        self.json({"success": "Thank you for your review. It has been submitted to the webmaster for approval."})
+
+    def cart_add(self):
+        pid = int(self.field("product_id", "0") or 0)
+        product = self.store.products.get(pid)
+        if not product:
+            return self.json({"error": "Product not found!"})
+        self.session["cart"][pid] = self.session["cart"].get(pid, 0) + int(self.field("quantity", "1") or 1)
+        self.json({"success": f'Success: You have added <a href="{self.product_url(pid)}">{escape(product["name"])}</a> '
+                              f'to your <a href="index.php?route=checkout/cart">shopping cart</a>!',
+                   "total": cart_total(self.store, self.session)})
+
+    def cart(self):
+        rows = []
+        for pid, qty in self.session["cart"].items():
+            product = self.store.products.get(pid)
+            if not product:
+                continue
+            rows.append(f"""<tr><td class="text-center"><img src="image/{pid}-1.svg" width="47" height="47"></td>
+  <td class="text-left"><a href="{self.product_url(pid)}">{escape(product["name"])}</a></td>
+  <td class="text-left">{escape(product["model"])}</td>
+  <td class="text-left"><input type="text" name="quantity[{pid}]" value="{qty}" size="1" class="form-control"></td>
+  <td class="text-right">{price(self.session, product["price"])}</td>
+  <td class="text-right">{price(self.session, product["price"] * qty)}</td></tr>""")
+        if not rows:
+            return self.html(self.storefront("Shopping Cart", "<h1>Shopping Cart</h1><p>Your shopping cart is empty!</p>"))
+        total = sum(self.store.products[pid]["price"] * qty for pid, qty in self.session["cart"].items() if pid in self.store.products)
+        content = f"""<h1>Shopping Cart</h1>
+<form><div class="table-responsive"><table class="table table-bordered">
+  <thead><tr><td class="text-center">Image</td><td class="text-left">Product Name</td><td class="text-left">Model</td>
+  <td class="text-left">Quantity</td><td class="text-right">Unit Price</td><td class="text-right">Total</td></tr></thead>
+  <tbody>{"".join(rows)}</tbody></table></div></form>
+<table class="table table-bordered"><tr><td class="text-right"><strong>Total:</strong></td><td class="text-right">{price(self.session, total)}</td></tr></table>"""
+        self.html(self.storefront("Shopping Cart", content))
+
+    def wishlist_add(self):
+        pid = int(self.field("product_id", "0") or 0)
+        product = self.store.products.get(pid)
+        if not product:
+            return self.json({"error": "Product not found!"})
+        link = f'<a href="{self.product_url(pid)}">{escape(product["name"])}</a>'
+        if not self.session["customer"]:
+            return self.json({"success": f"You must login or create an account to save {link} to your wish list!"})
+        self.session["wishlist"].add(pid)
+        self.json({"success": f"Success: You have added {link} to your wish list!"})
+
+    def currency(self):
+        for code in CURRENCIES:
+            if code in self.form or self.field("code") == code:
+                self.session["currency"] = code
+        self.redirect(self.field("redirect") or "/index.php?route=common/home")
+
+    def register(self):
+        errors = []
+        values = {name: self.field(name) for name in ("firstname", "lastname", "email", "telephone", "password", "confirm")}
+        if self.command == "POST":
+            if not values["firstname"] or not values["lastname"]:
+                errors.append("First Name and Last Name must be between 1 and 32 characters!")
+            if "@" not in values["email"]:
+                errors.append("E-Mail Address does not appear to be valid!")
+            elif values["email"].lower() in self.store.customers:
+                errors.append("Warning: E-Mail Address is already registered!")
+            if len(values["password"]) < 4 or values["password"] != values["confirm"]:
+                errors.append("Password confirmation does not match password!")
+            if not self.field("agree"):
+                errors.append("Warning: You must agree to the Privacy Policy!")
+            if not errors:
+                self.store.customers[values["email"].lower()] = dict(values, customer_id=self.store.new_id())
+                self.session["customer"] = values["email"].lower()
+                return self.redirect("/index.php?route=account/success")
+        alerts = "".join(f'<div class="alert alert-danger">{escape(e)}</div>' for e in errors)
+        inputs = "".join(f'<input type="{"password" if name in ("password", "confirm") else "text"}" name="{name}" '
+                         f'value="{escape(values[name]) if name not in ("password", "confirm") else ""}" id="input-{name}" class="form-control">'
+                         for name in values)
+        content = f"""<h1>Register Account</h1>{alerts}
+<form action="index.php?route=account/register" method="post" enctype="application/x-www-form-urlencoded" class="form-horizontal">
+  <fieldset id="account">{inputs}</fieldset>
+  <div class="buttons">I have read and agree to the Privacy Policy <input type="checkbox" name="agree" value="1">
+    <input type="submit" value="Continue" class="btn btn-primary"></div>
+</form>"""
+        self.html(self.storefront("Register Account", content))
+
+    def login(self):
+        error = ""
+        if self.command == "POST":
+            customer = self.store.customers.get(self.field("email").lower())
+            if customer and customer["password"] == self.field("password"):
+                self.session["customer"] = self.field("email").lower()
+                return self.redirect("/index.php?route=account/account")
+            error = '<div class="alert alert-danger">Warning: No match for E-Mail Address and/or Password.</div>'
+        content = f"""<h2>Returning Customer</h2>{error}
+<form action="index.php?route=account/login" method="post" enctype="application/x-www-form-urlencoded">
+  <input type="text" name="email" id="input-email" class="form-control"><input type="password" name="password" id="input-password" class="form-control">
+  <input type="submit" value="Login" class="btn btn-primary"></form>"""
+        self.html(self.storefront("Account Login", content))
+
+    def account(self):
+        if not self.session["customer"]:
+            return self.redirect("/index.php?route=account/login")
+        self.html(self.storefront("My Account", "<h2>My Account</h2><ul><li><a href=\"index.php?route=account/wishlist\">Wish List</a></li></ul>"))
+
+    def success(self):
+        self.html(self.storefront("Your Account Has Been Created!",
+                                  "<h1>Your Account Has Been Created!</h1><p>Congratulations! Your new account has been successfully created!</p>"))
+
+    # --- Админка (OpenCart 4) ---
+
+    def admin_url(self, route):
+        return f"index.php?route={route}&amp;user_token={self.session['user_token']}"
+
+    def admin_page(self, title, content, popup=False):
+        modal = ("""<div class="modal" id="modal-security" style="display:block"><div class="modal-dialog"><div class="modal-content">
+  <div class="modal-header"><h5 class="modal-title">Important Security Notification!</h5><button type="button" class="btn-close"></button></div>
+  <div class="modal-body">Please move the storage directory outside of the web directory.</div></div></div></div>""" if popup else "")
+        menu = ""
+        if self.session["user_token"]:
+            menu = f"""<nav id="column-left"><ul id="menu">
+  <li id="menu-catalog"><a href="#collapse-1" class="parent">Catalog</a>
+    <ul id="collapse-1" style="display:none">
+      <li><a href="{self.admin_url('catalog/category')}">Categories</a></li>
+      <li><a href="{self.admin_url('catalog/product')}">Products</a></li>
+    </ul></li>
+</ul></nav>"""
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="UTF-8"><title>{escape(title)}</title><base href="/admin/"></head>
+<body><div id="container">{menu}<div id="content"><div id="alert"></div><h1>{escape(title)}</h1>{content}</div></div>{modal}
+<script>{SCRIPT}{ADMIN_SCRIPT}</script>
+</body></html>"""
+
+    def admin_login(self):
+        content = f"""<form id="form-login" action="index.php?route=common/login.login&amp;login_token={self.session['login_token']}" data-oc-toggle="ajax">
+  <input type="text" name="username" id="input-username" class="form-control">
+  <input type="password" name="password" id="input-password" class="form-control">
+  <button type="submit" class="btn btn-primary">Login</button>
+</form>"""
+        self.html(self.admin_page("Administration", content))
+
+    def admin_login_post(self):
+        if self.query.get("login_token") != self.session["login_token"]:
+            return self.json({"error": {"warning": "Warning: Invalid token session. Please login again."}})
+        username, password = self.field("username"), self.field("password")
+        if self.store.admin_users.get(username) != password or not password:
+            return self.json({"error": {"warning": "Warning: No match for Username and/or Password."}})
+        self.session["user_token"] = secrets.token_hex(16)
+        self.json({"success": "Success: You have successfully logged in!",
+                   "redirect": f"/admin/index.php?route=common/dashboard&user_token={self.session['user_token']}"})
+
+    def dashboard(self):
+        self.html(self.admin_page("Dashboard", "<p>Total Orders 0</p>", popup=True))
+
+    def add_new_button(self, route):
+        return f'<a href="{self.admin_url(route)}" data-bs-original-title="Add New" class="btn btn-primary">+</a>'
+
+    def category_list(self):
+        rows = "".join(f'<tr><td><input type="checkbox" name="selected[]" value="{cid}"></td><td class="text-start">{escape(c["name"])}</td></tr>'
+                       for cid, c in sorted(self.store.categories.items()))
+        content = f"""<div class="float-end">{self.add_new_button('catalog/category.form')}</div>
+<form id="form-category" method="post" data-oc-toggle="ajax"><table class="table table-bordered table-hover"><tbody>{rows}</tbody></table></form>"""
+        self.html(self.admin_page("Categories", content))
+
+    def editor(self, field, value=""):
+        return (f'<textarea name="{field}" style="display:none"></textarea>'
+                f'<div class="note-editable" contenteditable="true" style="min-height:50px;border:1px solid #ccc">{value}</div>')
+
+    def category_form(self):
+        content = f"""<form id="form-category" action="{self.admin_url('catalog/category.save')}" method="post" data-oc-toggle="ajax">
+  <input type="hidden" name="category_id" value="0">
+  <input type="text" name="category_description[1][name]" id="input-name1" class="form-control">
+  {self.editor('category_description[1][description]')}
+  <input type="text" name="category_description[1][meta_title]" id="input-meta-title1" class="form-control">
+  <input type="text" name="category_seo_url[0][1]" id="input-keyword-0-1" class="form-control">
+  <input type="hidden" name="parent_id" value="0"><input type="hidden" name="status" value="1">
+</form>
+<button type="submit" form="form-category" data-bs-original-title="Save" class="btn btn-primary">Save</button>"""
+        self.html(self.admin_page("Categories", content))
+
+    def category_save(self):
+        name = self.field("category_description[1][name]").strip()
+        if not 1 <= len(name) <= 255:
+            return self.json({"error": {"name_1": "Category Name must be between 1 and 255 characters!"}})
+        cid = int(self.field("category_id", "0") or 0) or self.store.new_id()
+        self.store.categories[cid] = {"name": name, "parent_id": int(self.field("parent_id", "0") or 0),
+                                      "status": int(self.field("status", "1") or 0)}
+        self.json({"success": "Success: You have modified categories!", "category_id": cid})
+
+    def category_delete(self):
+        for cid in self.form.get("selected[]", []):
+            self.store.categories.pop(int(cid), None)
+        self.json({"success": "Success: You have modified categories!"})
+
+    def product_rows(self):
+        text = self.query.get("filter_name", "").lower()
+        rows = "".join(f"""<tr><td class="text-center"><input type="checkbox" name="selected[]" value="{pid}"></td>
+  <td class="text-start">{escape(p["name"])}</td><td class="text-start">{escape(p["model"])}</td><td class="text-end">{p["price"]:.2f}</td></tr>"""
+                       for pid, p in sorted(self.store.products.items()) if p["name"].lower().startswith(text))
+        return f'<table class="table table-bordered table-hover"><tbody>{rows}</tbody></table>'
+
+    def product_list(self):
+        content = f"""<div class="float-end">{self.add_new_button('catalog/product.form')}
+  <button type="submit" form="form-product" formaction="{self.admin_url('catalog/product.delete')}" data-confirm="Are you sure?"
+    data-bs-original-title="Delete" class="btn btn-danger">-</button></div>
+<div id="filter-product"><input type="text" name="filter_name" id="input-name" class="form-control">
+  <button type="button" id="button-filter" class="btn btn-light">Filter</button></div>
+<form id="form-product" method="post" data-oc-toggle="ajax" data-oc-reload="1">
+  <div id="product" data-url="{self.admin_url('catalog/product.list')}">{self.product_rows()}</div></form>"""
+        self.html(self.admin_page("Products", content))
+
+    def product_list_fragment(self):
+        self.html(self.product_rows())
+
+    def product_form(self):
+        content = f"""<form id="form-product" action="{self.admin_url('catalog/product.save')}" method="post" data-oc-toggle="ajax">
+  <input type="hidden" name="product_id" value="0">
+  <ul class="nav nav-tabs"><li><a href="#tab-general">General</a></li><li><a href="#tab-data">Data</a></li><li><a href="#tab-links">Links</a></li></ul>
+  <div class="tab-content">
+    <div class="tab-pane" id="tab-general" style="display:block">
+      <input type="text" name="product_description[1][name]" id="input-name1" class="form-control">
+      {self.editor('product_description[1][description]')}
+      <input type="text" name="product_description[1][meta_title]" id="input-meta-title1" class="form-control">
+    </div>
+    <div class="tab-pane" id="tab-data" style="display:none">
+      <input type="text" name="model" id="input-model" class="form-control">
+      <input type="text" name="price" id="input-price" value="0" class="form-control">
+      <input type="hidden" name="status" value="1">
+    </div>
+    <div class="tab-pane" id="tab-links" style="display:none">
+      <input type="text" name="category" id="input-category" data-url="{self.admin_url('catalog/category.autocomplete')}" class="form-control" autocomplete="off">
+      <ul class="dropdown-menu" style="display:none"></ul>
+      <ul id="product-category" class="list-unstyled"></ul>
+    </div>
+  </div>
+</form>
+<button type="submit" form="form-product" data-bs-original-title="Save" class="btn btn-primary">Save</button>"""
+        self.html(self.admin_page("Products", content))
+
+    def product_save(self):
+        name = self.field("product_description[1][name]").strip()
+        errors = {}
+        if not 1 <= len(name) <= 255:
+            errors["name_1"] = "Product Name must be greater than 1 and less than 255 characters!"
+        if not self.field("product_description[1][meta_title]").strip():
+            errors["meta_title_1"] = "Meta Title must be greater than 1 and less than 255 characters!"
+        if not 1 <= len(self.field("model")) <= 64:
+            errors["model"] = "Product Model must be greater than 1 and less than 64 characters!"
+        if errors:
+            errors["warning"] = "Warning: Please check the form carefully for errors!"
+            return self.json({"error": errors})
+        pid = int(self.field("product_id", "0") or 0) or self.store.new_id()
+        description = self.field("product_description[1][description]")
+        self.store.products[pid] = {
+            "name": name, "model": self.field("model"), "price": float(self.field("price", "0") or 0),
+            "description": description.replace("<p>", "").replace("</p>", "") or name,
+            "categories": {int(c) for c in self.form.get("product_category[]", []) if c},
+            "status": int(self.field("status", "1") or 0),
+        }
+        self.json({"success": "Success: You have modified products!", "product_id": pid})
+
+    def product_delete(self):
+        for pid in self.form.get("selected[]", []):
+            self.store.products.pop(int(pid), None)
+        self.json({"success": "Success: You have modified products!"})
+
+    def category_autocomplete(self):
+        text = self.query.get("filter_name", "").lower()
+        self.json([{"category_id": cid, "name": c["name"]} for cid, c in sorted(self.store.categories.items())
+                   if c["name"].lower().startswith(text)][:5])
+
+    def product_autocomplete(self):
+        text = self.query.get("filter_name", "").lower()
+        self.json([{"product_id": pid, "name": p["name"], "model": p["model"]} for pid, p in sorted(self.store.products.items())
+                   if p["name"].lower().startswith(text)][:5])
+
+
+STOREFRONT_ROUTES = {
+    "common/home": StandinHandler.home,
+    "product/category": StandinHandler.category,
+    "product/search": StandinHandler.search,
+    "product/product": StandinHandler.product,
+    "product/product/write": StandinHandler.write_review,
+    "checkout/cart": StandinHandler.cart,
+    "checkout/cart/add": StandinHandler.cart_add,
+    "account/wishlist/add": StandinHandler.wishlist_add,
+    "common/currency/currency": StandinHandler.currency,
+    "account/register": StandinHandler.register,
+    "account/login": StandinHandler.login,
+    "account/account": StandinHandler.account,
+    "account/success": StandinHandler.success,
+}
+
+ADMIN_ROUTES = {
+    "common/login": StandinHandler.admin_login,
+    "common/login.login": StandinHandler.admin_login_post,
+    "common/dashboard": StandinHandler.dashboard,
+    "catalog/category": StandinHandler.category_list,
+    "catalog/category.form": StandinHandler.category_form,
+    "catalog/category.save": StandinHandler.category_save,
+    "catalog/category.delete": StandinHandler.category_delete,
+    "catalog/category.autocomplete": StandinHandler.category_autocomplete,
+    "catalog/product": StandinHandler.product_list,
+    "catalog/product.list": StandinHandler.product_list_fragment,
+    "catalog/product.form": StandinHandler.product_form,
+    "catalog/product.save": StandinHandler.product_save,
+    "catalog/product.delete": StandinHandler.product_delete,
+    "catalog/product.autocomplete": StandinHandler.product_autocomplete,
+}
+
+
+class OpenCartStandin:
+    def __init__(self, host="127.0.0.1", port=0, admin_users=None):
+        self.store = Store(admin_users)
+        self.httpd = ThreadingHTTPServer((host, port), StandinHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = self.store
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info("Локальный стенд OpenCart запущен: %s", self.base_url)
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный стенд OpenCart для тестов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    standin = OpenCartStandin(args.host, args.port)
+    logger.info("WEBTEST_BASE_URL=%s", standin.base_url)
+    try:
+        standin.httpd.serve_forever()
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
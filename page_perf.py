@@ -0,0 +1,210 @@
+import argparse
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from selenium.common.exceptions import WebDriverException
+import logs
+from impact import page_path
+from timing import percentile
+
+logger = logging.getLogger()
+
+# Скорость страниц по данным браузера: после каждого перехода page object снимает Navigation Timing,
+# Resource Timing и LCP. Тест может задать бюджет страницы - превышение роняет шаг.
+# Замеры прогона копятся по воркерам, контроллер сводит их в историю для отчёта о трендах.
+PERF_DIR = os.path.join(".webtest", "perf")
+HISTORY_FILE = os.path.join(PERF_DIR, "history.json")
+HISTORY_LIMIT = 100
+ENABLED = os.environ.get("WEBTEST_PAGE_PERF", "1") == "1"
+
+# Времена в мс от начала навигации, requests - документ и все ресурсы, transfer - КБ по сети
+METRICS = ("ttfb", "dcl", "load", "lcp", "requests", "transfer")
+UNITS = {"ttfb": "мс", "dcl": "мс", "load": "мс", "lcp": "мс", "requests": "", "transfer": "КБ"}
+
+# Ждёт DOMContentLoaded, если документ ещё грузится; LCP приходит из буфера PerformanceObserver
+PERF_JS = """
+var done = arguments[arguments.length - 1];
+function measure() {
+    var nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) {
+        done(null);
+        return;
+    }
+    var resources = performance.getEntriesByType('resource');
+    var result = {
+        origin: performance.timeOrigin,
+        url: location.href,
+        ttfb: nav.responseStart - nav.startTime,
+        dcl: nav.domContentLoadedEventEnd - nav.startTime,
+        load: nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null,
+        lcp: null,
+        requests: resources.length + 1,
+        transfer: resources.reduce(function (sum, r) { return sum + (r.transferSize || 0); }, nav.transferSize || 0) / 1024
+    };
+    var finished = false;
+    function finish() {
+        if (!finished) {
+            finished = true;
+            done(result);
+        }
+    }
+    try {
+        new PerformanceObserver(function (list) {
+            var entries = list.getEntries();
+            result.lcp = entries[entries.length - 1].startTime;
+            finish();
+        }).observe({type: 'largest-contentful-paint', buffered: true});
+    } catch (e) {}
+    setTimeout(finish, 30);
+}
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', function () { setTimeout(measure, 0); });
+} else {
+    measure();
+}
+"""
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+class PagePerf:
+    def __init__(self):
+        self.samples = {}
+        # Бюджеты текущего теста: страница -> {метрика: предел}
+        self.budgets = {}
+        # Начало последней замеренной навигации в каждом браузере: повторно страница не замеряется
+        self.origins = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+
+    def collect(self, driver, page):
+        try:
+            entry = driver.execute_async_script(PERF_JS)
+        except WebDriverException as e:
+            logger.debug("Скорость страницы %s не замерена: %s", page, e.msg)
+            return None
+        if not entry or self.origins.get(driver) == entry["origin"]:
+            return None
+        self.origins[driver] = entry["origin"]
+        metrics = {metric: entry[metric] for metric in METRICS}
+        with self.lock:
+            self.samples.setdefault(page, []).append(dict(metrics, test=logs.context["test"], url=page_path(entry["url"])))
+        return metrics
+
+    def check(self, page, metrics):
+        exceeded = [f"{metric} {metrics[metric]:.0f} > {limit} {UNITS[metric]}".rstrip()
+                    for metric, limit in self.budgets.get(page, {}).items()
+                    if metrics.get(metric) is not None and metrics[metric] > limit]
+        if exceeded:
+            raise BudgetExceeded(f"Бюджет страницы {page} превышен: {', '.join(exceeded)}")
+
+    def save_run(self, worker_id):
+        if not self.samples:
+            return
+        os.makedirs(PERF_DIR, exist_ok=True)
+        with open(os.path.join(PERF_DIR, f"run-{worker_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(self.samples, f, ensure_ascii=False)
+
+
+perf = PagePerf()
+
+
+def page_metrics(page):
+    # Для методов page object, после которых открыта страница page
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            if ENABLED:
+                metrics = perf.collect(self.driver, page)
+                if metrics:
+                    perf.check(page, metrics)
+            return result
+        return wrapper
+    return decorate
+
+
+def summarize(samples):
+    summary = {}
+    for page, entries in samples.items():
+        summary[page] = {"count": len(entries)}
+        for metric in METRICS:
+            values = [entry[metric] for entry in entries if entry[metric] is not None]
+            summary[page][metric] = ({"p50": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+                                     if values else None)
+    return summary
+
+
+def format_table(summary):
+    def value(stats, q="p50"):
+        return f"{stats[q]:.0f}" if stats else "-"
+
+    lines = [f"{'Страница':<20} {'раз':>4} {'TTFB':>6} {'DCL p50':>8} {'DCL p95':>8} {'load':>6} {'LCP':>6} "
+             f"{'запросов':>8} {'КБ':>7}"]
+    for page, stats in sorted(summary.items()):
+        lines.append(f"{page:<20} {stats['count']:>4} {value(stats['ttfb']):>6} {value(stats['dcl']):>8} "
+                     f"{value(stats['dcl'], 'p95'):>8} {value(stats['load']):>6} {value(stats['lcp']):>6} "
+                     f"{value(stats['requests']):>8} {value(stats['transfer']):>7}")
+    return "\n".join(lines)
+
+
+def load_history():
+    try:
+        with open(HISTORY_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def merge_runs():
+    runs = glob.glob(os.path.join(PERF_DIR, "run-*.json"))
+    if not runs:
+        return
+    samples = {}
+    for path in runs:
+        with open(path, encoding="utf-8") as f:
+            for page, entries in json.load(f).items():
+                samples.setdefault(page, []).extend(entries)
+        os.remove(path)
+    history = load_history()
+    history.append({"run": os.environ.get("WEBTEST_RUN_ID"), "time": time.time(), "pages": summarize(samples)})
+    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
+        json.dump(history[-HISTORY_LIMIT:], f, indent=2, ensure_ascii=False)
+
+
+def format_trend(history, metric, runs):
+    # p50 метрики по страницам в последних прогонах и изменение от первого из них к последнему
+    history = history[-runs:]
+    pages = sorted({page for run in history for page in run["pages"]})
+    header = " ".join(f"{time.strftime('%d.%m %H:%M', time.localtime(run['time'])):>11}" for run in history)
+    lines = [f"{metric} p50, {UNITS[metric] or 'шт.'}", f"{'Страница':<20} {header} {'изм.':>8}"]
+    for page in pages:
+        values = [(run["pages"].get(page) or {}).get(metric) for run in history]
+        values = [stats["p50"] if stats else None for stats in values]
+        cells = " ".join(f"{value:>11.0f}" if value is not None else f"{'-':>11}" for value in values)
+        known = [value for value in values if value is not None]
+        change = f"{(known[-1] - known[0]) / known[0] * 100:+.0f}%" if len(known) > 1 and known[0] else "-"
+        lines.append(f"{page:<20} {cells} {change:>8}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Скорость страниц по прогонам")
+    parser.add_argument("--metric", choices=METRICS, default="dcl")
+    parser.add_argument("--runs", type=int, default=10, help="последних прогонов в отчёте")
+    args = parser.parse_args()
+    history = load_history()
+    if not history:
+        print(f"История пуста: {HISTORY_FILE}")
+        return
+    print(format_trend(history, args.metric, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# Page objects магазина: импорт пакета ничего не запускает - ни браузер, ни логгирование.
+# Адреса страниц относительные и разрешаются от settings.BASE_URL при переходе.
+from pages.base import BasePage
+from pages.storefront import AccountPage, CartPage, MainPage, ProductPage, RegisterPage
+from pages.admin import AdminCategoryPage, AdminLoginPage, AdminProductPage
@@ -0,0 +1,174 @@
+import logging
+import allure
+from selenium.webdriver.common.by import By
+from page_perf import page_metrics
+from pages.base import BasePage
+from retry import retry_step
+from timing import timed_page
+
+logger = logging.getLogger()
+
+# Админ-панель (разметка OpenCart 4)
+
+@timed_page
+class AdminLoginPage(BasePage):
+    URL = "admin/"
+    TIMEOUT = 20
+    LOCATORS = {
+        "username": (By.ID, "input-username"),
+        "password": (By.ID, "input-password"),
+        "submit": (By.CSS_SELECTOR, "button[type='submit']"),
+        "popup_close": (By.CSS_SELECTOR, ".btn-close"),
+    }
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.dashboard_url = None
+
+    @allure.step("Открыть страницу входа в админ-панель")
+    @page_metrics("admin_login")
+    def open(self):
+        self.navigate(self.URL)
+        logger.info("Открыта страница входа в админ-панель")
+
+    @allure.step("Войти в админ-панель")
+    @page_metrics("admin_dashboard")
+    def login(self, username, password):
+        self.type("username", username, state="visible")
+        self.type("password", password)
+        self.click("submit", state="present")
+        self.invalidate()
+        logger.info("Выполнен вход в админ-панель")
+        self.click("popup_close")
+        logger.info("Закрыто всплывающее окно")
+
+    @allure.step("Закрыть всплывающее окно, если оно есть")
+    def dismiss_popup(self):
+        self.settle.wait("Загрузка панели")
+        for close_btn in self.driver.find_elements(*self.locator("popup_close")):
+            if close_btn.is_displayed():
+                close_btn.click()
+                logger.info("Закрыто всплывающее окно")
+
+    @allure.step("Вернуться на панель управления")
+    @page_metrics("admin_dashboard")
+    def open_dashboard(self):
+        self.navigate(self.dashboard_url)
+        self.dismiss_popup()
+
+    def is_logged_in(self):
+        return "user_token=" in self.driver.current_url and not self.driver.find_elements(*self.locator("username"))
+
+# Общие элементы меню и формы редактирования
+ADMIN_LOCATORS = {
+    "menu_catalog": (By.ID, "menu-catalog"),
+    "menu_link": (By.LINK_TEXT, "{}"),
+    "add_new": (By.CSS_SELECTOR, "a[data-bs-original-title='Add New']"),
+    "name": (By.ID, "input-name1"),
+    "description": (By.CSS_SELECTOR, "div.note-editable"),
+    "save": (By.CSS_SELECTOR, "button[data-bs-original-title='Save']"),
+}
+
+@timed_page
+class AdminCategoryPage(BasePage):
+    TIMEOUT = 20
+    LOCATORS = ADMIN_LOCATORS
+
+    @allure.step("Перейти в раздел Категорий")
+    @page_metrics("admin_categories")
+    def open(self):
+        self.click("menu_catalog")
+        self.click("menu_link", "Categories")
+        self.invalidate()
+        logger.info("Открыт раздел Категорий")
+
+    @allure.step("Создать новую категорию: {1}")
+    def create_category(self, category_name, description="Test description"):
+        self.click("add_new")
+        self.invalidate()
+        logger.info("Нажата кнопка создания новой категории")
+
+        self.type("name", category_name, state="visible")
+        self.type("description", description)
+        logger.info("Введено имя категории '%s' и описание", category_name)
+
+        self.click("save", state="present")
+        logger.info("Категория '%s' создана", category_name)
+        self.settle.wait("Сохранение категории", toast=True)
+
+@timed_page
+class AdminProductPage(BasePage):
+    TIMEOUT = 20
+    LOCATORS = dict(ADMIN_LOCATORS, **{
+        "meta_title": (By.ID, "input-meta-title1"),
+        "model": (By.ID, "input-model"),
+        "category": (By.ID, "input-category"),
+        "category_option": (By.CSS_SELECTOR, ".dropdown-menu li a"),
+        "filter_name": (By.ID, "input-name"),
+        "filter_button": (By.ID, "button-filter"),
+        "row_checkbox": (By.CSS_SELECTOR, "input[type='checkbox'][name='selected[]']"),
+        "delete": (By.CSS_SELECTOR, "button[data-bs-original-title='Delete']"),
+    })
+
+    @allure.step("Перейти в раздел Товаров")
+    @page_metrics("admin_products")
+    def open(self):
+        self.click("menu_catalog")
+        self.click("menu_link", "Products")
+        self.invalidate()
+        logger.info("Открыт раздел Товаров")
+
+    @allure.step("Добавить товар: {1} в категорию {2}")
+    def add_product(self, name, category_name, description="Test product description"):
+        self.click("add_new")
+        self.invalidate()
+        logger.info("Нажата кнопка создания нового товара")
+
+        self.type("name", name, state="visible")
+        self.type("meta_title", name)
+        self.type("description", description)
+
+        self.click("menu_link", "Data", state="present")
+        self.type("model", "Model-"+name, state="visible")
+
+        self.click("menu_link", "Links", state="present")
+        self.choose_category(category_name)
+
+        self.click("save", state="present")
+        logger.info("Товар '%s' добавлен в категорию '%s'", name, category_name)
+        self.settle.wait("Сохранение товара", toast=True)
+
+    @allure.step("Выбрать категорию товара: {1}")
+    @retry_step()
+    def choose_category(self, category_name):
+        # Ввод с очисткой поля можно повторять: подсказки запрашиваются заново
+        self.type("category", category_name, clear=True, state="visible")
+        self.click("category_option")
+
+    @allure.step("Отфильтровать товары: {1}")
+    @retry_step()
+    def filter_products(self, product_name):
+        # Фильтр и кнопка удаления остаются на странице, список товаров перезагружается ajax
+        self.type("filter_name", product_name, clear=True, state="visible")
+        self.click("filter_button", state="present")
+        self.settle.wait("Фильтрация товаров")
+        self.forget("row_checkbox")
+
+    @allure.step("Подтвердить удаление")
+    @retry_step()
+    def confirm_deletion(self):
+        # Если confirm() не открылся, повторный клик по кнопке безопасен: отметка товара сохраняется
+        self.click("delete", state="present")
+        self.settle.wait_for_alert("Подтверждение удаления").accept()
+
+    @allure.step("Удалить товар: {1}")
+    def delete_product_by_name(self, product_name):
+        self.filter_products(product_name)
+
+        self.click("row_checkbox")
+        logger.info("Выбран товар для удаления: %s", product_name)
+
+        self.confirm_deletion()
+        logger.info("Товар '%s' удалён", product_name)
+        self.settle.wait("Удаление товара", toast=True)
+        self.forget("row_checkbox")
@@ -0,0 +1,103 @@
+import weakref
+from urllib.parse import urljoin
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException
+from timing import TimedWait
+from timeouts import AdaptiveWait
+from waits import PageSettle
+import settings
+
+CONDITIONS = {
+    "present": EC.presence_of_element_located,
+    "visible": EC.visibility_of_element_located,
+    "clickable": EC.element_to_be_clickable,
+}
+
+# Найденные элементы текущей страницы, общие для всех page objects одного браузера
+_element_caches = weakref.WeakKeyDictionary()
+
+# Переход без ожидания загрузки; возвращает начало навигации старой страницы
+_VISIT_JS = "var origin = performance.timeOrigin; window.location.href = arguments[0]; return origin;"
+_LOADED_JS = "return document.readyState !== 'loading' && performance.timeOrigin !== arguments[0];"
+
+
+def forget_elements(driver):
+    _element_caches.pop(driver, None)
+
+
+class BasePage:
+    # Адрес относительно settings.BASE_URL: стенд может подменить его уже после импорта
+    URL = None
+    TIMEOUT = 30
+    # Имя -> (By, значение); в значении можно оставить {} для подстановки аргументов
+    LOCATORS = {}
+
+    def __init__(self, driver):
+        self.driver = driver
+        # Потолок ожиданий; для локаторов с историей тайм-аут берётся из профиля задержек
+        self.timeout = self.TIMEOUT
+        self.wait = TimedWait(driver, self.TIMEOUT)
+        self.settle = PageSettle(driver)
+
+    @property
+    def elements(self):
+        return _element_caches.setdefault(self.driver, {})
+
+    def wait_for(self, name, *args):
+        label = f"{name}[{','.join(map(str, args))}]" if args else name
+        return AdaptiveWait(self.driver, label, self.timeout, owner=type(self).__name__)
+
+    def locator(self, name, *args):
+        by, value = self.LOCATORS[name]
+        return by, value.format(*args) if args else value
+
+    def invalidate(self):
+        self.elements.clear()
+
+    def forget(self, name, *args):
+        locator = self.locator(name, *args)
+        for key in [key for key in self.elements if key[0] == locator]:
+            del self.elements[key]
+
+    def navigate(self, url):
+        self.invalidate()
+        self.driver.get(urljoin(settings.BASE_URL, url))
+
+    def visit(self, url):
+        # Для задач TabScheduler: переход запускается, а условие загрузки отдаётся планировщику
+        self.invalidate()
+        origin = self.driver.execute_script(_VISIT_JS, urljoin(settings.BASE_URL, url))
+        return lambda driver: driver.execute_script(_LOADED_JS, origin)
+
+    def find(self, name, *args, state="present"):
+        # Элемент ищется при первом обращении и до смены страницы берётся из кэша
+        key = (self.locator(name, *args), state)
+        element = self.elements.get(key)
+        if element is None:
+            element = self.wait_for(name, *args).until(CONDITIONS[state](key[0]))
+            self.elements[key] = element
+        return element
+
+    def find_all(self, name, *args):
+        return self.wait_for(name, *args).until(EC.presence_of_all_elements_located(self.locator(name, *args)))
+
+    def perform(self, action, name, *args, state="present"):
+        try:
+            element = self.find(name, *args, state=state)
+            action(element)
+        except StaleElementReferenceException:
+            # Страница сменилась в обход page object: кэш устарел целиком
+            self.invalidate()
+            element = self.find(name, *args, state=state)
+            action(element)
+        return element
+
+    def click(self, name, *args, state="clickable"):
+        return self.perform(lambda element: element.click(), name, *args, state=state)
+
+    def type(self, name, text, clear=False, state="present"):
+        def send(element):
+            if clear:
+                element.clear()
+            element.send_keys(text)
+        return self.perform(send, name, state=state)
@@ -0,0 +1,253 @@
+import logging
+from urllib.parse import quote
+import allure
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from artifacts import capture
+from page_perf import page_metrics
+from pages.base import BasePage
+from retry import retry_step
+from timing import timed_page
+
+logger = logging.getLogger()
+
+# Витрина магазина (разметка OpenCart 3)
+
+# Карточки товаров и строки корзины читаются одним execute_script вместо
+# find_element + .text на каждый элемент; кнопки возвращаются как WebElement
+PRODUCT_CARDS_JS = """
+return Array.prototype.map.call(document.querySelectorAll('.product-layout'), function (card) {
+    var title = card.querySelector('h4 a');
+    var price = card.querySelector('.price');
+    return {
+        name: title ? title.textContent.trim() : '',
+        price: price ? (price.querySelector('.price-new') || price.firstChild).textContent.trim() : '',
+        link: title,
+        cart: card.querySelector("button[onclick*='cart.add']"),
+        wishlist: card.querySelector("button[data-original-title='Add to Wish List']")
+    };
+});
+"""
+
+CART_ROWS_JS = """
+var rows = [];
+document.querySelectorAll('table.table-bordered tbody tr').forEach(function (row) {
+    var link = row.querySelector('td.text-left a');
+    if (!link) {
+        return;
+    }
+    var quantity = row.querySelector("input[name^='quantity']");
+    var cells = row.querySelectorAll('td.text-right');
+    rows.push({
+        name: link.textContent.trim(),
+        quantity: quantity ? quantity.value : '',
+        total: cells.length ? cells[cells.length - 1].textContent.trim() : ''
+    });
+});
+return rows;
+"""
+
+@timed_page
+class MainPage(BasePage):
+    URL = ""
+    LOCATORS = {
+        "first_product": (By.CSS_SELECTOR, ".product-layout .caption a"),
+        "currency_toggle": (By.CSS_SELECTOR, "button.btn-link.dropdown-toggle"),
+        "currency": (By.NAME, "{}"),
+        "menu_link": (By.LINK_TEXT, "{}"),
+        "search_input": (By.NAME, "search"),
+        "search_button": (By.CSS_SELECTOR, "button.btn.btn-default.btn-lg"),
+        "product_cards": (By.CSS_SELECTOR, ".product-layout"),
+        "product_link": (By.LINK_TEXT, "{}"),
+    }
+
+    @allure.step("Открыть главную страницу")
+    @page_metrics("home")
+    def open(self):
+        logger.info("Открываем главную страницу")
+        self.navigate(self.URL)
+
+    @allure.step("Клик по первому продукту")
+    @page_metrics("product")
+    def click_first_product(self):
+        self.click("first_product")
+        self.invalidate()
+        logger.info("Клик по первому продукту")
+
+    @allure.step("Смена валюты на {1}")
+    def change_currency(self, currency_name):
+        currency_button = self.click("currency_toggle")
+        self.click("currency", currency_name)
+        self.invalidate()
+        logger.info("Смена валюты на %s", currency_name)
+        self.settle.wait("Смена валюты", stale=currency_button)
+
+    @allure.step("Переход в категорию {1} -> {2}")
+    @page_metrics("category")
+    def go_to_category(self, category_name, subcategory_name=None):
+        self.click("menu_link", category_name)
+        logger.info("Переход в категорию %s", category_name)
+        if subcategory_name:
+            self.click("menu_link", subcategory_name)
+            logger.info("Переход в подкатегорию %s", subcategory_name)
+        self.invalidate()
+
+    @allure.step("Поиск товара: {1}")
+    @page_metrics("search")
+    @retry_step()
+    def search_product(self, product_name):
+        search_input = self.type("search_input", product_name, clear=True, state="visible")
+        self.click("search_button", state="present")
+        self.invalidate()
+        logger.info("Поиск товара: %s", product_name)
+        self.settle.wait("Поиск товара", stale=search_input)
+
+    def search_in_tab(self, product_name):
+        # Задача для TabScheduler: поиск по адресу результатов, есть ли ссылка на товар
+        yield self.visit(f"index.php?route=product/search&search={quote(product_name)}")
+        return bool(self.driver.find_elements(*self.locator("product_link", product_name)))
+
+    def product_cards(self):
+        self.find_all("product_cards")
+        return self.driver.execute_script(PRODUCT_CARDS_JS)
+
+    def find_product(self, product_name):
+        for product in self.product_cards():
+            if product_name.lower() in product["name"].lower():
+                return product
+        return None
+
+    @allure.step("Добавление товара в вишлист: {1}")
+    def add_product_to_wishlist_by_name(self, product_name):
+        product = self.find_product(product_name)
+        if product and product["wishlist"]:
+            product["wishlist"].click()
+            logger.info("Товар %s добавлен в вишлист", product_name)
+            self.settle.wait("Добавление в вишлист", toast=True)
+            return True
+        logger.warning("Товар %s не найден для добавления в вишлист", product_name)
+        return False
+
+    @allure.step("Добавление товара в корзину: {1}")
+    def add_product_to_cart_by_name(self, product_name):
+        product = self.find_product(product_name)
+        if product and product["cart"]:
+            product["cart"].click()
+            logger.info("Товар %s добавлен в корзину", product_name)
+            self.settle.wait("Добавление в корзину", toast=True)
+            return True
+        logger.warning("Товар %s не найден для добавления в корзину", product_name)
+        return False
+
+@timed_page
+class ProductPage(BasePage):
+    LOCATORS = {
+        "thumbnails": (By.CSS_SELECTOR, ".thumbnails li a"),
+        "reviews_tab": (By.LINK_TEXT, "Reviews (0)"),
+        "review_name": (By.ID, "input-name"),
+        "review_text": (By.ID, "input-review"),
+        "rating": (By.CSS_SELECTOR, "input[name='rating'][value='{}']"),
+        "review_button": (By.ID, "button-review"),
+        "success": (By.CSS_SELECTOR, ".alert-success"),
+    }
+
+    @allure.step("Проверка галереи скриншотов")
+    def check_thumbnails(self):
+        thumbnails = self.find_all("thumbnails")
+        if len(thumbnails) > 1:
+            for thumb in thumbnails:
+                thumb.click()
+                self.settle.wait("Переключение скриншота")
+            logger.info("Галерея скриншотов переключается")
+        else:
+            logger.warning("Скриншоты отсутствуют или только один")
+
+    @allure.step("Оставить отзыв о товаре")
+    def add_review(self, name, review_text, rating=5):
+        self.click("reviews_tab")
+        self.type("review_name", name, state="visible")
+        self.type("review_text", review_text)
+        self.click("rating", rating, state="present")
+        self.click("review_button", state="present")
+        try:
+            # Сообщение появляется заново после каждой отправки, поэтому без кэша
+            alert = self.wait.until(EC.visibility_of_element_located(self.locator("success")))
+            logger.info("Отзыв успешно отправлен: %s", alert.text)
+            capture(self.driver, "ReviewSuccess")
+        except TimeoutException:
+            logger.error("Не удалось подтвердить отправку отзыва")
+            capture(self.driver, "ReviewFail")
+
+@timed_page
+class RegisterPage(BasePage):
+    URL = "index.php?route=account/register"
+    LOCATORS = {
+        "firstname": (By.ID, "input-firstname"),
+        "lastname": (By.ID, "input-lastname"),
+        "email": (By.ID, "input-email"),
+        "telephone": (By.ID, "input-telephone"),
+        "password": (By.ID, "input-password"),
+        "confirm": (By.ID, "input-confirm"),
+        "agree": (By.NAME, "agree"),
+        "submit": (By.CSS_SELECTOR, "input.btn.btn-primary"),
+    }
+
+    @allure.step("Открыть страницу регистрации")
+    @page_metrics("register")
+    def open(self):
+        self.navigate(self.URL)
+        logger.info("Открыта страница регистрации")
+
+    @allure.step("Регистрация пользователя: {1} {2}")
+    def register(self, firstname, lastname, email, telephone, password):
+        self.type("firstname", firstname, state="visible")
+        self.type("lastname", lastname)
+        self.type("email", email)
+        self.type("telephone", telephone)
+        self.type("password", password)
+        self.type("confirm", password)
+        self.click("agree", state="present")
+        self.click("submit", state="present")
+        self.invalidate()
+        logger.info("Регистрация пользователя: %s %s", firstname, lastname)
+
+@timed_page
+class AccountPage(BasePage):
+    URL = "index.php?route=account/account"
+
+    @allure.step("Проверка входа покупателя")
+    def is_logged_in(self):
+        # Без авторизации личный кабинет перенаправляет на страницу входа
+        self.navigate(self.URL)
+        return "account/login" not in self.driver.current_url
+
+@timed_page
+class CartPage(BasePage):
+    URL = "index.php?route=checkout/cart"
+    LOCATORS = {
+        "rows": (By.CSS_SELECTOR, "table.table-bordered tbody tr"),
+    }
+
+    @allure.step("Открыть корзину")
+    @page_metrics("cart")
+    def open(self):
+        self.navigate(self.URL)
+        logger.info("Открыта корзина")
+
+    def cart_items(self):
+        self.find_all("rows")
+        return self.driver.execute_script(CART_ROWS_JS)
+
+    @allure.step("Проверка наличия товара в корзине: {1}")
+    def is_product_in_cart(self, product_name):
+        try:
+            items = self.cart_items()
+        except TimeoutException:
+            logger.error("Корзина пуста или не загрузилась")
+            return False
+        if any(product_name.lower() in item["name"].lower() for item in items):
+            logger.info("Товар %s найден в корзине", product_name)
+            return True
+        logger.warning("Товар %s не найден в корзине", product_name)
+        return False
@@ -0,0 +1,63 @@
+import statistics
+import sys
+from urllib.parse import urljoin
+import settings
+from browser import browser_rss_mb, create_driver
+from pages import CartPage, MainPage
+
+# Сравнение обычного и облегчённого профиля Firefox: время загрузки страниц и память браузера.
+# Запуск: python profile_compare.py [повторы]
+
+PAGES = [
+    ("Главная", MainPage.URL),
+    ("Категория", "index.php?route=product/category&path=20"),
+    ("Товар", "index.php?route=product/product&product_id=43"),
+    ("Поиск", "index.php?route=product/search&search=MacBook"),
+    ("Корзина", CartPage.URL),
+]
+
+NAVIGATION_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+return {
+    dcl: nav.domContentLoadedEventEnd - nav.startTime,
+    load: nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null,
+    requests: performance.getEntriesByType('resource').length
+};
+"""
+
+
+def measure(profile, repeats):
+    # Оба профиля запускаются headless, чтобы разница показывала только облегчение профиля
+    driver = create_driver(headless=True, profile=profile)
+    results = {}
+    try:
+        for name, url in PAGES:
+            samples = []
+            for _ in range(repeats):
+                driver.get(urljoin(settings.BASE_URL, url))
+                samples.append(driver.execute_script(NAVIGATION_JS))
+            results[name] = {
+                "dcl": statistics.median(s["dcl"] for s in samples),
+                "requests": statistics.median(s["requests"] for s in samples),
+            }
+        results["rss"] = browser_rss_mb(driver)
+    finally:
+        driver.quit()
+    return results
+
+
+def main(repeats=3):
+    default = measure("default", repeats)
+    fast = measure("fast", repeats)
+    print(f"{'Страница':<12} {'DCL обычный, мс':>16} {'DCL fast, мс':>13} {'запросов':>9} {'запросов fast':>14}")
+    for name, _ in PAGES:
+        print(f"{name:<12} {default[name]['dcl']:>16.0f} {fast[name]['dcl']:>13.0f} "
+              f"{default[name]['requests']:>9.0f} {fast[name]['requests']:>14.0f}")
+    if default["rss"] is not None:
+        print(f"Память браузера: обычный {default['rss']:.0f} МБ, fast {fast['rss']:.0f} МБ")
+    else:
+        print("Память браузера не измерена: нужен пакет psutil")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,138 @@
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from selenium.common.exceptions import (ElementClickInterceptedException, ElementNotInteractableException,
+                                        StaleElementReferenceException, TimeoutException, WebDriverException)
+import timeouts
+from timing import TimedWait
+
+logger = logging.getLogger()
+
+FLAKES_DIR = os.path.join(".webtest", "flakes")
+FLAKES_FILE = os.path.join(".webtest", "flakes.json")
+
+# Классы сбоев, которые имеет смысл повторить на уровне шага; assertion и other сразу падают
+TRANSIENT = ("stale", "timeout", "network", "interactable")
+# Для шагов, тайм-аут которых профиль ещё не выучил
+UNLEARNED_TRANSIENT = ("stale", "network", "interactable")
+
+NETWORK_MARKERS = ("about:neterror", "connection refused", "failed to establish", "connection reset",
+                   "max retries exceeded", "remote end closed", "timed out")
+
+
+def classify(error):
+    if isinstance(error, StaleElementReferenceException):
+        return "stale"
+    if isinstance(error, TimeoutException):
+        return "timeout"
+    if isinstance(error, (ElementClickInterceptedException, ElementNotInteractableException)):
+        return "interactable"
+    if isinstance(error, AssertionError):
+        return "assertion"
+    if isinstance(error, OSError):
+        return "network"
+    if isinstance(error, WebDriverException) and any(marker in str(error).lower() for marker in NETWORK_MARKERS):
+        return "network"
+    return "other"
+
+
+class FlakeDB:
+    # Для каждого шага: вызовы, прошедшие с первой попытки, восстановленные повтором, упавшие и классы сбоев
+    def __init__(self):
+        self.steps = {}
+        self.lock = threading.Lock()
+
+    def record(self, step, outcome, classes=()):
+        with self.lock:
+            stats = self.steps.setdefault(step, {"calls": 0, "passed": 0, "recovered": 0, "failed": 0, "classes": {}})
+            stats["calls"] += 1
+            stats[outcome] += 1
+            for name in classes:
+                stats["classes"][name] = stats["classes"].get(name, 0) + 1
+
+    def save_run(self, worker_id):
+        if not self.steps:
+            return
+        os.makedirs(FLAKES_DIR, exist_ok=True)
+        with open(os.path.join(FLAKES_DIR, f"run-{worker_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(self.steps, f, ensure_ascii=False)
+
+    def report(self):
+        lines = [f"{'Шаг':<45} {'вызовов':>7} {'повторено':>9} {'упало':>6} {'флейк, %':>8}  сбои"]
+        for step, stats in sorted(self.steps.items(), key=lambda item: -item[1]["recovered"]):
+            rate = 100 * stats["recovered"] / stats["calls"]
+            classes = ", ".join(f"{name}={count}" for name, count in sorted(stats["classes"].items()))
+            lines.append(f"{step:<45} {stats['calls']:>7} {stats['recovered']:>9} {stats['failed']:>6} {rate:>8.1f}  {classes}")
+        return "\n".join(lines)
+
+
+flakes = FlakeDB()
+
+
+def merge_runs():
+    # Сливает счётчики воркеров в накопительную базу флейков
+    runs = glob.glob(os.path.join(FLAKES_DIR, "run-*.json"))
+    if not runs:
+        return
+    try:
+        with open(FLAKES_FILE, encoding="utf-8") as f:
+            total = json.load(f)
+    except (OSError, ValueError):
+        total = {}
+    for path in runs:
+        with open(path, encoding="utf-8") as f:
+            for step, stats in json.load(f).items():
+                merged = total.setdefault(step, {"calls": 0, "passed": 0, "recovered": 0, "failed": 0, "classes": {}})
+                for key in ("calls", "passed", "recovered", "failed"):
+                    merged[key] += stats[key]
+                for name, count in stats["classes"].items():
+                    merged["classes"][name] = merged["classes"].get(name, 0) + count
+        os.remove(path)
+    with open(FLAKES_FILE, "w", encoding="utf-8") as f:
+        json.dump(total, f, indent=2, ensure_ascii=False)
+
+
+def retry_step(attempts=3, recover=None):
+    # Повторяет шаг page object при временных сбоях. Каждая попытка ограничена тайм-аутом,
+    # выученным профилем timeouts.py по длительностям шага, поэтому настоящая поломка обнаруживается за секунды.
+    # Пока профиль шаг не выучил, попытка ждёт полный тайм-аут и сбой "timeout" не повторяется:
+    # иначе сломанный шаг падал бы только после attempts полных тайм-аутов.
+    # recover - имя метода page object, который возвращает страницу в исходное состояние.
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            step = method.__qualname__
+            timeout = timeouts.profile.timeout(step, self.timeout)
+            transient = TRANSIENT if timeouts.profile.learned(step) else UNLEARNED_TRANSIENT
+            wait, budget, limit = self.wait, self.settle.budget, self.timeout
+            self.wait = TimedWait(self.driver, timeout)
+            self.settle.budget = min(budget, timeout)
+            self.timeout = min(limit, timeout)
+            classes = []
+            try:
+                for attempt in range(1, attempts + 1):
+                    start = time.perf_counter()
+                    try:
+                        result = method(self, *args, **kwargs)
+                    except Exception as e:
+                        kind = classify(e)
+                        classes.append(kind)
+                        if kind not in transient or attempt == attempts:
+                            flakes.record(step, "failed", classes)
+                            raise
+                        logger.warning("%s: сбой %s на попытке %s, повтор", step, kind, attempt)
+                        self.invalidate()
+                        if recover:
+                            getattr(self, recover)()
+                    else:
+                        timeouts.profile.observe(step, time.perf_counter() - start)
+                        flakes.record(step, "recovered" if classes else "passed", classes)
+                        return result
+            finally:
+                self.wait, self.settle.budget, self.timeout = wait, budget, limit
+        return wrapper
+    return decorate
@@ -0,0 +1,181 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import settings
+
+logger = logging.getLogger()
+
+LANGUAGE_ID = 1
+
+# Предел проходов purge(): автодополнение отдаёт до пяти записей за раз
+PURGE_PASSES = 200
+
+# Значения по умолчанию из пустых форм категории и товара в админке OpenCart 4
+CATEGORY_DEFAULTS = {
+    "category_id": 0,
+    "parent_id": 0,
+    "image": "",
+    "top": 0,
+    "column": 1,
+    "sort_order": 0,
+    "status": 1,
+    "category_store[]": [0],
+}
+
+PRODUCT_DEFAULTS = {
+    "product_id": 0,
+    "master_id": 0,
+    "sku": "", "upc": "", "ean": "", "jan": "", "isbn": "", "mpn": "", "location": "",
+    "price": "100.00",
+    "tax_class_id": 0,
+    "quantity": 100,
+    "minimum": 1,
+    "subtract": 1,
+    "stock_status_id": 7,
+    "date_available": "2000-01-01",
+    "shipping": 1,
+    "weight": 0, "weight_class_id": 1,
+    "length": 0, "width": 0, "height": 0, "length_class_id": 1,
+    "manufacturer_id": 0,
+    "points": 0,
+    "image": "",
+    "sort_order": 0,
+    "status": 1,
+    "product_store[]": [0],
+}
+
+
+class SeedingError(Exception):
+    pass
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+class AdminSeeder:
+    # Создаёт и удаляет тестовые данные HTTP-запросами к админке в обход UI
+    def __init__(self, admin_url=None, workers=8):
+        self.admin_url = admin_url or settings.BASE_URL + "admin/"
+        self.workers = workers
+        self.session = requests.Session()
+        self.user_token = None
+        self.created = {"category": [], "product": []}
+
+    def url(self, route):
+        return f"{self.admin_url}index.php?route={route}&user_token={self.user_token}"
+
+    def login(self, username, password):
+        page = self.session.get(f"{self.admin_url}index.php?route=common/login")
+        page.raise_for_status()
+        login_token = re.search(r"login_token=([0-9a-f]+)", page.text)
+        action = f"{self.admin_url}index.php?route=common/login.login"
+        if login_token:
+            action += f"&login_token={login_token.group(1)}"
+        response = self.session.post(action, data={"username": username, "password": password})
+        response.raise_for_status()
+        token = re.search(r"user_token=([0-9a-f]+)", response.json().get("redirect", ""))
+        if not token:
+            raise SeedingError(f"Не удалось войти в админ-панель: {response.text[:200]}")
+        self.user_token = token.group(1)
+        logger.info("Получен токен админ-панели для заполнения данных")
+
+    def post(self, route, data):
+        response = self.session.post(self.url(route), data=data)
+        response.raise_for_status()
+        result = response.json()
+        if result.get("error"):
+            raise SeedingError(f"{route}: {result['error']}")
+        return result
+
+    def search(self, entity, prefix):
+        # Автодополнение админки: записи, чьё имя начинается с prefix (OpenCart отдаёт до пяти)
+        response = self.session.get(self.url(f"catalog/{entity}.autocomplete"), params={"filter_name": prefix})
+        response.raise_for_status()
+        return response.json()
+
+    def autocomplete(self, entity, name):
+        for item in self.search(entity, name):
+            if item["name"] == name:
+                return int(item[f"{entity}_id"])
+        return None
+
+    def track(self, entity, name):
+        # Регистрирует для очистки запись, созданную через UI
+        entity_id = self.autocomplete(entity, name)
+        if entity_id:
+            self.created[entity].append(entity_id)
+        return entity_id
+
+    def create_category(self, name, description=""):
+        data = dict(CATEGORY_DEFAULTS)
+        data.update({
+            f"category_description[{LANGUAGE_ID}][name]": name,
+            f"category_description[{LANGUAGE_ID}][description]": description,
+            f"category_description[{LANGUAGE_ID}][meta_title]": name,
+            f"category_seo_url[0][{LANGUAGE_ID}]": slug(name),
+        })
+        result = self.post("catalog/category.save", data)
+        category_id = result.get("category_id") or self.autocomplete("category", name)
+        if category_id is None:
+            raise SeedingError(f"Категория '{name}' не создана: ответ на сохранение {result}")
+        self.created["category"].append(int(category_id))
+        logger.info("Категория '%s' создана через API (id=%s)", name, category_id)
+        return int(category_id)
+
+    def create_product(self, name, category_id, description=""):
+        data = dict(PRODUCT_DEFAULTS)
+        data.update({
+            f"product_description[{LANGUAGE_ID}][name]": name,
+            f"product_description[{LANGUAGE_ID}][description]": description,
+            f"product_description[{LANGUAGE_ID}][meta_title]": name,
+            f"product_seo_url[0][{LANGUAGE_ID}]": slug(name),
+            "model": "Model-" + name,
+            "product_category[]": [category_id],
+        })
+        result = self.post("catalog/product.save", data)
+        product_id = result.get("product_id") or self.autocomplete("product", name)
+        if product_id is None:
+            raise SeedingError(f"Товар '{name}' не создан: ответ на сохранение {result}")
+        self.created["product"].append(int(product_id))
+        logger.info("Товар '%s' создан через API (id=%s)", name, product_id)
+        return int(product_id)
+
+    def create_products(self, products):
+        # products - список (имя, id категории, описание); запросы уходят параллельно
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(lambda args: self.create_product(*args), products))
+
+    def delete(self, entity, ids):
+        # Одним запросом удаляется любое количество записей
+        ids = [i for i in ids if i]
+        if ids:
+            self.post(f"catalog/{entity}.delete", {"selected[]": ids})
+            self.created[entity] = [i for i in self.created[entity] if i not in ids]
+            logger.info("Удалено через API (%s): %s", entity, len(ids))
+
+    def purge(self, entity, prefix, max_passes=PURGE_PASSES):
+        # Удаляет все записи с префиксом имени, пачками по результатам автодополнения.
+        # Если удаление не подействовало (нет прав, связанные данные), поиск вернёт уже виденные записи - тогда стоп
+        attempted = set()
+        for _ in range(max_passes):
+            ids = [int(item[f"{entity}_id"]) for item in self.search(entity, prefix)]
+            if not ids:
+                return len(attempted)
+            if attempted.issuperset(ids):
+                logger.warning("Записи %s с префиксом %s не удаляются: %s", entity, prefix, ids)
+                return len(attempted - set(ids))
+            fresh = [i for i in ids if i not in attempted]
+            self.delete(entity, fresh)
+            attempted.update(fresh)
+        logger.warning("Очистка %s с префиксом %s остановлена после %s проходов", entity, prefix, max_passes)
+        return len(attempted)
+
+    def delete_products_by_name(self, names):
+        self.delete("product", [self.autocomplete("product", name) for name in names])
+
+    def cleanup(self):
+        # Товары удаляются раньше категорий, к которым они привязаны
+        self.delete("product", list(self.created["product"]))
+        self.delete("category", list(self.created["category"]))
@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+import settings
+
+logger = logging.getLogger()
+
+SESSIONS_DIR = os.path.join(".webtest", "sessions")
+
+_READ_STORAGE_JS = """
+var dump = function (storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        items[storage.key(i)] = storage.getItem(storage.key(i));
+    }
+    return items;
+};
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+_WRITE_STORAGE_JS = """
+var data = arguments[0];
+Object.keys(data.local).forEach(function (key) { window.localStorage.setItem(key, data.local[key]); });
+Object.keys(data.session).forEach(function (key) { window.sessionStorage.setItem(key, data.session[key]); });
+"""
+
+
+def capture_browser(driver):
+    return {
+        "url": driver.current_url,
+        "cookies": driver.get_cookies(),
+        "storage": driver.execute_script(_READ_STORAGE_JS),
+    }
+
+
+def restore_browser(driver, snapshot):
+    # Cookie и storage можно записать только находясь на нужном домене
+    parts = urlsplit(snapshot["url"])
+    driver.get(f"{parts.scheme}://{parts.netloc}/robots.txt")
+    driver.delete_all_cookies()
+    for cookie in snapshot["cookies"]:
+        driver.add_cookie(cookie)
+    driver.execute_script(_WRITE_STORAGE_JS, snapshot["storage"])
+    driver.get(snapshot["url"])
+
+
+class SessionCache:
+    # Снимки авторизованных сессий по ролям: логин выполняется один раз,
+    # дальше cookie и storage подкладываются в новые браузеры (в том числе других воркеров)
+    def __init__(self, directory=SESSIONS_DIR, ttl=1800):
+        self.directory = directory
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    def path(self, role):
+        # Снимок годится только для того же сервера: у локального стенда порт свой в каждом процессе
+        host = re.sub(r"[^\w.-]+", "_", urlsplit(settings.BASE_URL).netloc)
+        return os.path.join(self.directory, f"{role}-{host}.json")
+
+    def load(self, role):
+        try:
+            with open(self.path(role), encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - snapshot["created"] > self.ttl:
+            logger.info("Снимок сессии '%s' устарел", role)
+            self.invalidate(role)
+            return None
+        return snapshot
+
+    def save(self, role, driver):
+        snapshot = dict(capture_browser(driver), created=time.time())
+        os.makedirs(self.directory, exist_ok=True)
+        # Запись через временный файл: параллельные воркеры не прочитают снимок наполовину
+        tmp_path = f"{self.path(role)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path(role))
+        logger.info("Сохранён снимок сессии '%s'", role)
+
+    def invalidate(self, role):
+        self.stats["invalidated"] += 1
+        try:
+            os.remove(self.path(role))
+        except OSError:
+            pass
+
+    def login(self, driver, role, do_login, is_logged_in):
+        snapshot = self.load(role)
+        if snapshot:
+            try:
+                restore_browser(driver, snapshot)
+                restored = is_logged_in()
+            except WebDriverException as e:
+                logger.warning("Снимок сессии '%s' не восстановлен: %s", role, e.msg)
+                restored = False
+            if restored:
+                self.stats["hits"] += 1
+                logger.info("Сессия '%s' восстановлена из снимка", role)
+                return
+            logger.warning("Сервер отклонил снимок сессии '%s', выполняется вход", role)
+            self.invalidate(role)
+        self.stats["misses"] += 1
+        do_login()
+        self.save(role, driver)
+
+    def report(self):
+        stats = self.stats
+        return (f"Кэш сессий: попаданий {stats['hits']}, промахов {stats['misses']}, "
+                f"сброшено снимков {stats['invalidated']}")
@@ -0,0 +1,9 @@
+import os
+
+# Адрес магазина, с которым работают page objects. Для локального стенда:
+# WEBTEST_BASE_URL=http://127.0.0.1:8765/ или WEBTEST_STANDIN=1 (стенд поднимется сам)
+BASE_URL = os.environ.get("WEBTEST_BASE_URL", "https://demo.opencart.com/").rstrip("/") + "/"
+
+# Учётная запись админ-панели для тестов и служебной очистки данных
+ADMIN_USERNAME = os.environ.get("WEBTEST_ADMIN_USERNAME", "Teliour")
+ADMIN_PASSWORD = os.environ.get("WEBTEST_ADMIN_PASSWORD", "367/qwQf22")
@@ -0,0 +1,144 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from browser import browser_rss_mb
+from pages.base import forget_elements
+
+logger = logging.getLogger()
+
+# Несколько вкладок одного браузера вместо нескольких браузеров: пока одна вкладка грузит страницу,
+# WebDriver переключается на другую. Задача - генератор: выполняет команды в своей вкладке,
+# а там, где нужно ждать, отдаёт условие (yield page.visit(url)) и продолжает, когда оно выполнено.
+# Годится для независимых проверок только на чтение: вкладки делят cookie и корзину.
+TABS = int(os.environ.get("WEBTEST_TABS", "4"))
+
+
+class TabStats:
+    # Сводка по всем планировщикам прогона
+    def __init__(self):
+        self.runs = []
+        self.lock = threading.Lock()
+
+    def add(self, run):
+        with self.lock:
+            self.runs.append(run)
+
+    def report(self):
+        lines = [f"{'Вкладок':>7} {'задач':>6} {'время, с':>9} {'задач/с':>8} {'одновременно':>13} {'память, МБ':>11} "
+                 f"{'задач/с на 100 МБ':>18}"]
+        for run in self.runs:
+            rss = f"{run['rss']:.0f}" if run["rss"] else "-"
+            per_memory = f"{run['throughput'] / run['rss'] * 100:.2f}" if run["rss"] else "-"
+            lines.append(f"{run['tabs']:>7} {run['tasks']:>6} {run['elapsed']:>9.2f} {run['throughput']:>8.2f} "
+                         f"{run['concurrency']:>13.1f} {rss:>11} {per_memory:>18}")
+        return "\n".join(lines)
+
+
+stats = TabStats()
+
+
+class TabScheduler:
+    def __init__(self, driver, tabs=TABS, timeout=30, poll=0.05):
+        self.driver = driver
+        self.size = max(tabs, 1)
+        self.timeout = timeout
+        self.poll = poll
+        self.handles = []
+        self.current = None
+
+    def __enter__(self):
+        # Первая вкладка - та, что уже открыта; остальные создаются и закрываются планировщиком
+        self.current = self.driver.current_window_handle
+        self.handles = [self.current]
+        for _ in range(self.size - 1):
+            self.driver.switch_to.new_window("tab")
+            self.current = self.driver.current_window_handle
+            self.handles.append(self.current)
+        self.switch(self.handles[0])
+        return self
+
+    def __exit__(self, *exc):
+        for handle in self.handles[1:]:
+            self.switch(handle)
+            self.driver.close()
+        self.switch(self.handles[0])
+        return False
+
+    def switch(self, handle):
+        if handle != self.current:
+            self.driver.switch_to.window(handle)
+            self.current = handle
+            # Кэш элементов page objects общий для браузера, а в другой вкладке другая страница
+            forget_elements(self.driver)
+
+    def map(self, task, items):
+        # task(item) возвращает генератор; результат - {item: значение из return генератора}
+        pending = deque(items)
+        running = {}
+        results = {}
+        latencies = []
+        start = time.perf_counter()
+        while pending or running:
+            progressed = False
+            for handle in self.handles:
+                if handle not in running:
+                    if not pending:
+                        continue
+                    item = pending.popleft()
+                    running[handle] = {"item": item, "gen": task(item), "until": None, "started": time.perf_counter()}
+                state = running[handle]
+                timed_out = state["until"] is not None and time.perf_counter() > state["deadline"]
+                self.switch(handle)
+                if not timed_out and state["until"] is not None and not self.ready(state["until"]):
+                    continue
+                progressed = True
+                error = TimeoutException(f"Вкладка не дождалась загрузки: {state['item']}") if timed_out else None
+                if self.advance(state, results, error):
+                    latencies.append(time.perf_counter() - state["started"])
+                    del running[handle]
+            if not progressed:
+                time.sleep(self.poll)
+        self.record(latencies, time.perf_counter() - start)
+        errors = [result for result in results.values() if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+        return results
+
+    def ready(self, until):
+        # Вкладка может быть посреди перехода: ошибка скрипта значит "ещё не готова", дальше решает срок ожидания
+        try:
+            return until(self.driver)
+        except WebDriverException:
+            return False
+
+    def advance(self, state, results, error=None):
+        # Выполняет задачу до следующего ожидания; True - задача завершилась
+        try:
+            until = state["gen"].throw(error) if error else next(state["gen"])
+        except StopIteration as done:
+            results[state["item"]] = done.value
+            return True
+        except Exception as e:
+            results[state["item"]] = e
+            return True
+        state["until"] = until
+        state["deadline"] = time.perf_counter() + self.timeout
+        return False
+
+    def record(self, latencies, elapsed):
+        if not latencies:
+            return
+        run = {
+            "tabs": len(self.handles),
+            "tasks": len(latencies),
+            "elapsed": elapsed,
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            # Сколько задач в среднем были в работе одновременно (закон Литтла)
+            "concurrency": sum(latencies) / elapsed if elapsed else 0.0,
+            "rss": browser_rss_mb(self.driver),
+        }
+        stats.add(run)
+        logger.info("Вкладки: %s задач за %.2f с в %s вкладках", run["tasks"], elapsed, run["tabs"])
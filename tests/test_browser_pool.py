@@ -0,0 +1,51 @@
+import itertools
+from urllib3.exceptions import MaxRetryError
+from browser_pool import BrowserPool
+
+
+class DeadDriver:
+    # Драйвер, чей geckodriver уже завершился: команды падают на соединении
+    def __init__(self):
+        self.quit_called = False
+
+    @property
+    def window_handles(self):
+        raise MaxRetryError(None, "/session/1/window/handles", "Connection refused")
+
+    def quit(self):
+        self.quit_called = True
+        raise ConnectionRefusedError()
+
+
+class FreshDriver:
+    def quit(self):
+        pass
+
+
+def test_failed_background_launch_falls_back_to_synchronous_start():
+    numbers = itertools.count()
+
+    def factory():
+        if next(numbers) == 0:
+            raise OSError("geckodriver не запустился")
+        return FreshDriver()
+
+    pool = BrowserPool(factory, size=2)
+    pool.start()
+    pool.close()
+    assert pool.stats["failed"] == 1
+    driver = pool.acquire()
+    assert pool.stats["misses"] == 1 and pool.uses[driver] == 1
+
+
+def test_dead_browser_is_recycled_on_release():
+    dead, fresh = DeadDriver(), FreshDriver()
+    drivers = iter([dead, fresh])
+    pool = BrowserPool(lambda: next(drivers), size=1)
+    assert pool.acquire() is dead
+    pool.release(dead)
+    for refill in pool.refills:
+        refill.join()
+    assert dead.quit_called
+    assert pool.stats["recycled"] == 1
+    assert dead not in pool.uses and pool.acquire() is fresh
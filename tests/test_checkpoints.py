@@ -0,0 +1,39 @@
+import pytest
+import requests
+import checkpoints
+from checkpoints import MysqlServer, StandinServer, server_backend
+from opencart_standin import OpenCartStandin
+
+
+@pytest.fixture
+def standin():
+    standin = OpenCartStandin().start()
+    yield standin
+    standin.stop()
+
+
+def test_standin_restore_reverts_catalogue(standin):
+    server = StandinServer(standin.base_url)
+    products = set(standin.store.products)
+    server.save("admin")
+    standin.store.products.pop(next(iter(products)))
+    server.restore("admin")
+    assert set(standin.store.products) == products
+
+
+def test_restore_of_unknown_checkpoint_fails(standin):
+    with pytest.raises(requests.HTTPError):
+        StandinServer(standin.base_url).restore("missing")
+
+
+def test_shared_backends_are_disabled_under_xdist(monkeypatch):
+    monkeypatch.setenv("WEBTEST_CHECKPOINTS_URL", "http://127.0.0.1:8080/")
+    assert isinstance(server_backend(worker_id="master"), StandinServer)
+    assert server_backend(worker_id="gw1") is None
+    # Стенд своего процесса есть у каждого воркера
+    assert isinstance(server_backend("http://127.0.0.1:9000/", worker_id="gw1"), StandinServer)
+
+
+def test_mysql_dump_path_includes_worker(monkeypatch, tmp_path):
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_DIR", str(tmp_path))
+    assert MysqlServer("opencart", "gw3").path("admin").endswith("opencart-gw3-admin.sql")
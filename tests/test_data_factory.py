@@ -0,0 +1,97 @@
+import json
+import os
+import pytest
+import data_factory
+from data_factory import DataFactory
+from seeding import AdminSeeder, SeedingError
+
+
+class FakeSeeder(AdminSeeder):
+    # Каталог в памяти вместо админки; stuck - записи, удаление которых не действует
+    def __init__(self, names=(), stuck=()):
+        super().__init__(admin_url="http://seeder.invalid/admin/")
+        self.items = {number: name for number, name in enumerate(names, 1)}
+        self.stuck = set(stuck)
+        self.searches = []
+
+    def search(self, entity, prefix):
+        self.searches.append(prefix)
+        found = [number for number, name in sorted(self.items.items()) if name.startswith(prefix)]
+        return [{f"{entity}_id": number, "name": self.items[number]} for number in found[:5]]
+
+    def delete(self, entity, ids):
+        for number in ids:
+            if number not in self.stuck:
+                self.items.pop(number, None)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_factory, "REGISTRY_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_names_and_emails_are_unique_across_workers(registry):
+    first = DataFactory(run_id="65f0a1b2beef", worker_id="gw1")
+    second = DataFactory(run_id="65f0a1b2beef", worker_id="gw10")
+    names = [factory.name("Mouse") for factory in (first, second) for _ in range(3)]
+    emails = [factory.email("ivanov") for factory in (first, second) for _ in range(3)]
+    assert len(set(names)) == len(names)
+    assert len(set(emails)) == len(emails)
+    assert all(name.startswith(first.namespace + "-") for name in names[:3])
+    assert not any(name.startswith(first.namespace + "-") for name in names[3:])
+
+
+def test_registry_is_written_immediately(registry):
+    factory = DataFactory(run_id="65f0a1b2beef", worker_id="gw0")
+    name = factory.name("Keyboard", kind="category")
+    with open(factory.path, encoding="utf-8") as f:
+        assert json.load(f)["category"] == [name]
+
+
+def test_cleanup_does_not_touch_other_workers(registry, monkeypatch):
+    own = DataFactory(run_id="65f0a1b2beef", worker_id="gw1")
+    other = DataFactory(run_id="65f0a1b2beef", worker_id="gw10")
+    seeder = FakeSeeder([own.name("Mouse"), other.name("Mouse"), own.name("Keyboard")])
+    monkeypatch.setattr(data_factory, "admin_seeder", lambda: seeder)
+    own.cleanup()
+    assert sorted(seeder.items.values()) == [f"{other.namespace}-1 Mouse"]
+    assert set(seeder.searches) == {own.namespace + "-"}
+    assert not os.path.exists(own.path)
+
+
+def test_reap_purges_registry_namespace_with_separator(registry):
+    stale = DataFactory(run_id="00000001beef", worker_id="gw1")
+    stale.name("Mouse")
+    seeder = FakeSeeder()
+    data_factory.reap(max_age=60, seeder=seeder)
+    assert stale.namespace + "-" in seeder.searches
+    assert stale.namespace not in seeder.searches
+    assert not os.path.exists(stale.path)
+
+
+def test_purge_removes_in_batches():
+    seeder = FakeSeeder([f"wt-run-gw0-{number} Item" for number in range(12)])
+    assert seeder.purge("product", "wt-run-gw0-") == 12
+    assert not seeder.items
+
+
+def test_purge_stops_when_delete_has_no_effect():
+    seeder = FakeSeeder(["wt-run-gw0-1 Linked", "wt-run-gw0-2 Free"], stuck={1})
+    assert seeder.purge("product", "wt-run-gw0-") == 1
+    assert list(seeder.items.values()) == ["wt-run-gw0-1 Linked"]
+
+
+def test_purge_is_capped():
+    seeder = FakeSeeder([f"wt-run-gw0-{number} Item" for number in range(50)])
+    assert seeder.purge("product", "wt-run-gw0-", max_passes=2) == 10
+    assert len(seeder.items) == 40
+
+
+def test_unconfirmed_save_raises_seeding_error(monkeypatch):
+    seeder = FakeSeeder()
+    monkeypatch.setattr(seeder, "post", lambda route, data: {"success": "ok"})
+    with pytest.raises(SeedingError, match="Mouse A"):
+        seeder.create_product("Mouse A", 1)
+    with pytest.raises(SeedingError, match="Mice"):
+        seeder.create_category("Mice")
@@ -0,0 +1,65 @@
+import re
+import pytest
+import requests
+import settings
+from http_cache import CachingProxy, ResponseCache
+from opencart_standin import OpenCartStandin
+from seeding import AdminSeeder
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    standin = OpenCartStandin().start()
+    proxy = CachingProxy(standin.base_url, ResponseCache(directory=str(tmp_path))).start()
+    yield proxy
+    proxy.stop()
+    standin.stop()
+
+
+def catalogue_change(proxy, name):
+    # Как в kt5: товар создаётся и удаляется через админку, запросы идут через прокси
+    seeder = AdminSeeder(admin_url=proxy.base_url + "admin/")
+    seeder.login(settings.ADMIN_USERNAME, settings.ADMIN_PASSWORD)
+    category_id = seeder.create_category(name + " Category")
+    product_id = seeder.create_product(name, category_id)
+    return seeder, category_id, product_id
+
+
+def product_link(product_id):
+    return f"product_id={product_id}"
+
+
+def test_search_replay_sees_deleted_product(proxy):
+    seeder, _, product_id = catalogue_change(proxy, "Mouse A")
+    url = proxy.base_url + "index.php?route=product/search&search=Mouse+A"
+    assert product_link(product_id) in requests.get(url).text
+    seeder.delete("product", [product_id])
+    assert product_link(product_id) not in requests.get(url).text
+
+
+def test_category_page_refetched_after_admin_change(proxy):
+    seeder, category_id, product_id = catalogue_change(proxy, "Keyboard A")
+    url = proxy.base_url + f"index.php?route=product/category&path={category_id}"
+    assert product_link(product_id) in requests.get(url).text
+    assert product_link(product_id) in requests.get(url).text
+    assert proxy.stats["hits"] == 1
+    seeder.delete("product", [product_id])
+    assert product_link(product_id) not in requests.get(url).text
+
+
+def cart_header(session, proxy):
+    page = session.get(proxy.base_url + "index.php?route=common/home").text
+    return page.split('<span id="cart-total">', 1)[1].split("<", 1)[0]
+
+
+def test_header_is_not_replayed_across_sessions_or_after_cart_change(proxy):
+    first, second = requests.Session(), requests.Session()
+    empty = cart_header(first, proxy)
+    assert "0 item(s)" in empty
+    product_id = re.search(r"product_id=(\d+)", first.get(proxy.base_url + "index.php?route=common/home").text).group(1)
+    first.post(proxy.base_url + "index.php?route=checkout/cart/add", data={"product_id": product_id, "quantity": 1})
+    assert "1 item(s)" in cart_header(first, proxy)
+    assert "0 item(s)" in cart_header(second, proxy)
+    hits = proxy.stats["hits"]
+    assert "1 item(s)" in cart_header(first, proxy)
+    assert proxy.stats["hits"] == hits + 1
@@ -0,0 +1,154 @@
+import json
+import os
+import pytest
+from selenium.common.exceptions import (ElementClickInterceptedException, NoSuchElementException,
+                                        StaleElementReferenceException, TimeoutException, WebDriverException)
+import retry
+import timeouts
+from retry import FlakeDB, classify, retry_step
+
+
+@pytest.mark.parametrize("error, kind", [
+    (StaleElementReferenceException(), "stale"),
+    (TimeoutException(), "timeout"),
+    (ElementClickInterceptedException(), "interactable"),
+    (ConnectionRefusedError(), "network"),
+    (WebDriverException("Reached error page: about:neterror?e=connectionFailure"), "network"),
+    (AssertionError("Товар не найден"), "assertion"),
+    (NoSuchElementException(), "other"),
+    (WebDriverException("invalid argument"), "other"),
+])
+def test_classify(error, kind):
+    assert classify(error) == kind
+
+
+class Settle:
+    budget = 10
+
+
+class StubPage:
+    # Page object без браузера: шаг бросает ошибки из errors по очереди, затем возвращает "ok"
+    def __init__(self, errors=()):
+        self.driver = None
+        self.timeout = 30
+        self.wait = "wait"
+        self.settle = Settle()
+        self.errors = list(errors)
+        self.calls = []
+
+    def invalidate(self):
+        self.calls.append("invalidate")
+
+    def reset(self):
+        self.calls.append("reset")
+
+    @retry_step(recover="reset")
+    def step(self):
+        self.calls.append(("step", self.timeout, self.settle.budget))
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def history(monkeypatch):
+    # Профиль без наблюдений и чистая база флейков; history() задаёт выученные длительности шага
+    profile = timeouts.TimeoutProfile()
+    profile.history = {}
+    monkeypatch.setattr(timeouts, "profile", profile)
+    monkeypatch.setattr(retry, "flakes", FlakeDB())
+    return lambda seconds: profile.history.update({"StubPage.step": [seconds] * timeouts.MIN_SAMPLES})
+
+
+def outcome(name):
+    stats = retry.flakes.steps["StubPage.step"]
+    return {key: stats[key] for key in ("passed", "recovered", "failed")} == {
+        "passed": 0, "recovered": 0, "failed": 0, name: 1}
+
+
+def test_stale_is_retried_and_recorded_as_recovered(history):
+    page = StubPage([StaleElementReferenceException(), StaleElementReferenceException()])
+    assert page.step() == "ok"
+    assert page.calls.count("reset") == 2
+    assert page.calls[:3] == [("step", 30, 10), "invalidate", "reset"]
+    assert outcome("recovered")
+    assert retry.flakes.steps["StubPage.step"]["classes"] == {"stale": 2}
+
+
+def test_timeout_is_retried_with_learned_budget(history):
+    history(1.0)
+    page = StubPage([TimeoutException()])
+    assert page.step() == "ok"
+    assert [call for call in page.calls if call[0] == "step"] == [("step", 3.0, 3.0)] * 2
+    assert outcome("recovered")
+
+
+def test_timeout_is_not_retried_without_learned_budget(history):
+    page = StubPage([TimeoutException(), TimeoutException()])
+    with pytest.raises(TimeoutException):
+        page.step()
+    assert page.calls == [("step", 30, 10)]
+    assert outcome("failed")
+
+
+@pytest.mark.parametrize("error", [AssertionError("Товар не найден"), NoSuchElementException()])
+def test_non_transient_error_fails_on_first_attempt(history, error):
+    page = StubPage([error])
+    with pytest.raises(type(error)):
+        page.step()
+    assert page.calls == [("step", 30, 10)]
+    assert outcome("failed")
+
+
+@pytest.mark.parametrize("errors", [[], [AssertionError()], [StaleElementReferenceException()] * 3])
+def test_limits_are_restored(history, errors):
+    history(1.0)
+    page = StubPage(errors)
+    if errors:
+        with pytest.raises(type(errors[0])):
+            page.step()
+    else:
+        assert page.step() == "ok"
+    assert (page.wait, page.timeout, page.settle.budget) == ("wait", 30, 10)
+
+
+@pytest.fixture
+def flake_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(retry, "FLAKES_DIR", str(tmp_path / "flakes"))
+    monkeypatch.setattr(retry, "FLAKES_FILE", str(tmp_path / "flakes.json"))
+    return tmp_path
+
+
+def test_record_counts_outcomes_and_classes():
+    db = FlakeDB()
+    db.record("MainPage.search_product", "passed")
+    db.record("MainPage.search_product", "recovered", ["stale"])
+    db.record("MainPage.search_product", "failed", ["timeout", "timeout"])
+    assert db.steps["MainPage.search_product"] == {
+        "calls": 3, "passed": 1, "recovered": 1, "failed": 1, "classes": {"stale": 1, "timeout": 2}}
+
+
+def test_save_and_merge_runs_accumulate(flake_files):
+    for worker, outcome, classes in (("gw0", "recovered", ["stale"]), ("gw1", "failed", ["network"])):
+        db = FlakeDB()
+        db.record("CartPage.open", outcome, classes)
+        db.save_run(worker)
+    retry.merge_runs()
+    retry.merge_runs()
+    with open(retry.FLAKES_FILE, encoding="utf-8") as f:
+        total = json.load(f)
+    assert total["CartPage.open"] == {"calls": 2, "passed": 0, "recovered": 1, "failed": 1,
+                                      "classes": {"stale": 1, "network": 1}}
+    assert not os.listdir(retry.FLAKES_DIR)
+
+    db = FlakeDB()
+    db.record("CartPage.open", "passed")
+    db.save_run("gw0")
+    retry.merge_runs()
+    with open(retry.FLAKES_FILE, encoding="utf-8") as f:
+        assert json.load(f)["CartPage.open"]["calls"] == 3
+
+
+def test_empty_run_writes_nothing(flake_files):
+    FlakeDB().save_run("gw0")
+    assert not os.path.exists(retry.FLAKES_DIR)
@@ -0,0 +1,45 @@
+import time
+from selenium.common.exceptions import WebDriverException
+import settings
+from session_cache import SessionCache
+
+
+class DeadServerDriver:
+    # Снимок указывает на стенд, которого уже нет: любой переход падает
+    current_url = "http://127.0.0.1:5555/index.php?route=account/account"
+
+    def __init__(self):
+        self.logged_in = False
+
+    def get(self, url):
+        raise WebDriverException("Reached error page: about:neterror")
+
+    def get_cookies(self):
+        return []
+
+    def execute_script(self, script, *args):
+        return {"local": {}, "session": {}}
+
+
+def test_snapshot_is_keyed_by_server(tmp_path, monkeypatch):
+    cache = SessionCache(directory=str(tmp_path))
+    monkeypatch.setattr(settings, "BASE_URL", "http://127.0.0.1:5555/")
+    first = cache.path("customer")
+    monkeypatch.setattr(settings, "BASE_URL", "http://127.0.0.1:6666/")
+    assert cache.path("customer") != first
+    assert cache.path("customer").endswith("customer-127.0.0.1_6666.json")
+
+
+def test_unreachable_snapshot_falls_back_to_login(tmp_path):
+    cache = SessionCache(directory=str(tmp_path))
+    driver = DeadServerDriver()
+    with open(cache.path("customer"), "w", encoding="utf-8") as f:
+        f.write('{"created": %f, "url": "%s", "cookies": [], "storage": {"local": {}, "session": {}}}'
+                % (time.time(), driver.current_url))
+
+    def do_login():
+        driver.logged_in = True
+
+    cache.login(driver, "customer", do_login, lambda: driver.logged_in)
+    assert driver.logged_in
+    assert cache.stats == {"hits": 0, "misses": 1, "invalidated": 1}
@@ -0,0 +1,37 @@
+import os
+import pytest
+import settings
+import timeouts
+from timeouts import TimeoutProfile
+
+
+@pytest.fixture
+def profile_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeouts, "PROFILE_DIR", str(tmp_path / "timeouts"))
+    monkeypatch.setattr(timeouts, "PROFILE_FILE", str(tmp_path / "timeouts-{host}.json"))
+    return tmp_path
+
+
+def run_against(monkeypatch, base_url, worker_id, seconds):
+    monkeypatch.setattr(settings, "BASE_URL", base_url)
+    profile = TimeoutProfile()
+    for _ in range(timeouts.MIN_SAMPLES):
+        profile.observe("MainPage.search_product", seconds)
+    profile.save_run(worker_id)
+
+
+def test_profiles_are_kept_per_server(profile_files, monkeypatch):
+    run_against(monkeypatch, "http://127.0.0.1:40001/", "gw0", 0.01)
+    run_against(monkeypatch, "http://127.0.0.1:40002/", "gw1", 0.02)
+    timeouts.merge_runs()
+    assert sorted(os.listdir(profile_files)) == ["timeouts", "timeouts-127.0.0.1.json"]
+
+    monkeypatch.setattr(settings, "BASE_URL", "https://demo.opencart.com/")
+    profile = TimeoutProfile()
+    assert not profile.learned("MainPage.search_product")
+    assert profile.timeout("MainPage.search_product", 30) == 30
+
+    monkeypatch.setattr(settings, "BASE_URL", "http://127.0.0.1:40003/")
+    profile = TimeoutProfile()
+    assert profile.learned("MainPage.search_product")
+    assert profile.timeout("MainPage.search_product", 30) == timeouts.MIN_TIMEOUT
@@ -0,0 +1,59 @@
+import io
+import pytest
+import visual
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+
+def encode(array):
+    output = io.BytesIO()
+    Image.fromarray(array).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def page():
+    page = np.full((200, 300, 3), 248, dtype=np.uint8)
+    page[40:52, 20:220] = 60
+    page[120:180, 40:260] = 200
+    return page
+
+
+def test_one_pixel_shift_is_antialiasing(page):
+    shifted = page.copy()
+    shifted[:, 1:] = page[:, :-1]
+    result = visual.compare(encode(page), encode(shifted))
+    assert result["match"]
+    assert result["aliased"] > 0
+
+
+def test_changed_block_is_reported(page):
+    changed = page.copy()
+    changed[60:100, 20:120] = 0
+    result = visual.compare(encode(page), encode(changed))
+    assert not result["match"]
+    assert result["diff"]
+
+
+def test_ignore_regions_hide_changes(page):
+    changed = page.copy()
+    changed[60:100, 20:120] = 0
+    assert visual.compare(encode(page), encode(changed), regions=[(20, 60, 100, 40)])["match"]
+
+
+def test_check_raises_mismatch_and_counts_errors(page, tmp_path, monkeypatch):
+    monkeypatch.setattr(visual, "BASELINE_DIR", str(tmp_path))
+    monkeypatch.setattr(visual, "DIFF_DIR", str(tmp_path / "diff"))
+    engine = visual.VisualEngine(mode="update", workers=1)
+    engine.submit("kt4.py::test_cart", "Cart", encode(page), [])
+    engine.mode = "check"
+    changed = page.copy()
+    changed[60:100, 20:120] = 0
+    engine.submit("kt4.py::test_cart", "Cart", encode(changed), [])
+    try:
+        with pytest.raises(visual.VisualMismatch):
+            engine.check("kt4.py::test_cart")
+    finally:
+        engine.stop()
+    assert engine.stats["mismatched"] == 1
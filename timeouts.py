@@ -0,0 +1,154 @@
+import argparse
+import glob
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+from timing import TimedWait, percentile, recorder
+import settings
+
+# Профиль задержек ожиданий: ключ "Класс.метод|локатор" -> последние наблюдения в секундах;
+# шаги с retry_step хранятся под ключом "Класс.метод" - длительность успешной попытки.
+# Профиль свой для каждого сервера: замеры на локальном стенде не годятся для demo.opencart.com.
+# Порт в имя не входит - у локального стенда он случайный в каждом процессе.
+PROFILE_DIR = os.path.join(".webtest", "timeouts")
+PROFILE_FILE = os.path.join(".webtest", "timeouts-{host}.json")
+SAMPLES_LIMIT = 200
+
+# Тайм-аут выводится из p99 с запасом, пока наблюдений меньше MIN_SAMPLES - берётся заданный в коде.
+# Выученный тайм-аут не превышает заданный: профиль только сокращает ожидание настоящих поломок.
+SAFETY_FACTOR = float(os.environ.get("WEBTEST_TIMEOUT_SAFETY", "3"))
+MIN_TIMEOUT = 2
+MIN_SAMPLES = 5
+ENABLED = os.environ.get("WEBTEST_ADAPTIVE_TIMEOUTS", "1") == "1"
+
+
+def current_host():
+    return re.sub(r"[^\w.-]+", "_", urlsplit(settings.BASE_URL).hostname or "local")
+
+
+def profile_path(host=None):
+    return PROFILE_FILE.format(host=host or current_host())
+
+
+def load_profile(host=None):
+    try:
+        with open(profile_path(host), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def learned_timeout(samples, default):
+    if len(samples) < MIN_SAMPLES:
+        return default
+    return min(max(percentile(samples, 0.99) * SAFETY_FACTOR, MIN_TIMEOUT), default)
+
+
+class TimeoutProfile:
+    def __init__(self):
+        self.history = None
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def timeout(self, key, default):
+        if not ENABLED:
+            return default
+        if self.history is None:
+            self.history = load_profile()
+        return learned_timeout(self.history.get(key, []), default)
+
+    def learned(self, key):
+        # Есть ли для ключа достаточно наблюдений, чтобы тайм-аут брался из профиля
+        if not ENABLED:
+            return False
+        if self.history is None:
+            self.history = load_profile()
+        return len(self.history.get(key, [])) >= MIN_SAMPLES
+
+    def observe(self, key, elapsed):
+        with self.lock:
+            self.samples.setdefault(key, []).append(round(elapsed, 4))
+
+    def save_run(self, worker_id):
+        if not self.samples:
+            return
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(PROFILE_DIR, f"run-{worker_id}.json"), "w", encoding="utf-8") as f:
+            json.dump({"host": current_host(), "samples": self.samples}, f, ensure_ascii=False)
+
+
+profile = TimeoutProfile()
+
+
+def merge_runs():
+    runs = glob.glob(os.path.join(PROFILE_DIR, "run-*.json"))
+    if not runs:
+        return
+    histories = {}
+    for path in runs:
+        with open(path, encoding="utf-8") as f:
+            run = json.load(f)
+        history = histories.setdefault(run["host"], load_profile(run["host"]))
+        for key, samples in run["samples"].items():
+            history[key] = (history.get(key, []) + samples)[-SAMPLES_LIMIT:]
+        os.remove(path)
+    for host, history in histories.items():
+        with open(profile_path(host), "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2, ensure_ascii=False)
+
+
+def wait_key(name, owner=None):
+    # Ожидание привязывается к текущему шагу page object, вне шагов - к владельцу (классу) или одному имени
+    scope = recorder.current() or owner
+    return f"{scope}|{name}" if scope else name
+
+
+class AdaptiveWait(TimedWait):
+    # WebDriverWait, тайм-аут которого берётся из профиля, а успешные ожидания пополняют профиль
+    def __init__(self, driver, name, default, owner=None, poll_frequency=0.5, ignored_exceptions=None):
+        self.key = wait_key(name, owner)
+        super().__init__(driver, profile.timeout(self.key, default), poll_frequency, ignored_exceptions)
+
+    def until(self, method, message=""):
+        start = time.perf_counter()
+        result = super().until(method, message)
+        profile.observe(self.key, time.perf_counter() - start)
+        return result
+
+
+def show(history, prefix, default):
+    print(f"{'Ожидание':<70} {'замеров':>7} {'p50':>6} {'p99':>6} {'тайм-аут':>8}")
+    for key, samples in sorted(history.items()):
+        if not key.startswith(prefix):
+            continue
+        print(f"{key:<70} {len(samples):>7} {percentile(samples, 0.5):>6.2f} {percentile(samples, 0.99):>6.2f} "
+              f"{learned_timeout(samples, default):>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выученные тайм-ауты ожиданий")
+    parser.add_argument("--host", default=None, help="сервер профиля, по умолчанию из WEBTEST_BASE_URL")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show_parser = commands.add_parser("show", help="показать профиль")
+    show_parser.add_argument("prefix", nargs="?", default="", help="например AdminProductPage.")
+    show_parser.add_argument("--default", type=float, default=30, help="тайм-аут, заданный в коде")
+    reset_parser = commands.add_parser("reset", help="забыть наблюдения")
+    reset_parser.add_argument("prefix", nargs="?", default="", help="без префикса профиль очищается целиком")
+    args = parser.parse_args()
+
+    history = load_profile(args.host)
+    if args.command == "show":
+        show(history, args.prefix, args.default)
+        return
+    kept = {key: samples for key, samples in history.items() if args.prefix and not key.startswith(args.prefix)}
+    os.makedirs(os.path.dirname(profile_path(args.host)), exist_ok=True)
+    with open(profile_path(args.host), "w", encoding="utf-8") as f:
+        json.dump(kept, f, indent=2, ensure_ascii=False)
+    print(f"Удалено ожиданий: {len(history) - len(kept)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import functools
+import glob
+import inspect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger()
+
+TIMINGS_DIR = os.path.join(".webtest", "timings")
+HISTORY_FILE = os.path.join(TIMINGS_DIR, "history.json")
+SUMMARY_FILE = os.path.join(TIMINGS_DIR, "summary.json")
+PROMETHEUS_FILE = os.path.join(TIMINGS_DIR, "timings.prom")
+HISTORY_LIMIT = 500
+
+# Составляющие времени шага: ожидания, команды WebDriver, загрузки страниц
+PARTS = ("total", "wait", "command", "page_load")
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Recorder:
+    def __init__(self):
+        self.local = threading.local()
+        self.samples = {}
+        self.lock = threading.Lock()
+        # Все команды WebDriver процесса, в том числе вне шагов
+        self.commands = 0
+        # Вызываются с именем шага после его завершения
+        self.listeners = []
+
+    def frames(self):
+        if not hasattr(self.local, "frames"):
+            self.local.frames = []
+            self.local.names = []
+            self.local.waiting = 0
+        return self.local.frames
+
+    def current(self):
+        # Имя самого вложенного шага в этом потоке
+        self.frames()
+        return self.local.names[-1] if self.local.names else None
+
+    def add(self, part, elapsed):
+        for frame in self.frames():
+            frame[part] += elapsed
+
+    @contextmanager
+    def step(self, name):
+        frame = {"wait": 0.0, "command": 0.0, "page_load": 0.0, "commands": 0}
+        self.frames().append(frame)
+        self.local.names.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            frame["total"] = time.perf_counter() - start
+            self.frames().pop()
+            self.local.names.pop()
+            with self.lock:
+                self.samples.setdefault(name, []).append(frame)
+            for listener in self.listeners:
+                listener(name)
+
+    @contextmanager
+    def waiting(self):
+        # Команды, выполненные внутри ожидания (поллинг), считаются временем ожидания
+        self.frames()
+        self.local.waiting += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.local.waiting -= 1
+            if not self.local.waiting:
+                self.add("wait", time.perf_counter() - start)
+
+    def command(self, name, elapsed):
+        self.commands += 1
+        for frame in self.frames():
+            frame["commands"] += 1
+        if not self.local.waiting:
+            self.add("page_load" if name == "get" else "command", elapsed)
+
+
+recorder = Recorder()
+
+
+def timed_page(cls):
+    # Оборачивает все публичные методы page object в шаг "Класс.метод".
+    # Генераторы (задачи вкладок) не оборачиваются: их тело выполняется уже после вызова
+    for attr, method in list(vars(cls).items()):
+        if attr.startswith("_") or not callable(method) or inspect.isgeneratorfunction(method):
+            continue
+
+        def wrap(method, name):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                with recorder.step(name):
+                    return method(*args, **kwargs)
+            return wrapper
+
+        setattr(cls, attr, wrap(method, f"{cls.__name__}.{attr}"))
+    return cls
+
+
+class TimedWait(WebDriverWait):
+    def until(self, method, message=""):
+        with recorder.waiting():
+            return super().until(method, message)
+
+    def until_not(self, method, message=""):
+        with recorder.waiting():
+            return super().until_not(method, message)
+
+
+def instrument_driver(driver):
+    execute = driver.execute
+
+    def timed_execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            recorder.command(driver_command, time.perf_counter() - start)
+
+    driver.execute = timed_execute
+    return driver
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def summarize(samples):
+    summary = {}
+    for step, frames in samples.items():
+        summary[step] = {"count": len(frames), "commands": sum(f["commands"] for f in frames)}
+        for part in PARTS:
+            values = [f[part] for f in frames]
+            summary[step][part] = {f"p{int(q * 100)}": percentile(values, q) for q in QUANTILES}
+            summary[step][part]["sum"] = sum(values)
+    return summary
+
+
+def format_table(summary):
+    lines = [f"{'Шаг':<45} {'раз':>4} {'p50':>7} {'p95':>7} {'p99':>7} {'ожид.':>7} {'команды':>8} {'загрузка':>8}"]
+    for step, stats in sorted(summary.items(), key=lambda item: -item[1]["total"]["sum"]):
+        total = stats["total"]
+        lines.append(f"{step:<45} {stats['count']:>4} {total['p50']:>7.2f} {total['p95']:>7.2f} {total['p99']:>7.2f} "
+                     f"{stats['wait']['sum']:>7.2f} {stats['command']['sum']:>8.2f} {stats['page_load']['sum']:>8.2f}")
+    return "\n".join(lines)
+
+
+def format_prometheus(summary):
+    lines = [
+        "# HELP webtest_step_seconds Длительность шагов page object по составляющим",
+        "# TYPE webtest_step_seconds summary",
+    ]
+    for step, stats in sorted(summary.items()):
+        for part in PARTS:
+            labels = f'step="{step}",part="{part}"'
+            for q in QUANTILES:
+                lines.append(f'webtest_step_seconds{{{labels},quantile="{q}"}} {stats[part][f"p{int(q * 100)}"]:.6f}')
+            lines.append(f"webtest_step_seconds_sum{{{labels}}} {stats[part]['sum']:.6f}")
+            lines.append(f"webtest_step_seconds_count{{{labels}}} {stats['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def save_run(worker_id):
+    # Каждый процесс (воркер xdist) пишет свои замеры в отдельный файл
+    os.makedirs(TIMINGS_DIR, exist_ok=True)
+    with open(os.path.join(TIMINGS_DIR, f"run-{worker_id}.json"), "w", encoding="utf-8") as f:
+        json.dump(recorder.samples, f, ensure_ascii=False)
+
+
+def merge_runs():
+    # Сливает замеры воркеров в историю и пересчитывает гистограммы по всем прогонам
+    try:
+        with open(HISTORY_FILE, encoding="utf-8") as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = {}
+    for path in glob.glob(os.path.join(TIMINGS_DIR, "run-*.json")):
+        with open(path, encoding="utf-8") as f:
+            for step, frames in json.load(f).items():
+                history[step] = (history.get(step, []) + frames)[-HISTORY_LIMIT:]
+        os.remove(path)
+    if not history:
+        return None
+
+    summary = summarize(history)
+    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False)
+    with open(SUMMARY_FILE, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    with open(PROMETHEUS_FILE, "w", encoding="utf-8") as f:
+        f.write(format_prometheus(summary))
+    logger.info("Гистограммы шагов сохранены в %s и %s", SUMMARY_FILE, PROMETHEUS_FILE)
+    return summary
@@ -0,0 +1,269 @@
+import io
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import allure
+
+logger = logging.getLogger()
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    np = Image = None
+
+# Визуальная регрессия: явные capture() из тестов сравниваются с эталонами из BASELINE_DIR.
+# Сравнение попиксельное (NumPy) с допуском на сглаживание и дополнительно по перцептивному хешу;
+# области из IGNORE_SELECTORS (слайдеры, баннеры) не учитываются. Сравнения идут в пуле процессов,
+# тест ждёт их после своего тела (conftest.py, pytest_runtest_call) - расхождение роняет сам тест.
+# WEBTEST_VISUAL: check - сравнивать с эталоном, если он есть; update - записать эталоны; off - выключено.
+MODE = os.environ.get("WEBTEST_VISUAL", "check")
+BASELINE_DIR = os.environ.get("WEBTEST_VISUAL_BASELINES", "visual_baselines")
+DIFF_DIR = os.path.join(".webtest", "visual")
+
+# Пиксель изменён, если какой-то канал отличается больше THRESHOLD (0-255);
+# снимок не совпал, если изменено больше TOLERANCE пикселей или pHash разошёлся больше HASH_LIMIT бит из 63
+THRESHOLD = int(os.environ.get("WEBTEST_VISUAL_THRESHOLD", "24"))
+TOLERANCE = float(os.environ.get("WEBTEST_VISUAL_TOLERANCE", "0.001"))
+HASH_LIMIT = int(os.environ.get("WEBTEST_VISUAL_HASH_LIMIT", "6"))
+IGNORE_SELECTORS = ["#slideshow0", ".swiper-viewport", ".carousel"] + [
+    selector for selector in os.environ.get("WEBTEST_VISUAL_IGNORE", "").split(",") if selector]
+
+# Процессов на воркер xdist: ядра делятся между воркерами
+WORKERS = int(os.environ.get("WEBTEST_VISUAL_WORKERS", "0")) or max(
+    1, (os.cpu_count() or 1) // int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1")))
+
+# Прямоугольники элементов в пикселях скриншота (снимок - видимая область окна)
+_REGIONS_JS = """
+var ratio = window.devicePixelRatio || 1;
+var regions = [];
+arguments[0].forEach(function (selector) {
+    document.querySelectorAll(selector).forEach(function (element) {
+        var rect = element.getBoundingClientRect();
+        if (rect.width && rect.height) {
+            regions.push([Math.floor(rect.left * ratio), Math.floor(rect.top * ratio),
+                          Math.ceil(rect.width * ratio), Math.ceil(rect.height * ratio)]);
+        }
+    });
+});
+return regions;
+"""
+
+
+class VisualMismatch(AssertionError):
+    pass
+
+
+def load(png):
+    return np.asarray(Image.open(io.BytesIO(png)).convert("RGB"))
+
+
+def fit(image, height, width):
+    # Дополняет снимок до общего размера; добавленные пиксели потом считаются изменёнными
+    if image.shape[:2] == (height, width):
+        return image
+    padded = np.zeros((height, width, 3), dtype=np.uint8)
+    padded[:image.shape[0], :image.shape[1]] = image
+    return padded
+
+
+def delta(first, second):
+    # Наибольшее отличие по каналам; в uint8 без промежуточного int16 и без свёртки по короткой оси
+    diff = np.maximum(first, second) - np.minimum(first, second)
+    return np.maximum(np.maximum(diff[..., 0], diff[..., 1]), diff[..., 2])
+
+
+def antialiased(baseline, current, changed, threshold):
+    # Сглаживание и субпиксельный сдвиг: значение изменённого пикселя есть в окрестности 3x3
+    # того же места в другом снимке, и наоборот. Проверяются только изменённые пиксели
+    ys, xs = np.nonzero(changed)
+    height, width = changed.shape
+    base_here, current_here = baseline[ys, xs], current[ys, xs]
+    in_baseline = np.zeros(len(ys), dtype=bool)
+    in_current = np.zeros(len(ys), dtype=bool)
+    for dy in (-1, 0, 1):
+        y = np.clip(ys + dy, 0, height - 1)
+        for dx in (-1, 0, 1):
+            x = np.clip(xs + dx, 0, width - 1)
+            in_baseline |= delta(baseline[y, x], current_here) <= threshold
+            in_current |= delta(current[y, x], base_here) <= threshold
+    result = np.zeros_like(changed)
+    both = in_baseline & in_current
+    result[ys[both], xs[both]] = True
+    return result
+
+
+_DCT = None
+
+
+def phash(image):
+    # 63 бита: знаки низких частот DCT уменьшенной до 32x32 серой копии относительно медианы
+    global _DCT
+    if _DCT is None:
+        n = np.arange(32)
+        _DCT = np.sqrt(2 / 32) * np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / 64)
+        _DCT[0] /= np.sqrt(2)
+    small = np.asarray(Image.fromarray(image).convert("L").resize((32, 32), Image.Resampling.BOX), dtype=np.float64)
+    low = (_DCT @ small @ _DCT.T)[:8, :8].flatten()[1:]
+    bits = low > np.median(low)
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def render_diff(baseline, significant, aliased, mask):
+    # Эталон бледным фоном, изменения красным, сглаживание жёлтым, пропущенные области синим
+    gray = np.asarray(Image.fromarray(baseline).convert("L")) // 4 + 180
+    image = np.repeat(gray[:, :, None], 3, axis=2)
+    image[~mask] = image[~mask] // 2 + np.array([0, 0, 110], dtype=np.uint8)
+    image[aliased] = (255, 200, 0)
+    image[significant] = (255, 0, 0)
+    output = io.BytesIO()
+    Image.fromarray(image).save(output, format="PNG", compress_level=1)
+    return output.getvalue()
+
+
+def compare(baseline_png, current_png, regions=(), threshold=THRESHOLD, tolerance=TOLERANCE, hash_limit=HASH_LIMIT):
+    start = time.perf_counter()
+    if baseline_png == current_png:
+        return {"match": True, "ratio": 0.0, "changed": 0, "aliased": 0, "hash_distance": 0, "diff": None,
+                "elapsed": time.perf_counter() - start}
+    baseline, current = load(baseline_png), load(current_png)
+    height, width = max(baseline.shape[0], current.shape[0]), max(baseline.shape[1], current.shape[1])
+    mask = np.ones((height, width), dtype=bool)
+    for x, y, w, h in regions:
+        mask[max(y, 0):max(y + h, 0), max(x, 0):max(x + w, 0)] = False
+    missing = np.ones((height, width), dtype=bool)
+    missing[:min(baseline.shape[0], current.shape[0]), :min(baseline.shape[1], current.shape[1])] = False
+    baseline, current = fit(baseline, height, width), fit(current, height, width)
+
+    changed = (delta(baseline, current) > threshold) & mask & ~missing
+    aliased = antialiased(baseline, current, changed, threshold)
+    significant = (changed & ~aliased) | (missing & mask)
+    changed_count = np.count_nonzero(significant)
+    ratio = changed_count / max(np.count_nonzero(mask), 1)
+
+    # Хеш считается по снимку, в котором пропущенные области взяты из эталона
+    masked = current.copy()
+    masked[~mask] = baseline[~mask]
+    hash_distance = bin(phash(baseline) ^ phash(masked)).count("1")
+
+    match = ratio <= tolerance and hash_distance <= hash_limit
+    return {
+        "match": bool(match),
+        "ratio": float(ratio),
+        "changed": changed_count,
+        "aliased": np.count_nonzero(aliased),
+        "hash_distance": hash_distance,
+        "diff": None if match else render_diff(baseline, significant, aliased, mask),
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def compare_file(path, current_png, regions=(), threshold=THRESHOLD, tolerance=TOLERANCE, hash_limit=HASH_LIMIT):
+    # Выполняется в процессе пула: эталон читается там же, чтобы не передавать его между процессами
+    with open(path, "rb") as f:
+        return compare(f.read(), current_png, regions, threshold, tolerance, hash_limit)
+
+
+def baseline_name(nodeid, name):
+    # kt4.py::test_add_camera_to_cart + CameraCart -> kt4-test_add_camera_to_cart-CameraCart.png
+    module, _, test = nodeid.partition("::")
+    return re.sub(r"[^\w.-]+", "_", f"{os.path.splitext(os.path.basename(module))[0]}-{test}-{name}") + ".png"
+
+
+def ignore_regions(driver, selectors=IGNORE_SELECTORS):
+    return driver.execute_script(_REGIONS_JS, selectors) if selectors else []
+
+
+class VisualEngine:
+    def __init__(self, mode=MODE, workers=WORKERS):
+        self.mode = mode
+        self.workers = workers
+        self.pool = None
+        self.pending = {}
+        self.stats = {"compared": 0, "mismatched": 0, "missing": 0, "updated": 0, "errors": 0, "cpu": 0.0, "waited": 0.0}
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.mode != "off" and np is not None
+
+    def start(self):
+        if self.mode != "off" and np is None:
+            logger.warning("NumPy или Pillow не установлены: визуальные сравнения выключены")
+        return self
+
+    def executor(self):
+        # spawn, а не fork: в процессе теста уже работают потоки логов и скриншотов
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.pool
+
+    def submit(self, nodeid, name, png, regions):
+        path = os.path.join(BASELINE_DIR, baseline_name(nodeid, name))
+        if self.mode == "update":
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(png)
+            with self.lock:
+                self.stats["updated"] += 1
+            return
+        if not os.path.exists(path):
+            with self.lock:
+                self.stats["missing"] += 1
+            logger.info("Нет эталона для %s, сравнение пропущено (WEBTEST_VISUAL=update записывает эталоны)", name)
+            return
+        future = self.executor().submit(compare_file, path, png, regions)
+        with self.lock:
+            self.pending.setdefault(nodeid, []).append((name, future))
+
+    def collect(self, nodeid):
+        # В потоке теста: ждёт сравнения его снимков и прикрепляет карты отличий; возвращает расхождения
+        with self.lock:
+            pending = self.pending.pop(nodeid, [])
+        mismatches = []
+        for name, future in pending:
+            start = time.perf_counter()
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning("Снимок %s не сравнён с эталоном: %s", name, e)
+                with self.lock:
+                    self.stats["errors"] += 1
+                continue
+            with self.lock:
+                self.stats["waited"] += time.perf_counter() - start
+                self.stats["compared"] += 1
+                self.stats["cpu"] += result["elapsed"]
+                self.stats["mismatched"] += not result["match"]
+            if result["match"]:
+                continue
+            mismatches.append(f"{name}: изменено {result['ratio']:.2%} пикселей, pHash {result['hash_distance']}")
+            os.makedirs(DIFF_DIR, exist_ok=True)
+            with open(os.path.join(DIFF_DIR, baseline_name(nodeid, name + "-diff")), "wb") as f:
+                f.write(result["diff"])
+            allure.attach(result["diff"], name=f"{name}-diff", attachment_type=allure.attachment_type.PNG)
+        return mismatches
+
+    def check(self, nodeid):
+        mismatches = self.collect(nodeid)
+        if mismatches:
+            raise VisualMismatch("Снимки отличаются от эталона: " + "; ".join(mismatches))
+
+    def stop(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def report(self):
+        stats = self.stats
+        average = stats["cpu"] / stats["compared"] * 1000 if stats["compared"] else 0.0
+        return (f"Визуальные сравнения ({self.mode}): сравнено {stats['compared']}, расхождений {stats['mismatched']}, "
+                f"без эталона {stats['missing']}, записано эталонов {stats['updated']}, ошибок {stats['errors']}; "
+                f"в среднем {average:.0f} мс на снимок, тесты ждали {stats['waited']:.2f} с")
+
+
+engine = VisualEngine()
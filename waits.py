@@ -0,0 +1,147 @@
+import logging
+import os
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, UnexpectedAlertPresentException, WebDriverException
+from timing import recorder
+
+logger = logging.getLogger()
+
+# Хук ставится в страницу при первом опросе (после каждой навигации заново):
+# считает незавершённые XHR/fetch и запоминает время последней мутации DOM.
+# Атрибуты не отслеживаются, чтобы анимации слайдера не мешали стабилизации.
+_STATE_JS = """
+var w = window.__webtest;
+if (!w) {
+    w = window.__webtest = {pending: 0, lastMutation: Date.now()};
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        w.pending++;
+        this.addEventListener('loadend', function () { w.pending--; });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            w.pending++;
+            return fetch.apply(this, arguments).finally(function () { w.pending--; });
+        };
+    }
+    new MutationObserver(function () { w.lastMutation = Date.now(); })
+        .observe(document, {childList: true, subtree: true, characterData: true});
+}
+var toast = document.querySelector('.alert-success');
+return {
+    ready: document.readyState,
+    pending: w.pending,
+    jquery: window.jQuery ? window.jQuery.active : 0,
+    idle: Date.now() - w.lastMutation,
+    toast: !!(toast && toast.offsetParent !== null)
+};
+"""
+
+# Фиксированные паузы, которые PageSettle заменил: шаг -> секунды time.sleep в прежних тестах.
+# WEBTEST_WAITS=sleep возвращает их вместо стабилизации - только для сравнения в bench_suite.py --waits;
+# шаги без прежней паузы ждут стабилизации в обоих режимах.
+FIXED_SLEEPS = {
+    "Смена валюты": 2,
+    "Поиск товара": 1,
+    "Переключение скриншота": 1,
+    "Добавление в корзину": 2,
+    "Сохранение категории": 2,
+    "Сохранение товара": 2,
+    "Фильтрация товаров": 2,
+    "Удаление товара": 2,
+}
+MODE = os.environ.get("WEBTEST_WAITS", "settle")
+
+# Журнал всех ожиданий за прогон: (шаг, секунды, стабилизировалась ли страница)
+settle_log = []
+
+
+class PageSettle:
+    def __init__(self, driver, budget=10, quiet=0.3, poll=0.1):
+        self.driver = driver
+        self.budget = budget
+        self.quiet = quiet
+        self.poll = poll
+
+    def state(self):
+        return self.driver.execute_script(_STATE_JS)
+
+    def is_settled(self, state, toast=False):
+        if state["ready"] != "complete" or state["pending"] > 0 or state["jquery"] > 0:
+            return False
+        if toast and not state["toast"]:
+            return False
+        return state["idle"] >= self.quiet * 1000
+
+    def wait(self, step, stale=None, toast=False, budget=None):
+        with recorder.waiting():
+            if MODE == "sleep" and step in FIXED_SLEEPS:
+                return self._sleep(step)
+            return self._wait(step, stale, toast, self.budget if budget is None else budget)
+
+    def _sleep(self, step):
+        time.sleep(FIXED_SLEEPS[step])
+        settle_log.append((step, FIXED_SLEEPS[step], True))
+        return True
+
+    def _wait(self, step, stale, toast, budget):
+        start = time.monotonic()
+        deadline = start + budget
+
+        # Если действие уводит на другую страницу, сначала дожидаемся, пока старый DOM исчезнет
+        if stale is not None:
+            try:
+                WebDriverWait(self.driver, budget, self.poll).until(EC.staleness_of(stale))
+            except TimeoutException:
+                logger.warning("Страница не перезагрузилась: %s", step)
+
+        settled = False
+        while True:
+            try:
+                if self.is_settled(self.state(), toast):
+                    settled = True
+                    break
+            except UnexpectedAlertPresentException:
+                # Открытый alert блокирует страницу - дальше с ним работает вызывающий код
+                settled = True
+                break
+            except WebDriverException:
+                # Документ мог смениться прямо во время опроса
+                pass
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll)
+
+        elapsed = time.monotonic() - start
+        settle_log.append((step, elapsed, settled))
+        if settled:
+            logger.info("Страница стабилизировалась за %.2f с: %s", elapsed, step)
+        else:
+            logger.warning("Бюджет %s с исчерпан, страница не стабилизировалась: %s", budget, step)
+        return settled
+
+    def wait_for_alert(self, step, budget=None):
+        budget = self.budget if budget is None else budget
+        start = time.monotonic()
+        with recorder.waiting():
+            alert = WebDriverWait(self.driver, budget, self.poll).until(EC.alert_is_present())
+        settle_log.append((step, time.monotonic() - start, True))
+        return alert
+
+
+def settle_report():
+    steps = {}
+    for step, elapsed, settled in settle_log:
+        count, total, worst, failed = steps.get(step, (0, 0.0, 0.0, 0))
+        steps[step] = (count + 1, total + elapsed, max(worst, elapsed), failed + (not settled))
+
+    lines = [f"{'Шаг':<40} {'раз':>5} {'всего, с':>9} {'макс, с':>8} {'без стаб.':>9}"]
+    for step, (count, total, worst, failed) in sorted(steps.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{step:<40} {count:>5} {total:>9.2f} {worst:>8.2f} {failed:>9}")
+    total = sum(elapsed for _, elapsed, _ in settle_log)
+    lines.append(f"Итого ожиданий: {len(settle_log)}, {total:.2f} с")
+    return "\n".join(lines)